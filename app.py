@@ -23,22 +23,26 @@ from flask import Flask, render_template, request, jsonify, send_file
 from flask_cors import CORS
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
 import io
 import base64
-from http_scraper import SRMPlaywrightScraper, MultiVenueScraper
+from http_scraper import SRMPlaywrightScraper, MultiVenueScraper, seating_cache, upstream_fetches, form_cache, session_pool
+from http_scraper import async_engine, AIOHTTP_AVAILABLE, venue_health, VenueUnavailableError, hedge_policy
+from http_scraper import upstream_governor
+from seating_data import SeatingPage, get_page_stats
+from seat_snapshot import snapshot_store
 import time
 import uuid
 import concurrent.futures
 from functools import partial
 from export_utils import ExamExportUtils
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import gc
 import urllib.parse
 import logging
 import sys
-from serverless_session import session_manager
+from serverless_session import session_manager, shared_seating_cache
+from prefetch import prefetch_scheduler, live_traffic
 
 # Load environment variables
 try:
@@ -65,9 +69,23 @@ class ServerlessConfig:
         print(f"   Max Workers: {self.config['max_workers']}")
         print(f"   Parallel Search: {self.config['enable_parallel_search']}")
         print(f"   Session Timeout: {self.config['session_timeout']}s")
+        print(f"   Fetch Engine: {self.config['fetch_engine']}")
     
     def _generate_serverless_config(self):
         """Generate optimized configuration for serverless deployment"""
+        config = self._generate_scaling_config()
+        
+        # 'async' issues every venue/session fetch at once on one event loop,
+        # 'threads' keeps the ThreadPoolExecutor fan-out capped at max_workers
+        default_engine = 'async' if AIOHTTP_AVAILABLE else 'threads'
+        fetch_engine = os.environ.get('SCRAPER_ENGINE', default_engine).lower()
+        if fetch_engine not in ('async', 'threads') or (fetch_engine == 'async' and not AIOHTTP_AVAILABLE):
+            fetch_engine = 'threads'
+        config['fetch_engine'] = fetch_engine
+        return config
+    
+    def _generate_scaling_config(self):
+        """Worker and session limits for the detected environment"""
         if self.is_serverless:
             return {
                 "max_workers": 4,  # Optimized for Vercel 1GB memory limit
@@ -160,6 +178,7 @@ class UltraFastSeatFinderAPI:
         # Parallel processing configuration
         self.enable_parallel_search = self.scaling_config['enable_parallel_search']
         self.max_workers = self.scaling_config['max_workers']
+        self.fetch_engine = self.scaling_config['fetch_engine']
         
         print(f"⚡ Serverless API initialized: {self.scaling_config['description']}")
     
@@ -201,6 +220,40 @@ class UltraFastSeatFinderAPI:
                 'progress': min(100, progress)
             })
 
+    def _venue_session_result(self, venue, session, page, roll_number):
+        """Build the per venue-session search result from a scraped page"""
+        venue_name = self.venue_names.get(venue, venue)
+        session_name = "Forenoon" if session == "FN" else "Afternoon"
+        
+        # Look the student up (raw-bytes prescan on unparsed pages, index lookup otherwise);
+        # matches are materialized fresh from the page's columns, so they can be updated in place
+        venue_session_matches = page.find(roll_number)
+        for entry in venue_session_matches:
+            entry['venue_code'] = venue
+            entry['venue_name'] = venue_name
+        
+        return {
+            'venue': venue,
+            'session': session,
+            'venue_name': venue_name,
+            'session_name': session_name,
+            'matches': venue_session_matches,
+            'success': True
+        }
+
+    def _skipped_venue_result(self, venue, session, venue_error):
+        """Result for a venue-session that was not searched because its circuit breaker is open"""
+        return {
+            'venue': venue,
+            'session': session,
+            'venue_name': self.venue_names.get(venue, venue),
+            'session_name': "Forenoon" if session == "FN" else "Afternoon",
+            'matches': [],
+            'success': False,
+            'skipped': True,
+            'retry_in': round(venue_error.retry_in)
+        }
+
     def _search_venue_session_parallel(self, venue, session, roll_number, date, session_id):
         """Search a single venue-session combination (for parallel processing)"""
         venue_name = self.venue_names.get(venue, venue)
@@ -208,32 +261,16 @@ class UltraFastSeatFinderAPI:
         
         try:
             # Create scraper instance for this venue-session combination
+            # (lightweight - HTTP sessions are pooled process-wide)
             from http_scraper import SRMPlaywrightScraper
             scraper = SRMPlaywrightScraper(headless=True, venue=venue)
-            venue_session_data = scraper.scrape_seating_data_fast(date, session)
-            
-            # Search for student in this venue-session data
-            venue_session_matches = []
-            for entry in venue_session_data:
-                if roll_number.lower() in entry.get('registration_number', '').lower():
-                    entry['venue_code'] = venue
-                    entry['venue_name'] = venue_name
-                    venue_session_matches.append(entry)
-            
-            # Clean up scraper immediately to free memory
-            scraper.close_browser()
-            scraper = None
-            gc.collect()  # Force garbage collection
+            venue_session_page = scraper.scrape_seating_page(date, session)
             
-            return {
-                'venue': venue,
-                'session': session,
-                'venue_name': venue_name,
-                'session_name': session_name,
-                'matches': venue_session_matches,
-                'success': True
-            }
+            return self._venue_session_result(venue, session, venue_session_page, roll_number)
             
+        except VenueUnavailableError as venue_error:
+            print(f"🚫 Skipping {venue_name} - {session_name}: {venue_error}")
+            return self._skipped_venue_result(venue, session, venue_error)
         except Exception as venue_error:
             print(f"⚠️ Error searching {venue_name} - {session_name}: {venue_error}")
             return {
@@ -246,9 +283,42 @@ class UltraFastSeatFinderAPI:
                 'error': str(venue_error)
             }
 
-    def find_student_seat_serverless(self, roll_number, date, session_id):
-        """ULTRA-FAST parallel search method optimized for Vercel serverless"""
+    def find_student_seat_serverless(self, roll_number, date, session_id, end_date=None, dates=None):
+        """ULTRA-FAST parallel search method optimized for Vercel serverless.
+        Pass end_date (a range starting at date) or a list of dates to search several days at once."""
+        search_dates = self.expand_search_dates(date, end_date, dates)
+        formatted_results, _ = self.search_with_skipped_venues(roll_number, search_dates, session_id)
+        return formatted_results
+
+    @staticmethod
+    def expand_search_dates(date=None, end_date=None, dates=None):
+        """DD/MM/YYYY dates to search: an explicit list, date..end_date inclusive, or just date"""
+        if dates:
+            search_dates = list(dates)
+        elif end_date:
+            first = datetime.strptime(date, "%d/%m/%Y")
+            last = datetime.strptime(end_date, "%d/%m/%Y")
+            if last < first:
+                raise ValueError("End date is before the start date")
+            search_dates = [(first + timedelta(days=offset)).strftime("%d/%m/%Y")
+                            for offset in range((last - first).days + 1)]
+        else:
+            search_dates = [date]
+        
+        # Keep the first occurrence of each date, in calendar order
+        unique_dates = list(dict.fromkeys(search_dates))
+        max_dates = int(os.environ.get('SEARCH_MAX_DATES', 14))
+        if len(unique_dates) > max_dates:
+            raise ValueError(f"At most {max_dates} dates per search")
+        return sorted(unique_dates, key=lambda day: datetime.strptime(day, "%d/%m/%Y"))
+
+    def search_with_skipped_venues(self, roll_number, date, session_id):
+        """Parallel search returning (results, venue-sessions skipped by the circuit breaker).
+        date may be a list of dates: all date x venue x session fetches then share one bounded pool
+        and the results come back as one date-sorted schedule."""
         start_time = time.time()
+        skipped_venues = []
+        search_dates = [date] if isinstance(date, str) else list(date)
         
         try:
             self.update_realistic_progress(session_id, "🚀 Initializing parallel search...", 5)
@@ -257,40 +327,83 @@ class UltraFastSeatFinderAPI:
             all_venues = ["main", "tp", "tp2", "bio", "ub"]
             all_sessions = ["FN", "AN"]
             
-            # Create all venue-session combinations for parallel processing
+            # Create all date-venue-session combinations for parallel processing
+            # (pages already in the cache are answered without a fetch)
             search_tasks = []
-            for venue in all_venues:
-                for session in all_sessions:
-                    search_tasks.append((venue, session))
+            for search_date in search_dates:
+                for venue in all_venues:
+                    for session in all_sessions:
+                        search_tasks.append((search_date, venue, session))
             
             total_tasks = len(search_tasks)
             self.update_realistic_progress(session_id, f"⚡ Starting {total_tasks} parallel searches...", 10)
             
-            # Use ThreadPoolExecutor for parallel processing
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            executor = None
+            try:
                 # Submit all tasks for parallel execution
                 future_to_task = {}
-                for venue, session in search_tasks:
-                    future = executor.submit(
-                        self._search_venue_session_parallel,
-                        venue, session, roll_number, date, session_id
-                    )
-                    future_to_task[future] = (venue, session)
+                if self.fetch_engine == 'async':
+                    # All fetches go out at once on the async engine's event loop
+                    # (bounded by its concurrency limit and the upstream governor)
+                    for search_date, venue, session in search_tasks:
+                        future_to_task[async_engine.submit(venue, search_date, session)] = (search_date, venue, session)
+                else:
+                    # Use ThreadPoolExecutor for parallel processing - one pool for every date
+                    executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                    for search_date, venue, session in search_tasks:
+                        future = executor.submit(
+                            self._search_venue_session_parallel,
+                            venue, session, roll_number, search_date, session_id
+                        )
+                        future_to_task[future] = (search_date, venue, session)
+                
+                # A student sits in at most one room per date and session, so a (date, session)
+                # slot is resolved by an exact registration match or once all its venues answered
+                all_slots = [(search_date, session) for search_date in search_dates for session in all_sessions]
+                pending_by_slot = {slot: set() for slot in all_slots}
+                for future, (search_date, venue, session) in future_to_task.items():
+                    pending_by_slot[(search_date, session)].add(future)
+                resolved_slots = set()
+                normalized_roll = SeatingPage.normalize(roll_number)
                 
                 # Process completed tasks as they finish
                 completed_tasks = 0
                 for future in as_completed(future_to_task):
                     completed_tasks += 1
-                    venue, session = future_to_task[future]
+                    search_date, venue, session = future_to_task[future]
+                    slot = (search_date, session)
+                    pending_by_slot[slot].discard(future)
+                    if slot in resolved_slots:
+                        continue
                     
+                    exact_match = False
                     try:
-                        result = future.result()
+                        if self.fetch_engine == 'async':
+                            try:
+                                result = self._venue_session_result(venue, session, future.result(), roll_number)
+                            except VenueUnavailableError as venue_error:
+                                result = self._skipped_venue_result(venue, session, venue_error)
+                        else:
+                            result = future.result()
+                        
+                        if result.get('skipped'):
+                            skipped_venues.append({
+                                'venue_code': venue,
+                                'venue_name': result['venue_name'],
+                                'date': search_date,
+                                'session': session,
+                                'retry_in': result['retry_in']
+                            })
                         
                         # Calculate progress (10% start + 80% for searches + 10% for completion)
                         search_progress = 10 + int((completed_tasks / total_tasks) * 80)
                         
                         if result['success'] and result['matches']:
                             all_matches.extend(result['matches'])
+                            exact_match = any(
+                                SeatingPage.normalize(match['registration_number']) == normalized_roll
+                                for match in result['matches']
+                            )
                             self.update_realistic_progress(
                                 session_id,
                                 f"✅ Found {len(result['matches'])} result(s) in {result['venue_name']} - {result['session_name']}!",
@@ -305,10 +418,28 @@ class UltraFastSeatFinderAPI:
                             
                     except Exception as e:
                         print(f"⚠️ Task failed for {venue}-{session}: {e}")
-                        continue
+                    
+                    if exact_match or not pending_by_slot[slot]:
+                        resolved_slots.add(slot)
+                        if pending_by_slot[slot]:
+                            print(f"⏭️ {search_date} {session} resolved - skipping {len(pending_by_slot[slot])} remaining venue(s)")
+                        # Queued thread tasks are cancelled; fetches already running (and async
+                        # fetches, which may be shared with other searches) finish into the cache
+                        if executor is not None:
+                            for pending_future in pending_by_slot[slot]:
+                                pending_future.cancel()
+                    
+                    if len(resolved_slots) == len(all_slots):
+                        break
+            finally:
+                if executor is not None:
+                    # Don't wait for redundant venue searches that are still running
+                    executor.shutdown(wait=False, cancel_futures=True)
             
             search_time = time.time() - start_time
             formatted_results = self._format_results(all_matches)
+            # One schedule across all dates: by date, forenoon before afternoon
+            formatted_results.sort(key=self._schedule_key)
             
             final_message = f'⚡ Found {len(formatted_results)} exam(s) in {search_time:.1f}s using parallel search!'
             
@@ -318,11 +449,12 @@ class UltraFastSeatFinderAPI:
                 'message': final_message,
                 'progress': 100,
                 'results': formatted_results,
+                'skipped_venues': skipped_venues,
                 'search_time': search_time
             })
             
             print(f"🚀 Parallel search completed: {len(formatted_results)} results in {search_time:.1f}s")
-            return formatted_results
+            return formatted_results, skipped_venues
                 
         except Exception as e:
             print(f"❌ Parallel search failed: {e}")
@@ -332,7 +464,141 @@ class UltraFastSeatFinderAPI:
                 'progress': 0,
                 'results': []
             })
-            return []
+            return [], skipped_venues
+
+    @staticmethod
+    def _schedule_key(result):
+        """Sort key for a merged schedule: by date, forenoon before afternoon"""
+        try:
+            day = datetime.strptime(result['date'], "%d/%m/%Y")
+        except (TypeError, ValueError):
+            day = datetime.max
+        return (day, result['session'] != 'FN')
+
+    def _fetch_all_pages(self, date, sessions=None, venues=None):
+        """Fetch every venue/session page of a date in parallel (each at most once).
+        Returns ({(venue, session): page}, skipped venue-sessions, failed venue-sessions)"""
+        sessions = sessions or ["FN", "AN"]
+        tasks = [(venue, session) for venue in venues or self.venues for session in sessions]
+        pages, skipped, failed = {}, [], []
+        
+        executor = None
+        try:
+            if self.fetch_engine == 'async':
+                future_to_task = {async_engine.submit(venue, date, session): (venue, session) for venue, session in tasks}
+            else:
+                executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                future_to_task = {
+                    executor.submit(SRMPlaywrightScraper(headless=True, venue=venue).scrape_seating_page, date, session):
+                        (venue, session)
+                    for venue, session in tasks
+                }
+            
+            for future in as_completed(future_to_task):
+                venue, session = future_to_task[future]
+                try:
+                    pages[(venue, session)] = future.result()
+                except VenueUnavailableError as venue_error:
+                    skipped.append({
+                        'venue_code': venue,
+                        'venue_name': self.venue_names.get(venue, venue),
+                        'session': session,
+                        'retry_in': round(venue_error.retry_in)
+                    })
+                except Exception as venue_error:
+                    print(f"⚠️ Error fetching {venue}-{session}: {venue_error}")
+                    failed.append({'venue_code': venue, 'session': session, 'error': str(venue_error)})
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+        
+        return pages, skipped, failed
+
+    def batch_search(self, roll_numbers, date):
+        """
+        Look up many roll numbers for one date: every venue/session page is fetched at
+        most once and all roll numbers are resolved against each page in one pass.
+        Returns per-student results plus skipped/failed venue-sessions and timing.
+        """
+        start_time = time.time()
+        
+        pages, skipped_venues, failed_venues = self._fetch_all_pages(date)
+        fetch_time = time.time() - start_time
+        
+        matches_by_roll = {roll_number: [] for roll_number in roll_numbers}
+        for (venue, session), page in pages.items():
+            if page.no_records:
+                continue
+            venue_name = self.venue_names.get(venue, venue)
+            for roll_number, page_matches in page.find_many(roll_numbers).items():
+                for entry in page_matches:
+                    entry['venue_code'] = venue
+                    entry['venue_name'] = venue_name
+                matches_by_roll[roll_number].extend(page_matches)
+        
+        students = []
+        for roll_number in roll_numbers:
+            results = self._format_results(matches_by_roll[roll_number])
+            # Same venue/session order as the page fetches were listed, not completion order
+            results.sort(key=lambda result: (result['session'] != 'FN', self.venues.index(result['venue_code'])
+                                             if result['venue_code'] in self.venues else len(self.venues)))
+            students.append({'roll_number': roll_number, 'found': bool(results), 'results': results})
+        
+        total_time = time.time() - start_time
+        print(f"🚀 Batch search: {len(roll_numbers)} roll numbers, {len(pages)} pages in {total_time:.2f}s")
+        return {
+            'students': students,
+            'skipped_venues': skipped_venues,
+            'failed_venues': failed_venues,
+            'timing': {
+                'total_ms': round(total_time * 1000, 1),
+                'fetch_ms': round(fetch_time * 1000, 1),
+                'resolve_ms': round((total_time - fetch_time) * 1000, 1),
+                'pages': len(pages)
+            }
+        }
+
+    def room_roster(self, room_number, date, venues=None, sessions=None):
+        """
+        Who sits in a room on a date: the room's rows in seat order from each page's
+        room index (no scan over the page). Rooms are returned per venue/session they appear in.
+        """
+        start_time = time.time()
+        pages, skipped_venues, failed_venues = self._fetch_all_pages(date, sessions, venues)
+        
+        rooms = []
+        for venue in venues or self.venues:
+            for session in sessions or ["FN", "AN"]:
+                page = pages.get((venue, session))
+                if page is None or page.no_records:
+                    continue
+                roster = page.room_roster(room_number)
+                if not roster:
+                    continue
+                rooms.append({
+                    'venue_code': venue,
+                    'venue_name': self.venue_names.get(venue, venue),
+                    'session': session,
+                    'session_name': "Forenoon" if session == "FN" else "Afternoon",
+                    'room_number': roster[0]['room_number'],
+                    'exam_date': roster[0]['exam_date'],
+                    'seat_count': len(roster),
+                    'seats': [
+                        {
+                            'seat_number': entry['seat_number'],
+                            'registration_number': entry['registration_number'],
+                            'department': entry['department']
+                        }
+                        for entry in roster
+                    ]
+                })
+        
+        return {
+            'rooms': rooms,
+            'skipped_venues': skipped_venues,
+            'failed_venues': failed_venues,
+            'search_time': round(time.time() - start_time, 3)
+        }
 
     def set_timeout(self):
         """Set timeout flag to stop search"""
@@ -402,13 +668,29 @@ def clear_sessions():
             'message': 'Error clearing sessions'
         }), 500
 
+def parse_search_date(date):
+    """Accept YYYY-MM-DD or DD/MM/YYYY and return DD/MM/YYYY (None if invalid)"""
+    try:
+        return datetime.strptime(date, "%Y-%m-%d").strftime("%d/%m/%Y")
+    except ValueError:
+        try:
+            datetime.strptime(date, "%d/%m/%Y")
+            return date
+        except ValueError:
+            return None
+
 @app.route('/api/search', methods=['POST'])
 def search_seat():
     """API endpoint for serverless student seat search"""
     try:
         data = request.get_json()
         roll_number = data.get('rollNumber', '').strip()
-        date = data.get('date', '').strip()
+        # Optional date range: endDate (inclusive, starting at date) or an explicit dates list
+        requested_dates = data.get('dates') or []
+        if not isinstance(requested_dates, list):
+            requested_dates = str(requested_dates).replace(',', ' ').split()
+        date = str(data.get('date') or (requested_dates[0] if requested_dates else '')).strip()
+        end_date = str(data.get('endDate') or '').strip()
         
         if not roll_number or not date:
             return jsonify({
@@ -416,19 +698,22 @@ def search_seat():
                 'message': 'Roll number and date are required'
             }), 400
         
+        formatted_date = parse_search_date(date)
+        formatted_end_date = parse_search_date(end_date) if end_date else None
+        formatted_dates = [parse_search_date(str(day).strip()) for day in requested_dates]
+        if formatted_date is None or (end_date and formatted_end_date is None) or None in formatted_dates:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid date format'
+            }), 400
+        
         try:
-            from datetime import datetime
-            date_obj = datetime.strptime(date, "%Y-%m-%d")
-            formatted_date = date_obj.strftime("%d/%m/%Y")
-        except ValueError:
-            try:
-                datetime.strptime(date, "%d/%m/%Y")
-                formatted_date = date
-            except ValueError:
-                return jsonify({
-                    'success': False,
-                    'message': 'Invalid date format'
-                }), 400
+            search_dates = ultra_fast_seat_finder.expand_search_dates(formatted_date, formatted_end_date, formatted_dates)
+        except ValueError as date_error:
+            return jsonify({
+                'success': False,
+                'message': str(date_error)
+            }), 400
         
         if not roll_number or len(roll_number) < 10:
             return jsonify({
@@ -446,7 +731,8 @@ def search_seat():
             'progress': 0,
             'results': [],
             'roll_number': roll_number,
-            'date': formatted_date
+            'date': search_dates[0],
+            'dates': search_dates
         })
         
         # Use the created session ID
@@ -457,13 +743,18 @@ def search_seat():
         # Perform synchronous search (no threading in serverless)
         try:
             # Use sequential search optimized for serverless
-            result = ultra_fast_seat_finder.find_student_seat_serverless(roll_number, formatted_date, session_id)
+            with live_traffic.track():
+                result, skipped_venues = ultra_fast_seat_finder.search_with_skipped_venues(
+                    roll_number, search_dates if len(search_dates) > 1 else search_dates[0], session_id
+                )
             
             return jsonify({
                 'success': True,
                 'sessionId': session_id,
                 'message': 'Search completed',
-                'results': result
+                'results': result,
+                'dates': search_dates,
+                'skipped_venues': skipped_venues
             })
             
         except Exception as search_error:
@@ -488,6 +779,126 @@ def search_seat():
             'message': 'Search failed. Please try again.'
         }), 500
 
+@app.route('/api/search/batch', methods=['POST'])
+def batch_search_seats():
+    """Seats for many roll numbers on one date - each venue/session page is scraped at most once"""
+    try:
+        data = request.get_json(silent=True) or {}
+        roll_numbers = data.get('rollNumbers', [])
+        date = str(data.get('date', '')).strip()
+        
+        # A list, or one string separated by commas/whitespace (pasted from a spreadsheet)
+        if isinstance(roll_numbers, str):
+            roll_numbers = roll_numbers.replace(',', ' ').split()
+        if not isinstance(roll_numbers, list) or not roll_numbers or not date:
+            return jsonify({
+                'success': False,
+                'message': 'rollNumbers (list) and date are required'
+            }), 400
+        
+        formatted_date = parse_search_date(date)
+        if formatted_date is None:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid date format'
+            }), 400
+        
+        # Same validation as /api/search; duplicates are looked up once
+        valid_roll_numbers, invalid_roll_numbers, seen = [], [], set()
+        for roll_number in roll_numbers:
+            roll_number = str(roll_number).strip()
+            if len(roll_number) < 10:
+                invalid_roll_numbers.append(roll_number)
+            elif SeatingPage.normalize(roll_number) not in seen:
+                seen.add(SeatingPage.normalize(roll_number))
+                valid_roll_numbers.append(roll_number)
+        
+        max_roll_numbers = int(os.environ.get('BATCH_MAX_ROLL_NUMBERS', 500))
+        if len(valid_roll_numbers) > max_roll_numbers:
+            return jsonify({
+                'success': False,
+                'message': f'At most {max_roll_numbers} roll numbers per batch'
+            }), 400
+        if not valid_roll_numbers:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid roll number format',
+                'invalid_roll_numbers': invalid_roll_numbers
+            }), 400
+        
+        with live_traffic.track():
+            batch_result = ultra_fast_seat_finder.batch_search(valid_roll_numbers, formatted_date)
+        
+        return jsonify({
+            'success': True,
+            'date': formatted_date,
+            'found': sum(1 for student in batch_result['students'] if student['found']),
+            'invalid_roll_numbers': invalid_roll_numbers,
+            **batch_result
+        })
+        
+    except Exception as e:
+        app.logger.error(f"Batch search endpoint error: {e}")
+        return jsonify({
+            'success': False,
+            'message': 'Batch search failed. Please try again.'
+        }), 500
+
+@app.route('/api/roster')
+def room_roster():
+    """Seats of one room on a date: /api/roster?date=2025-05-28&room=TP401[&venue=tp][&session=FN]"""
+    try:
+        room_number = request.args.get('room', '').strip()
+        date = request.args.get('date', '').strip()
+        venue = request.args.get('venue', '').strip().lower()
+        session = request.args.get('session', '').strip().upper()
+        
+        if not room_number or not date:
+            return jsonify({
+                'success': False,
+                'message': 'room and date are required'
+            }), 400
+        
+        formatted_date = parse_search_date(date)
+        if formatted_date is None:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid date format'
+            }), 400
+        if (venue and venue not in ultra_fast_seat_finder.venues) or (session and session not in ('FN', 'AN')):
+            return jsonify({
+                'success': False,
+                'message': 'Unknown venue or session'
+            }), 400
+        
+        with live_traffic.track():
+            roster = ultra_fast_seat_finder.room_roster(
+                room_number, formatted_date,
+                venues=[venue] if venue else None,
+                sessions=[session] if session else None
+            )
+        
+        if not roster['rooms']:
+            return jsonify({
+                'success': False,
+                'message': f'Room {room_number} not found on {formatted_date}',
+                'date': formatted_date,
+                **roster
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'date': formatted_date,
+            **roster
+        })
+        
+    except Exception as e:
+        app.logger.error(f"Roster endpoint error: {e}")
+        return jsonify({
+            'success': False,
+            'message': 'Roster lookup failed. Please try again.'
+        }), 500
+
 @app.route('/api/progress/<session_id>')
 def get_progress(session_id):
     """Get scraping progress using serverless session manager"""
@@ -760,6 +1171,35 @@ def export_pdf(session_id):
         app.logger.error(f"PDF generation error: {e}")
         return jsonify({'error': f'PDF generation failed: {str(e)}'}), 500
 
+@app.route('/api/prefetch', methods=['GET', 'POST'])
+def prefetch_seating_data():
+    """Cron endpoint: warm the seating cache for upcoming exam dates"""
+    # Vercel cron jobs send "Authorization: Bearer <CRON_SECRET>"; without a secret the
+    # endpoint stays closed, since every call fans out to examcell
+    cron_secret = os.environ.get('CRON_SECRET')
+    if not cron_secret:
+        return jsonify({'success': False, 'message': 'Prefetch is disabled: CRON_SECRET is not set'}), 403
+    if request.headers.get('Authorization') != f"Bearer {cron_secret}":
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    requested_dates = [date.strip() for date in request.args.get('dates', '').split(',') if date.strip()]
+    dates = [parse_search_date(date) for date in requested_dates]
+    if None in dates:
+        return jsonify({'success': False, 'message': 'Invalid date format'}), 400
+    try:
+        # Same de-duplication and SEARCH_MAX_DATES cap as a date-range search
+        dates = ultra_fast_seat_finder.expand_search_dates(dates=dates) if dates else None
+    except ValueError as date_error:
+        return jsonify({'success': False, 'message': str(date_error)}), 400
+    
+    try:
+        budget = float(os.environ.get('PREFETCH_BUDGET_SECONDS', 50))
+        summary = prefetch_scheduler.run_once(dates, budget_seconds=budget)
+        return jsonify(summary), 200 if summary.get('success') else 409
+    except Exception as e:
+        app.logger.error(f"Prefetch failed: {e}")
+        return jsonify({'success': False, 'message': 'Prefetch failed'}), 500
+
 @app.route('/api/health')
 def health_check():
     """Serverless health check endpoint"""
@@ -772,12 +1212,25 @@ def health_check():
             'environment': {
                 'deployment': 'serverless',
                 'is_serverless': scaling_config.is_serverless,
-                'description': scaling_config.config['description']
+                'description': scaling_config.config['description'],
+                'fetch_engine': scaling_config.config['fetch_engine']
             },
             'sessions': {
                 'active_sessions': session_manager.get_session_count(),
                 'session_storage': 'Redis' if session_manager.redis_client else 'Memory'
             },
+            'seating_cache': seating_cache.get_stats(),
+            'shared_seating_cache': shared_seating_cache.get_stats(),
+            'upstream_coalescing': upstream_fetches.get_stats(),
+            'form_cache': form_cache.get_stats(),
+            'http_session_pool': session_pool.get_stats(),
+            'async_engine': async_engine.get_stats(),
+            'page_parsing': get_page_stats(),
+            'snapshots': snapshot_store.get_stats(),
+            'venue_health': venue_health.get_stats(),
+            'hedging': hedge_policy.get_stats(),
+            'upstream_governor': upstream_governor.get_stats(),
+            'prefetch': prefetch_scheduler.get_stats(),
             'features': {
                 'pdf_export': True,
                 'whatsapp_sharing': True,
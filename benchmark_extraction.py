@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Extraction microbenchmarks for the SRM Exam Seat Finder
+Times the scraper's extractors over synthetic seating pages of configurable size and layout
+and writes machine-readable results, so parser changes can be compared objectively
+
+    python benchmark_extraction.py --rooms 10,40 --rows 30 --output before.json
+    python benchmark_extraction.py --rooms 10,40 --rows 30 --baseline before.json
+
+Copyright 2025 Pragadees15
+"""
+
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import List, Dict, Callable
+from bs4 import BeautifulSoup
+from http_scraper import SRMHTTPScraper
+from examcell_standin import synthetic_seating_page, LAYOUTS
+
+DATE = '28/05/2025'
+SESSION = 'FN'
+
+
+def _content_divs(soup: BeautifulSoup):
+    return soup.find_all('div', class_='content-and-table')
+
+
+def build_cases(scraper: SRMHTTPScraper) -> Dict[str, Dict]:
+    """
+    Benchmark cases: 'prepare' turns the page text into the extractor's input once per run,
+    'run' is the measured call and returns the extracted items.
+    Extractor cases get a prebuilt soup so they measure extraction only; the engine:*
+    cases measure the whole page-text -> records path the scraper runs in production.
+    soup:html.parser is the tree build alone (items are the table rows in the tree).
+    """
+    soup = lambda html: BeautifulSoup(html, 'html.parser')
+    cases = {
+        'soup:html.parser': {
+            'layouts': LAYOUTS, 'prepare': lambda html: html,
+            'run': lambda html: BeautifulSoup(html, 'html.parser').find_all('tr')
+        },
+        'ultra_fast': {
+            'layouts': ('standard', 'no-tbody'), 'prepare': soup,
+            'run': lambda parsed: scraper._extract_seating_data_ultra_fast_http(parsed, DATE, SESSION)
+        },
+        'room_info': {
+            'layouts': ('standard', 'no-tbody'), 'prepare': lambda html: _content_divs(soup(html)),
+            'run': lambda divs: [scraper._extract_room_info_ultra_fast_http(div) for div in divs]
+        },
+        'fallback': {
+            'layouts': LAYOUTS, 'prepare': soup,
+            'run': lambda parsed: scraper._extract_seating_data_fallback_http(parsed, DATE, SESSION)
+        },
+    }
+    for engine in SRMHTTPScraper.PARSER_ENGINES:
+        cases[f'engine:{engine}'] = {
+            'layouts': LAYOUTS, 'prepare': lambda html: html,
+            'run': lambda html, engine=engine: scraper._extract_seating_data_engine(engine, html, DATE, SESSION)
+        }
+    return cases
+
+
+def measure(run: Callable, prepared, repeat: int) -> Dict:
+    """Wall time over repeat runs (extractor logging suppressed) plus tracemalloc peak of one extra run"""
+    timings = []
+    items = 0
+    sink = io.StringIO()
+    with redirect_stdout(sink):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            items = len(run(prepared))
+            timings.append(time.perf_counter() - start)
+            sink.seek(0)
+            sink.truncate()
+
+        # Separate run: tracing slows allocation-heavy code down too much to time it at once
+        tracemalloc.start()
+        try:
+            run(prepared)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        'items': items,
+        'best_ms': round(best * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'items_per_second': round(items / best) if best > 0 else None,
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(room_counts: List[int], row_counts: List[int], layouts: List[str],
+                   cases: List[str] = None, repeat: int = 5) -> Dict:
+    scraper = SRMHTTPScraper(venue='main', parser_engine='html.parser')
+    available = build_cases(scraper)
+    selected = cases or list(available)
+    unknown = [name for name in selected if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown benchmark case(s): {', '.join(unknown)} - available: {', '.join(available)}")
+
+    results = []
+    for layout in layouts:
+        for rooms in room_counts:
+            for rows in row_counts:
+                html = synthetic_seating_page(DATE, SESSION, 'main', rooms, rows, layout)
+                for name in selected:
+                    case = available[name]
+                    if layout not in case['layouts']:
+                        continue
+                    result = measure(case['run'], case['prepare'](html), repeat)
+                    result.update({'case': name, 'layout': layout, 'rooms': rooms,
+                                   'rows_per_room': rows, 'page_kb': round(len(html) / 1024, 1)})
+                    results.append(result)
+                    print(f"⏱️ {name:<22} {layout:<9} {rooms:>4} rooms x {rows:>3} rows: "
+                          f"{result['best_ms']:>9.2f} ms  {result['items']:>6} items  "
+                          f"{result['items_per_second'] or 0:>9}/s  {result['peak_memory_kb']:>9.1f} KB peak")
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results
+    }
+
+
+def compare(report: Dict, baseline: Dict):
+    """Print per-case speed and memory ratios against an earlier report"""
+    key = lambda result: (result['case'], result['layout'], result['rooms'], result['rows_per_room'])
+    previous = {key(result): result for result in baseline.get('results', [])}
+    print("\n📊 Against baseline (time ratio < 1 is faster):")
+    for result in report['results']:
+        before = previous.get(key(result))
+        if not before or not before['best_ms']:
+            continue
+        time_ratio = result['best_ms'] / before['best_ms']
+        memory_ratio = result['peak_memory_kb'] / before['peak_memory_kb'] if before['peak_memory_kb'] else 0
+        items_note = '' if result['items'] == before['items'] else f"  ⚠️ items {before['items']} -> {result['items']}"
+        print(f"   {result['case']:<22} {result['layout']:<9} {result['rooms']:>4}x{result['rows_per_room']:<4} "
+              f"time x{time_ratio:.2f}  memory x{memory_ratio:.2f}{items_note}")
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(',') if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction microbenchmarks over synthetic seating pages")
+    parser.add_argument('--rooms', type=_int_list, default=[5, 20, 60], help="comma separated room counts")
+    parser.add_argument('--rows', type=_int_list, default=[30], help="comma separated rows per room")
+    parser.add_argument('--layouts', default=','.join(LAYOUTS), help=f"comma separated: {', '.join(LAYOUTS)}")
+    parser.add_argument('--cases', default='', help="comma separated case names (default: all)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write the JSON report here")
+    parser.add_argument('--baseline', help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    layouts = [layout for layout in args.layouts.split(',') if layout]
+    unknown = [layout for layout in layouts if layout not in LAYOUTS]
+    if unknown:
+        parser.error(f"unknown layout(s): {', '.join(unknown)}")
+
+    cases = [case for case in args.cases.split(',') if case] or None
+    report = run_benchmarks(args.rooms, args.rows, layouts, cases, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Local examcell stand-in for the SRM Exam Seat Finder
+Serves the report form and form action of all five venues from recorded or synthetic pages,
+with configurable latency, jitter, error rate and "no records" answers - for benchmarks and
+load tests without touching the live examcell site
+
+    python examcell_standin.py serve --port 8765 --latency 0.3 --jitter 0.2 --error-rate 0.02
+    python examcell_standin.py record --recordings recordings 28/05/2025 29/05/2025
+    EXAMCELL_BASE_URL=http://127.0.0.1:8765 python app.py
+
+Copyright 2025 Pragadees15
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict
+from http_scraper import SRMHTTPScraper
+
+# Page layouts the synthetic generator can produce:
+#   standard - content-and-table room blocks, table#maintable with a tbody (the live layout)
+#   no-tbody - same blocks, rows directly under the table
+#   fallback - plain tables without content-and-table blocks (exercises the fallback extractor)
+LAYOUTS = ('standard', 'no-tbody', 'fallback')
+
+DEPARTMENTS = ('CSE', 'ECE', 'EEE', 'MECH', 'CIVIL', 'IT', 'AERO', 'BIOTECH', 'CHEM', 'ARCH')
+VENUE_NUMBERS = {'main': 1, 'tp': 2, 'tp2': 3, 'bio': 4, 'ub': 5}
+FORM_ACTION = 'fetch_data.php'
+
+NO_RECORDS_PAGE = '<html><body><div class="alert">No records found</div></body></html>'
+
+
+def synthetic_seating_page(date: str, session_type: str, venue: str = 'main', rooms: int = 10,
+                           rows: int = 30, layout: str = 'standard', seed: int = 0) -> str:
+    """Deterministic seating page for one venue/date/session in the examcell markup"""
+    rng = random.Random(f"{venue}|{date}|{session_type}|{seed}")
+    venue_number = VENUE_NUMBERS.get(venue, 9)
+    session_number = 1 if session_type.upper() == 'FN' else 2
+
+    parts = [
+        '<html><head><title>Seating Arrangement</title>',
+        '<style>.content-and-table{page-break-after:always} #maintable td{padding:2px}</style>',
+        '<script>function printPage(){window.print();}</script>',
+        '</head><body><div class="container">'
+    ]
+
+    student = 0
+    for room in range(rooms):
+        room_number = f"{'TP' if venue.startswith('tp') else 'R'}{venue_number}{room + 1:03d}"
+        heading = f"ROOM NO: {room_number} DATE : {date} SESSION : {session_type}"
+        if layout == 'fallback':
+            parts.append(f'<div class="room"><p>{heading}</p><table border="1">')
+        else:
+            parts.append(f'<div class="content-and-table"><div id="datessesinfo"><h4>{heading}</h4></div>')
+            parts.append('<table id="maintable" border="1">')
+            if layout == 'standard':
+                parts.append('<tbody>')
+
+        parts.append('<tr><th>Branch</th><th>Seat No</th><th>Register No</th>'
+                     '<th>Branch</th><th>Seat No</th><th>Register No</th></tr>')
+        for row in range(rows):
+            cells = []
+            for side in range(2):
+                # The last bench of a room is sometimes only half occupied
+                if side == 1 and row == rows - 1 and rng.random() < 0.5:
+                    cells.extend(['', '', ''])
+                    continue
+                student += 1
+                registration_number = f"RA2{venue_number}{session_number}{rng.randint(0, 9)}{student:09d}"
+                cells.extend([rng.choice(DEPARTMENTS), str(row * 2 + side + 1), registration_number])
+            parts.append('<tr>' + ''.join(f'<td>{cell}</td>' for cell in cells) + '</tr>')
+
+        if layout == 'standard':
+            parts.append('</tbody>')
+        parts.append('</table></div>')
+
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+def form_page(hidden_token: str) -> str:
+    """Report page with the date/session form, as served by get_datewise_report.php"""
+    return (
+        '<html><body><form action="' + FORM_ACTION + '" method="post">'
+        '<input type="text" name="dated"><select name="session"><option>FN</option><option>AN</option></select>'
+        f'<input type="hidden" name="token" value="{hidden_token}">'
+        '<input type="submit" name="submit" value="Submit"></form></body></html>'
+    )
+
+
+def recording_path(recordings_dir: str, venue: str, date: str, session_type: str) -> str:
+    return os.path.join(recordings_dir, venue, f"{date.replace('/', '-')}_{session_type.upper()}.html")
+
+
+class StandinConfig:
+    """Behaviour of the stand-in server (shared by all handler threads)"""
+
+    def __init__(self, recordings_dir: str = None, replay_only: bool = False, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, no_records_rate: float = 0.0,
+                 no_records_venues: List[str] = None, rooms: int = 10, rows: int = 30,
+                 layout: str = 'standard'):
+        self.recordings_dir = recordings_dir
+        self.replay_only = replay_only
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.no_records_rate = no_records_rate
+        self.no_records_venues = set(no_records_venues or [])
+        self.rooms = rooms
+        self.rows = rows
+        self.layout = layout
+
+        self._lock = threading.Lock()
+        self.counts = {'GET': 0, 'POST': 0, 'errors': 0, 'no_records': 0, 'replayed': 0, 'synthetic': 0}
+
+    def count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def response_delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def seating_body(self, venue: str, date: str, session_type: str) -> str:
+        """Recorded page when there is one, otherwise synthetic (or "no records" in replay-only mode)"""
+        if venue in self.no_records_venues or random.random() < self.no_records_rate:
+            self.count('no_records')
+            return NO_RECORDS_PAGE
+
+        if self.recordings_dir:
+            path = recording_path(self.recordings_dir, venue, date, session_type)
+            if os.path.exists(path):
+                self.count('replayed')
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    return f.read()
+            if self.replay_only:
+                self.count('no_records')
+                return NO_RECORDS_PAGE
+
+        self.count('synthetic')
+        return synthetic_seating_page(date, session_type, venue, self.rooms, self.rows, self.layout)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the pooled sessions expect
+    config: StandinConfig = None
+
+    # venue report paths and their form-action paths
+    REPORT_PATHS = {path: venue for venue, path in SRMHTTPScraper.VENUE_PATHS.items()}
+    ACTION_PATHS = {path.rsplit('/', 1)[0] + '/' + FORM_ACTION: venue for venue, path in SRMHTTPScraper.VENUE_PATHS.items()}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str = 'text/html; charset=utf-8', headers: Dict = None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _simulate_upstream(self) -> bool:
+        """Apply latency/jitter and the error rate; False when an error response was sent"""
+        delay = self.config.response_delay()
+        if delay:
+            time.sleep(delay)
+        if random.random() < self.config.error_rate:
+            self.config.count('errors')
+            self._send(500, '<html><body>Internal Server Error</body></html>')
+            return False
+        return True
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == '/__standin/stats':
+            self._send(200, json.dumps(self.config.counts), 'application/json')
+            return
+
+        venue = self.REPORT_PATHS.get(path)
+        if venue is None:
+            self._send(404, '<html><body>Not Found</body></html>')
+            return
+
+        self.config.count('GET')
+        if self._simulate_upstream():
+            session_id = f"{random.getrandbits(64):016x}"
+            self._send(200, form_page(session_id[:8]), headers={'Set-Cookie': f"PHPSESSID={session_id}; path=/"})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = urllib.parse.parse_qs(self.rfile.read(length).decode('utf-8', errors='replace'))
+
+        venue = self.ACTION_PATHS.get(urllib.parse.urlsplit(self.path).path)
+        if venue is None:
+            self._send(404, '<html><body>Not Found</body></html>')
+            return
+
+        self.config.count('POST')
+        if not self._simulate_upstream():
+            return
+
+        date = form.get('dated', [''])[0]
+        session_type = form.get('session', ['FN'])[0]
+        if not date:
+            self._send(200, NO_RECORDS_PAGE)
+            return
+        self._send(200, self.config.seating_body(venue, date, session_type))
+
+
+def start_standin(port: int = 0, host: str = '127.0.0.1', config: StandinConfig = None) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread; server.server_port has the bound port"""
+    handler = type('ConfiguredStandinHandler', (StandinHandler,), {'config': config or StandinConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record_pages(recordings_dir: str, dates: List[str], venues: List[str] = None,
+                 sessions: List[str] = None, base_url: str = None) -> Dict[str, int]:
+    """Capture real form-action responses through SRMHTTPScraper for later replay"""
+    summary = {'recorded': 0, 'failed': 0}
+    for venue in venues or list(SRMHTTPScraper.VENUE_PATHS):
+        scraper = SRMHTTPScraper(venue=venue, base_url=base_url)
+        for date in dates:
+            for session_type in sessions or ['FN', 'AN']:
+                body = scraper.fetch_raw_page(date, session_type)
+                if body is None:
+                    print(f"❌ Could not record {venue} {date} {session_type}")
+                    summary['failed'] += 1
+                    continue
+
+                path = recording_path(recordings_dir, venue, date, session_type)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(body)
+                print(f"💾 Recorded {venue} {date} {session_type} ({len(body)} bytes)")
+                summary['recorded'] += 1
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local examcell stand-in server")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="serve recorded/synthetic pages")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--recordings', help="directory written by the record command")
+    serve_parser.add_argument('--replay-only', action='store_true', help="answer 'no records' instead of synthesizing")
+    serve_parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    serve_parser.add_argument('--jitter', type=float, default=0.0, help="+/- seconds of random latency")
+    serve_parser.add_argument('--error-rate', type=float, default=0.0, help="share of HTTP 500 responses")
+    serve_parser.add_argument('--no-records-rate', type=float, default=0.0, help="share of 'no records' answers")
+    serve_parser.add_argument('--no-records-venues', default='', help="comma separated venues that never have records")
+    serve_parser.add_argument('--rooms', type=int, default=10)
+    serve_parser.add_argument('--rows', type=int, default=30)
+    serve_parser.add_argument('--layout', choices=LAYOUTS, default='standard')
+
+    record_parser = commands.add_parser('record', help="capture live pages for replay")
+    record_parser.add_argument('dates', nargs='+', help="DD/MM/YYYY")
+    record_parser.add_argument('--recordings', required=True)
+    record_parser.add_argument('--venues', default='', help="comma separated (default: all)")
+    record_parser.add_argument('--sessions', default='FN,AN')
+    record_parser.add_argument('--source', help="base URL to record from (default: live examcell)")
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        venues = [venue for venue in args.venues.split(',') if venue] or None
+        summary = record_pages(args.recordings, args.dates, venues, args.sessions.split(','), args.source)
+        print(json.dumps(summary))
+        return
+
+    config = StandinConfig(
+        recordings_dir=args.recordings,
+        replay_only=args.replay_only,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        no_records_rate=args.no_records_rate,
+        no_records_venues=[venue for venue in args.no_records_venues.split(',') if venue],
+        rooms=args.rooms,
+        rows=args.rows,
+        layout=args.layout
+    )
+    server = start_standin(args.port, args.host, config)
+    print(f"🧪 Examcell stand-in on http://{args.host}:{server.server_port} - "
+          f"set EXAMCELL_BASE_URL to this address to use it")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
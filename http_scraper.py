@@ -7,27 +7,990 @@ Copyright 2025 Pragadees15
 """
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import os
+import sys
 import time
 import json
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Iterator
+from collections import OrderedDict, deque
+from contextlib import contextmanager, asynccontextmanager, ExitStack
 import concurrent.futures
 import threading
 import urllib.parse
 import re
+import codecs
+import hashlib
+from html.parser import HTMLParser
+from seating_data import SeatingPage
+from seat_snapshot import snapshot_store
+from serverless_session import shared_seating_cache
+
+# Optional raw lxml parser engine (BeautifulSoup + html.parser is always available)
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Optional asyncio fetch engine, falls back to the thread pool when aiohttp is missing
+try:
+    import asyncio
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+# Headers that mimic a real browser, shared by every fetch engine
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0'
+}
+
+
+class SeatingSnapshotCache:
+    """
+    Process-wide cache of seating pages keyed by (venue, date, session).
+    Entries expire after a TTL and the least recently used ones are evicted
+    once the estimated memory footprint exceeds the configured budget.
+    "No records found" pages are cached as negative entries with their own,
+    shorter TTL and counters.
+    """
+    
+    def __init__(self, ttl: int = None, max_bytes: int = None, negative_ttl: int = None):
+        self.ttl = ttl if ttl is not None else int(os.environ.get('SEATING_CACHE_TTL', 900))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else \
+            int(os.environ.get('SEATING_NEGATIVE_TTL', 300))
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.environ.get('SEATING_CACHE_MAX_MB', 128)) * 1024 * 1024)
+        
+        self._entries = OrderedDict()  # key -> (expires_at, size_bytes, SeatingPage, size_version_when_measured)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        
+        # Counters for sizing the cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.revalidations = 0  # refreshes that found the page unchanged and kept it
+        self.negative_hits = 0  # hits on "no records" entries (included in hits)
+    
+    @staticmethod
+    def _make_key(venue: str, date: str, session_type: str) -> Tuple[str, str, str]:
+        return (venue, date, session_type.upper())
+    
+    def get(self, venue: str, date: str, session_type: str) -> Optional[SeatingPage]:
+        """Return the cached page or None on a miss. Pages are shared - treat them as read-only."""
+        key = self._make_key(venue, date, session_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, size, page, _ = entry
+            if time.time() >= expires_at:
+                # Stale entries stay (until LRU eviction) so a refresh can revalidate them via peek()
+                if expires_at:
+                    self._entries[key] = (0, size, page, entry[3])
+                    self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if page.no_records:
+                self.negative_hits += 1
+        
+        # Lazily parsed pages grow once they are materialized or indexed - re-measure them
+        if entry[3] != page.size_version:
+            self._resize(key, page)
+        return page
+    
+    def _resize(self, key, page: SeatingPage):
+        size = page.estimate_size()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] is not page:
+                return
+            self._entries[key] = (entry[0], size, page, page.size_version)
+            self.current_bytes += size - entry[1]
+            self._evict_over_budget()
+    
+    def put(self, venue: str, date: str, session_type: str, page: SeatingPage, ttl: float = None):
+        """Store a page (negative TTL for "no records" pages), evicting LRU entries to stay within budget.
+        ttl overrides the lifetime, e.g. for a page that already spent part of it in the shared cache."""
+        key = self._make_key(venue, date, session_type)
+        size = page.estimate_size()
+        if size > self.max_bytes:
+            # Too big to cache - but never keep serving the older page it replaces
+            self.invalidate(venue, date, session_type)
+            return
+        
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self.current_bytes -= old_entry[1]
+                if old_entry[2] is page:
+                    self.revalidations += 1
+            
+            if ttl is None:
+                ttl = self.negative_ttl if page.no_records else self.ttl
+            self._entries[key] = (time.time() + ttl, size, page, page.size_version)
+            self.current_bytes += size
+            self._evict_over_budget()
+    
+    def _evict_over_budget(self):
+        """Drop least recently used entries until the footprint fits (caller holds the lock)"""
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, evicted_entry = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_entry[1]
+            self.evictions += 1
+    
+    def peek(self, venue: str, date: str, session_type: str) -> Optional[SeatingPage]:
+        """Return the cached page even if it has expired (no counters, no LRU update)"""
+        key = self._make_key(venue, date, session_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[2] if entry is not None else None
+    
+    def time_to_live(self, venue: str, date: str, session_type: str) -> Optional[float]:
+        """Seconds until the cached entry expires, or None when nothing is cached (no hit/miss counted)"""
+        key = self._make_key(venue, date, session_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            remaining = entry[0] - time.time()
+            return remaining if remaining > 0 else None
+    
+    def invalidate(self, venue: str, date: str, session_type: str):
+        """Drop a single cached entry"""
+        key = self._make_key(venue, date, session_type)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.current_bytes -= entry[1]
+    
+    def clear(self):
+        """Drop all cached entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def get_stats(self) -> Dict:
+        """Hit/miss/eviction counters and current footprint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            negative_entries = sum(1 for entry in self._entries.values() if entry[2].no_records)
+            return {
+                'entries': len(self._entries) - negative_entries,
+                'negative_entries': negative_entries,
+                'size_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'negative_ttl_seconds': self.negative_ttl,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'revalidations': self.revalidations
+            }
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent callers asking for the same key wait on
+    a single in-flight call and share its result (or its exception).
+    """
+    
+    def __init__(self):
+        self._calls = {}  # key -> Future of the in-flight call
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+    
+    def begin(self, key) -> Tuple[concurrent.futures.Future, bool]:
+        """Join the in-flight call for key, or become its leader. Returns (future, is_leader)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = concurrent.futures.Future()
+            self._calls[key] = future
+            self.executed += 1
+            return future, True
+    
+    def finish(self, key, future: concurrent.futures.Future, result=None, error: BaseException = None):
+        """Publish the leader's result (or error) to every waiting caller."""
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def do(self, key, fn):
+        """Run fn() for key unless an identical call is already running, then share its result."""
+        future, is_leader = self.begin(key)
+        if not is_leader:
+            return future.result()
+        
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result=result)
+        return result
+    
+    def get_stats(self) -> Dict:
+        """Executed vs coalesced call counters"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executed': self.executed,
+                'coalesced': self.coalesced
+            }
+
+
+class HTTPSessionPool:
+    """
+    Long-lived, thread-safe pool of requests sessions per venue.
+    A session is checked out by one thread at a time and returned afterwards,
+    so keep-alive connections (and cookies) survive across tasks and searches.
+    """
+    
+    def __init__(self, max_idle_per_venue: int = None):
+        self.max_idle_per_venue = max_idle_per_venue if max_idle_per_venue is not None else \
+            int(os.environ.get('HTTP_POOL_MAX_IDLE', 8))
+        self._idle = {}      # venue -> [idle sessions]
+        self._sessions = {}  # venue -> [all live sessions]
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.created = 0
+        self.checkouts = 0
+        self.reused = 0
+        self.discarded = 0
+    
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Build a session with browser-like headers and a keep-alive connection pool"""
+        session = requests.Session()
+        
+        # Set headers to mimic a real browser (per-request headers are passed per call)
+        session.headers.update(BROWSER_HEADERS)
+        
+        # One session serves one request at a time, so a small pool is enough
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=2,
+            pool_block=False
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def acquire(self, venue: str) -> requests.Session:
+        """Check out a session for venue, reusing an idle one when available"""
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            idle = self._idle.get(venue)
+            if idle:
+                self.reused += 1
+                return idle.pop()
+            self.created += 1
+            session = self._create_session()
+            self._sessions.setdefault(venue, []).append(session)
+            return session
+    
+    def release(self, venue: str, session: requests.Session):
+        """Return a session to the pool (closed if the venue already has enough idle ones)"""
+        with self._lock:
+            self.in_use -= 1
+            idle = self._idle.setdefault(venue, [])
+            if len(idle) < self.max_idle_per_venue:
+                idle.append(session)
+                return
+            self._sessions[venue].remove(session)
+            self.discarded += 1
+        session.close()
+    
+    @contextmanager
+    def session(self, venue: str):
+        """Context manager wrapping acquire/release"""
+        session = self.acquire(venue)
+        try:
+            yield session
+        finally:
+            self.release(venue, session)
+    
+    def close_all(self):
+        """Close every pooled session"""
+        with self._lock:
+            sessions = [session for venue_sessions in self._sessions.values() for session in venue_sessions]
+            self._idle.clear()
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+    
+    @staticmethod
+    def _count_open_connections(session: requests.Session) -> int:
+        """Count keep-alive connections with a live socket held by a session's adapters"""
+        open_connections = 0
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is None or pool.pool is None:
+                    continue
+                open_connections += sum(
+                    1 for conn in list(pool.pool.queue)
+                    if conn is not None and getattr(conn, 'sock', None) is not None
+                )
+        return open_connections
+    
+    def get_stats(self) -> Dict:
+        """Reuse ratio and connection counts, to confirm sessions are being reused"""
+        with self._lock:
+            idle_sessions = [session for sessions in self._idle.values() for session in sessions]
+            stats = {
+                'sessions': sum(len(sessions) for sessions in self._sessions.values()),
+                'sessions_in_use': self.in_use,
+                'created': self.created,
+                'checkouts': self.checkouts,
+                'reused': self.reused,
+                'discarded': self.discarded,
+                'reuse_ratio': round(self.reused / self.checkouts, 4) if self.checkouts else 0.0
+            }
+        # Only idle sessions are inspected; busy ones belong to another thread
+        stats['idle_open_connections'] = sum(self._count_open_connections(session) for session in idle_sessions)
+        return stats
+
+
+class FormDiscoveryCache:
+    """Per-venue cache of the report form's action URL and hidden fields"""
+    
+    def __init__(self, ttl: int = None):
+        self.ttl = ttl if ttl is not None else int(os.environ.get('FORM_CACHE_TTL', 1800))
+        self._forms = {}  # base_url -> (expires_at, (form_url, hidden_fields))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, base_url: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """Return (form_url, hidden_fields) if a fresh entry exists"""
+        with self._lock:
+            entry = self._forms.get(base_url)
+            if entry is None or time.time() >= entry[0]:
+                self._forms.pop(base_url, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            form_url, hidden_fields = entry[1]
+            return form_url, dict(hidden_fields)
+    
+    def put(self, base_url: str, form_info: Tuple[str, Dict[str, str]]):
+        with self._lock:
+            self._forms[base_url] = (time.time() + self.ttl, form_info)
+    
+    def invalidate(self, base_url: str):
+        with self._lock:
+            self._forms.pop(base_url, None)
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'venues': len(self._forms),
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class VenueUnavailableError(Exception):
+    """Raised instead of calling a venue whose circuit breaker is open"""
+    
+    def __init__(self, venue: str, retry_in: float):
+        super().__init__(f"Venue '{venue}' is temporarily unavailable (retry in {retry_in:.0f}s)")
+        self.venue = venue
+        self.retry_in = retry_in
+
+
+class VenueHealthMonitor:
+    """
+    Per-venue upstream latency tracking and circuit breaking.
+    Request timeouts are derived from the observed latency percentile of each venue,
+    and after consecutive failures a venue is not called at all until a cooldown has
+    passed; then a single probe request decides whether it is closed again.
+    """
+    
+    def __init__(self, window: int = 50, min_samples: int = 5, failure_threshold: int = None,
+                 cooldown: float = None):
+        self.window = window
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold if failure_threshold is not None else \
+            int(os.environ.get('VENUE_FAILURE_THRESHOLD', 3))
+        self.cooldown = cooldown if cooldown is not None else float(os.environ.get('VENUE_BREAKER_COOLDOWN', 60))
+        
+        # Timeout = percentile latency x multiplier, clamped to [floor, the scraper's fixed ceiling]
+        self.timeout_percentile = 95
+        self.timeout_multiplier = 3.0
+        self.read_timeout_floor = 5.0
+        self.connect_timeout_floor = 3.0
+        
+        self._venues = {}
+        self._lock = threading.Lock()
+    
+    def _state(self, venue: str) -> Dict:
+        # caller holds the lock
+        state = self._venues.get(venue)
+        if state is None:
+            state = self._venues[venue] = {
+                'latencies': deque(maxlen=self.window),
+                'consecutive_failures': 0,
+                'opened_at': None,
+                'probing': False,
+                'probe_started': 0.0,
+                'requests': 0,
+                'failures': 0,
+                'skipped': 0
+            }
+        return state
+    
+    @staticmethod
+    def _percentile(samples: List[float], percentile: float) -> float:
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+    
+    def timeout_for(self, venue: str, ceiling: Tuple[float, float]) -> Tuple[float, float]:
+        """(connect, read) timeout for the next request to a venue"""
+        with self._lock:
+            latencies = list(self._state(venue)['latencies'])
+        if len(latencies) < self.min_samples:
+            return ceiling
+        
+        budget = self._percentile(latencies, self.timeout_percentile) * self.timeout_multiplier
+        connect_timeout = min(ceiling[0], max(self.connect_timeout_floor, budget))
+        read_timeout = min(ceiling[1], max(self.read_timeout_floor, budget))
+        return connect_timeout, read_timeout
+    
+    def before_request(self, venue: str):
+        """Raise VenueUnavailableError while the venue's circuit is open (one probe passes after the cooldown)"""
+        with self._lock:
+            state = self._state(venue)
+            if state['opened_at'] is None:
+                return
+            
+            now = time.time()
+            retry_in = state['opened_at'] + self.cooldown - now
+            # A probe that never reported back (e.g. the fetch crashed) is replaced after another cooldown
+            if retry_in <= 0 and (not state['probing'] or now - state['probe_started'] >= self.cooldown):
+                state['probing'] = True
+                state['probe_started'] = now
+                print(f"🩺 Probing {venue} after circuit cooldown")
+                return
+            
+            state['skipped'] += 1
+        raise VenueUnavailableError(venue, max(retry_in, 0))
+    
+    def record_success(self, venue: str, latency: float, closes_circuit: bool = True):
+        """Record a successful request. The form GET passes closes_circuit=False: the report page
+        loading says nothing about the POST, which would otherwise fail forever without tripping the breaker."""
+        with self._lock:
+            state = self._state(venue)
+            state['requests'] += 1
+            state['latencies'].append(latency)
+            if not closes_circuit:
+                return
+            state['consecutive_failures'] = 0
+            if state['opened_at'] is not None:
+                print(f"✅ Circuit closed for {venue}")
+            state['opened_at'] = None
+            state['probing'] = False
+    
+    def record_failure(self, venue: str):
+        with self._lock:
+            state = self._state(venue)
+            state['requests'] += 1
+            state['failures'] += 1
+            state['consecutive_failures'] += 1
+            if state['probing'] or (state['opened_at'] is None and
+                                    state['consecutive_failures'] >= self.failure_threshold):
+                print(f"🚫 Circuit opened for {venue} after {state['consecutive_failures']} consecutive failure(s)")
+                state['opened_at'] = time.time()
+            state['probing'] = False
+    
+    def latency_percentile(self, venue: str, percentile: float) -> Optional[float]:
+        """Observed request latency percentile of a venue, None until min_samples were seen"""
+        with self._lock:
+            latencies = list(self._state(venue)['latencies'])
+        if len(latencies) < self.min_samples:
+            return None
+        return self._percentile(latencies, percentile)
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = {}
+            for venue, state in self._venues.items():
+                latencies = list(state['latencies'])
+                stats[venue] = {
+                    'circuit': 'closed' if state['opened_at'] is None else ('half-open' if state['probing'] else 'open'),
+                    'consecutive_failures': state['consecutive_failures'],
+                    'requests': state['requests'],
+                    'failures': state['failures'],
+                    'skipped': state['skipped'],
+                    'p50_seconds': round(self._percentile(latencies, 50), 3) if latencies else None,
+                    'p95_seconds': round(self._percentile(latencies, 95), 3) if latencies else None
+                }
+            return stats
+
+
+class UpstreamGovernor:
+    """
+    Process-wide gate for every request to examcell, shared by both fetch engines.
+    Each venue has a token bucket (rate + burst) and all venues share a concurrency cap;
+    requests waiting for a slot are served strictly first come, first served.
+    """
+    
+    def __init__(self, max_concurrency: int = None, rate_per_venue: float = None, burst: int = None):
+        self.max_concurrency = max_concurrency if max_concurrency is not None else \
+            int(os.environ.get('UPSTREAM_MAX_CONCURRENCY', 12))
+        self.rate_per_venue = rate_per_venue if rate_per_venue is not None else \
+            float(os.environ.get('UPSTREAM_RATE_PER_VENUE', 5))
+        self.burst = burst if burst is not None else int(os.environ.get('UPSTREAM_BURST', 10))
+        
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = deque()  # FIFO of waiter dicts: {'state': 'waiting'|'granted'|'abandoned', 'wake': fn}
+        self._buckets = {}  # venue -> [tokens, last_refill]
+        
+        self.acquired = 0
+        self.queued = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _reserve_token(self, venue: str) -> float:
+        """Take a token from the venue's bucket; returns how long to wait until it is valid"""
+        with self._lock:
+            now = time.time()
+            bucket = self._buckets.get(venue)
+            if bucket is None:
+                bucket = self._buckets[venue] = [float(self.burst), now]
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate_per_venue)
+            bucket[1] = now
+            bucket[0] -= 1
+            if bucket[0] >= 0:
+                return 0.0
+            self.rate_limited += 1
+            return -bucket[0] / self.rate_per_venue
+    
+    def _try_grant(self, waiter: Dict) -> bool:
+        """Take a free slot right away, or queue the waiter (caller holds the lock)"""
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            waiter['state'] = 'granted'
+            return True
+        self._waiters.append(waiter)
+        self.queued += 1
+        return False
+    
+    def _release(self):
+        """Hand the slot to the oldest live waiter, or free it"""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter['state'] == 'waiting':
+                    waiter['state'] = 'granted'
+                    wake = waiter['wake']
+                    break
+            else:
+                self._active -= 1
+                return
+        wake()
+    
+    def _abandon(self, waiter: Dict):
+        """A waiter gave up (cancelled); pass its slot on if it had already been granted"""
+        with self._lock:
+            if waiter['state'] == 'waiting':
+                waiter['state'] = 'abandoned'
+                return
+        self._release()
+    
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self.acquired += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+    
+    @contextmanager
+    def slot(self, venue: str):
+        """Blocking slot for the thread engine"""
+        start_time = time.time()
+        token_wait = self._reserve_token(venue)
+        if token_wait > 0:
+            time.sleep(token_wait)
+        
+        event = threading.Event()
+        waiter = {'state': 'waiting', 'wake': event.set}
+        with self._lock:
+            granted = self._try_grant(waiter)
+        if not granted:
+            event.wait()
+        
+        self._record_wait(time.time() - start_time)
+        try:
+            yield
+        finally:
+            self._release()
+    
+    @asynccontextmanager
+    async def async_slot(self, venue: str):
+        """Slot for the asyncio engine, queued in the same FIFO as threads"""
+        start_time = time.time()
+        token_wait = self._reserve_token(venue)
+        if token_wait > 0:
+            await asyncio.sleep(token_wait)
+        
+        loop = asyncio.get_running_loop()
+        granted_future = loop.create_future()
+        
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted_future.done() or granted_future.set_result(True))
+        
+        waiter = {'state': 'waiting', 'wake': wake}
+        with self._lock:
+            granted = self._try_grant(waiter)
+        if not granted:
+            try:
+                await granted_future
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+        
+        self._record_wait(time.time() - start_time)
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'rate_per_venue': self.rate_per_venue,
+                'burst': self.burst,
+                'active': self._active,
+                'waiting': sum(1 for waiter in self._waiters if waiter['state'] == 'waiting'),
+                'acquired': self.acquired,
+                'queued': self.queued,
+                'rate_limited': self.rate_limited,
+                'avg_wait_ms': round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 2)
+            }
+
+
+class HedgePolicy:
+    """
+    Decides when a slow form POST gets a duplicate ("hedge") request.
+    A hedge goes out once the first request has been pending longer than the venue's
+    latency percentile; hedges are capped both in flight and as a share of all hedgeable
+    requests so upstream load stays bounded.
+    """
+    
+    def __init__(self, enabled: bool = None, percentile: float = None, max_in_flight: int = None,
+                 budget_ratio: float = None, min_delay: float = 0.2):
+        self.enabled = enabled if enabled is not None else os.environ.get('SCRAPER_HEDGE', '0') == '1'
+        self.percentile = percentile if percentile is not None else float(os.environ.get('HEDGE_PERCENTILE', 90))
+        self.max_in_flight = max_in_flight if max_in_flight is not None else int(os.environ.get('HEDGE_MAX_INFLIGHT', 4))
+        self.budget_ratio = budget_ratio if budget_ratio is not None else float(os.environ.get('HEDGE_BUDGET_RATIO', 0.1))
+        self.min_delay = min_delay
+        
+        self._lock = threading.Lock()
+        self._executor = None
+        self.in_flight = 0
+        self.primaries = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.hedges_denied = 0
+    
+    def delay_for(self, venue: str) -> Optional[float]:
+        """Seconds to wait before hedging a request to venue, None when it should not be hedged"""
+        if not self.enabled:
+            return None
+        latency = venue_health.latency_percentile(venue, self.percentile)
+        if latency is None:
+            return None
+        with self._lock:
+            self.primaries += 1
+        return max(self.min_delay, latency)
+    
+    def try_acquire(self) -> bool:
+        """Reserve a hedge slot if the in-flight cap and the traffic budget allow it"""
+        with self._lock:
+            if self.in_flight >= self.max_in_flight or self.hedges_sent >= self.budget_ratio * self.primaries:
+                self.hedges_denied += 1
+                return False
+            self.in_flight += 1
+            self.hedges_sent += 1
+            return True
+    
+    def release(self, won: bool):
+        with self._lock:
+            self.in_flight -= 1
+            if won:
+                self.hedges_won += 1
+    
+    @property
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Threads for the thread-engine's racing requests (created on first use)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=32, thread_name_prefix='hedge'
+                )
+            return self._executor
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'percentile': self.percentile,
+                'max_in_flight': self.max_in_flight,
+                'budget_ratio': self.budget_ratio,
+                'in_flight': self.in_flight,
+                'hedgeable_requests': self.primaries,
+                'hedges_sent': self.hedges_sent,
+                'hedges_won': self.hedges_won,
+                'hedges_denied': self.hedges_denied
+            }
+
+
+# Shared by every scraper instance in this process
+seating_cache = SeatingSnapshotCache()
+upstream_fetches = SingleFlight()
+form_cache = FormDiscoveryCache()
+session_pool = HTTPSessionPool()
+venue_health = VenueHealthMonitor()
+hedge_policy = HedgePolicy()
+upstream_governor = UpstreamGovernor()
+
+
+class StreamingSeatingParser(HTMLParser):
+    """
+    Incremental parser for the seating report. Feed it response chunks and
+    collect completed content-and-table blocks from pop_rooms() as soon as each
+    block closes, instead of waiting for the whole page and a full soup tree.
+    Mirrors the element selection of _extract_seating_data_ultra_fast_http.
+    """
+    
+    VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                     'link', 'meta', 'param', 'source', 'track', 'wbr'}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks_seen = 0
+        self._completed_rooms = []  # (heading_text or None, [row cell texts])
+        self._block = None          # state of the content-and-table block being parsed
+        self._stack = []            # open elements inside the block: (tag, kind, state)
+        self._open_cells = []       # text parts of every open <td> (nested cells included)
+        self._open_rows = []
+        self._open_tbodies = []
+        self._open_tables = []
+        self._heading_parts = None
+        self._pending_text = []     # raw pieces of the current text node (may span feed() calls)
+        self._raw_depth = 0         # inside <script>/<style>, whose text get_text() ignores
+    
+    def pop_rooms(self) -> List[Tuple[Optional[str], List[List[str]]]]:
+        """Return and forget the blocks completed since the last call"""
+        rooms, self._completed_rooms = self._completed_rooms, []
+        return rooms
+    
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if self._block is None:
+            if tag == 'div' and 'content-and-table' in (dict(attrs).get('class') or '').split():
+                self.blocks_seen += 1
+                self._block = {'info_found': False, 'heading': None, 'tables': []}
+                self._stack = [('div', 'block', None)]
+            return
+        
+        if tag in self.VOID_ELEMENTS:
+            return
+        
+        kind, state = None, None
+        block = self._block
+        if tag == 'div' and not block['info_found'] and dict(attrs).get('id') == 'datessesinfo':
+            block['info_found'] = True
+            kind = 'info'
+        elif tag == 'h4' and self._heading_parts is None and block['heading'] is None and \
+                any(kind == 'info' for _, kind, _ in self._stack):
+            self._heading_parts = []
+            kind = 'heading'
+        elif tag == 'table':
+            state = {'id': dict(attrs).get('id'), 'tbody': None, 'rows': []}
+            block['tables'].append(state)
+            self._open_tables.append(state)
+            kind = 'table'
+        elif tag == 'tbody':
+            state = []
+            for table in self._open_tables:
+                if table['tbody'] is None:
+                    table['tbody'] = state
+            self._open_tbodies.append(state)
+            kind = 'tbody'
+        elif tag == 'tr':
+            state = []
+            for table in self._open_tables:
+                table['rows'].append(state)
+            for tbody in self._open_tbodies:
+                tbody.append(state)
+            self._open_rows.append(state)
+            kind = 'row'
+        elif tag == 'td':
+            state = []
+            self._open_cells.append(state)
+            for row in self._open_rows:
+                row.append(state)
+            kind = 'cell'
+        elif tag in ('script', 'style'):
+            self._raw_depth += 1
+            kind = 'raw'
+        
+        self._stack.append((tag, kind, state))
+    
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if self._block is None:
+            return
+        
+        # Pop up to the matching open element, like BeautifulSoup's tree builder
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            if tag not in ('body', 'html'):
+                return
+            index = 0
+        
+        while len(self._stack) > index:
+            self._close_element(*self._stack.pop())
+    
+    def handle_data(self, data):
+        if self._block is not None:
+            self._pending_text.append(data)
+    
+    def handle_comment(self, data):
+        self._flush_text()
+    
+    def handle_decl(self, decl):
+        self._flush_text()
+    
+    def handle_pi(self, data):
+        self._flush_text()
+    
+    def _flush_text(self):
+        """Strip the finished text node and add it to every open cell/heading (get_text(strip=True) semantics)"""
+        if not self._pending_text:
+            return
+        text = ''.join(self._pending_text).strip()
+        self._pending_text = []
+        if not text or self._raw_depth:
+            return
+        for cell in self._open_cells:
+            cell.append(text)
+        if self._heading_parts is not None:
+            self._heading_parts.append(text)
+    
+    def close(self):
+        super().close()
+        self._flush_text()
+        while self._stack:
+            self._close_element(*self._stack.pop())
+    
+    def _close_element(self, tag, kind, state):
+        if kind == 'cell':
+            self._open_cells.remove(state)
+        elif kind == 'row':
+            self._open_rows.remove(state)
+        elif kind == 'tbody':
+            self._open_tbodies.remove(state)
+        elif kind == 'table':
+            self._open_tables.remove(state)
+        elif kind == 'heading':
+            self._block['heading'] = ''.join(self._heading_parts)
+            self._heading_parts = None
+        elif kind == 'raw':
+            self._raw_depth -= 1
+        elif kind == 'block':
+            self._finish_block()
+    
+    def _finish_block(self):
+        """Pick the room's table and rows exactly like the soup-based extractor"""
+        block, self._block = self._block, None
+        self._stack = []
+        self._open_cells, self._open_rows, self._open_tbodies, self._open_tables = [], [], [], []
+        self._heading_parts = None
+        self._raw_depth = 0
+        
+        tables = block['tables']
+        table = next((t for t in tables if t['id'] == 'maintable'), tables[0] if tables else None)
+        rows = []
+        if table is not None:
+            rows = (table['tbody'] if table['tbody'] is not None else table['rows'])[1:]
+        
+        row_cell_texts = [[''.join(parts) for parts in row[:6]] for row in rows]
+        self._completed_rooms.append((block['heading'], row_cell_texts))
+
 
 class SRMHTTPScraper:
-    def __init__(self, venue: str = "main"):
-        """Initialize the HTTP-based scraper."""
+    # Phrases that mark an empty report page (only when the page also has no records)
+    NO_RECORDS_INDICATORS = ('no records found', 'no data', 'no results')
+    
+    # Selectable HTML parser engines for seating pages:
+    #   html.parser - BeautifulSoup with the pure-Python parser (reference output)
+    #   lxml        - BeautifulSoup with the lxml tree builder
+    #   lxml-xpath  - raw lxml.html tree queried with XPath, no soup objects at all
+    #   strainer    - BeautifulSoup/html.parser building only div.content-and-table subtrees
+    PARSER_ENGINES = ('html.parser', 'lxml', 'lxml-xpath', 'strainer')
+    DEFAULT_PARSER_ENGINE = 'lxml-xpath' if LXML_AVAILABLE else 'html.parser'
+    
+    # Engines whose output was compared against html.parser on a live page: engine -> identical?
+    _verified_engines = {}
+    _verify_lock = threading.Lock()
+    
+    # Examcell host and the report page path of each venue
+    EXAMCELL_URL = "https://examcell.srmist.edu.in"
+    VENUE_PATHS = {
+        "main": "/main/seating/bench/get_datewise_report.php",
+        "tp": "/tp/seating/bench/get_datewise_report.php",
+        "bio": "/bio/seating/bench/get_datewise_report.php",
+        "ub": "/ub/seating/bench/get_datewise_report.php",
+        "tp2": "/tp2/bench/get_datewise_report.php"
+    }
+    
+    def __init__(self, venue: str = "main", streaming: bool = None, parser_engine: str = None,
+                 prescan: bool = None, base_url: str = None):
+        """Initialize the HTTP-based scraper.
+        base_url (or EXAMCELL_BASE_URL) replaces the examcell host, e.g. to point at examcell_standin.py."""
         # Define venue URLs
-        self.venue_urls = {
-            "main": "https://examcell.srmist.edu.in/main/seating/bench/get_datewise_report.php",
-            "tp": "https://examcell.srmist.edu.in/tp/seating/bench/get_datewise_report.php",
-            "bio": "https://examcell.srmist.edu.in/bio/seating/bench/get_datewise_report.php",
-            "ub": "https://examcell.srmist.edu.in/ub/seating/bench/get_datewise_report.php",
-            "tp2": "https://examcell.srmist.edu.in/tp2/bench/get_datewise_report.php"
-        }
+        examcell_url = (base_url or os.environ.get('EXAMCELL_BASE_URL') or self.EXAMCELL_URL).rstrip('/')
+        self.venue_urls = {name: examcell_url + path for name, path in self.VENUE_PATHS.items()}
         
         # Venue display names
         self.venue_names = {
@@ -42,147 +1005,668 @@ class SRMHTTPScraper:
         self.base_url = self.venue_urls.get(venue, self.venue_urls["main"])
         self.venue_name = self.venue_names.get(venue, "Main Campus")
         
-        # Create session with connection pooling
-        self.session = requests.Session()
-        
-        # Set headers to mimic a real browser
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'max-age=0'
-        })
-        
-        # Configure session for speed
-        adapter = requests.adapters.HTTPAdapter(
-            pool_connections=20,
-            pool_maxsize=20,
-            max_retries=2,
-            pool_block=False
-        )
-        self.session.mount('http://', adapter)
-        self.session.mount('https://', adapter)
-        
-        # Set timeouts
+        # Set timeouts (upper bound - the venue's observed latency usually gives a tighter one)
         self.timeout = (10, 30)  # connection timeout, read timeout
+        
+        # Streaming mode parses the response chunk by chunk instead of building a full soup
+        self.streaming = streaming if streaming is not None else os.environ.get('SCRAPER_STREAMING', '0') == '1'
+        self.stream_chunk_size = 16 * 1024
+        
+        # HTML parser engine for seating pages (see PARSER_ENGINES)
+        engine = (parser_engine or os.environ.get('SCRAPER_PARSER', self.DEFAULT_PARSER_ENGINE)).lower()
+        if engine not in self.PARSER_ENGINES or (engine in ('lxml', 'lxml-xpath') and not LXML_AVAILABLE):
+            engine = 'html.parser'
+        self.parser_engine = engine
+        
+        # Keep the raw body and parse lazily: roll-number lookups prescan the bytes first
+        self.prescan = prescan if prescan is not None else os.environ.get('SCRAPER_PRESCAN', '1') == '1'
     
-    def scrape_seating_data_fast(self, date: str, session_type: str) -> List[Dict]:
+    def scrape_seating_data_fast(self, date: str, session_type: str, use_cache: bool = True) -> List[Dict]:
         """Ultra-fast HTTP-based scraping using direct POST requests."""
-        try:
-            start_time = time.time()
-            print(f"🚀 HTTP Scraping {self.venue_name} - {date} {session_type}")
-            
-            # First, get the initial page to establish session and get any CSRF tokens
-            try:
-                initial_response = self.session.get(self.base_url, timeout=self.timeout)
-                initial_response.raise_for_status()
-            except Exception as e:
-                print(f"❌ Failed to load initial page for {self.venue_name}: {e}")
-                return []
-            
-            # Parse initial page to extract form action and any hidden fields
-            initial_soup = BeautifulSoup(initial_response.text, 'html.parser')
-            
-            # Find the form and its action URL
-            form = initial_soup.find('form')
-            form_action = 'fetch_data.php'  # Default action from the HTML
-            if form and form.get('action'):
-                form_action = form.get('action')
-            
-            # Construct the full URL for form submission
-            if not form_action.startswith('http'):
-                form_url = self.base_url.rsplit('/', 1)[0] + '/' + form_action.lstrip('/')
-            else:
-                form_url = form_action
-            
-            # Optional: Debug form action URL (comment out for production)
-            # print(f"🔧 Form action URL: {form_url}")
-            
-            # Prepare form data (note: field name is 'dated' not 'datepicker')
-            form_data = {
-                'dated': date,
-                'session': session_type,
-                'submit': 'Submit'
-            }
+        return self.scrape_seating_page(date, session_type, use_cache=use_cache).records
+    
+    def scrape_seating_page(self, date: str, session_type: str, use_cache: bool = True) -> SeatingPage:
+        """Scrape one venue/date/session page and return it with its registration index."""
+        if use_cache:
+            cached_page = seating_cache.get(self.venue, date, session_type)
+            if cached_page is not None:
+                print(f"💾 Cache hit {self.venue_name} - {date} {session_type} ({self._describe_page(cached_page)})")
+                return cached_page
             
-            # Look for any hidden fields in the form
-            if form:
-                hidden_inputs = form.find_all('input', type='hidden')
-                for hidden_input in hidden_inputs:
-                    name = hidden_input.get('name')
-                    value = hidden_input.get('value', '')
-                    if name:
-                        form_data[name] = value
+            # Concurrent misses share one lookup in the Redis tier
+            shared_key = ('shared', self.venue, date, session_type.upper())
+            shared_page = upstream_fetches.do(shared_key, lambda: self._load_shared_page(date, session_type))
+            if shared_page is not None:
+                return shared_page
             
-            # Add referer header
-            self.session.headers.update({
-                'Referer': self.base_url,
-                'Origin': self.base_url.rsplit('/', 1)[0]
-            })
+            snapshot_page = self._load_snapshot_page(date, session_type)
+            if snapshot_page is not None:
+                return snapshot_page
+        
+        stale_page = self._check_venue_available(date, session_type)
+        if stale_page is not None:
+            return stale_page
+        
+        # Concurrent searches for the same page share one upstream fetch
+        flight_key = (self.venue, date, session_type.upper())
+        return upstream_fetches.do(flight_key, lambda: self._fetch_seating_page(date, session_type, use_cache))
+    
+    def _load_shared_page(self, date: str, session_type: str) -> Optional[SeatingPage]:
+        """A page another instance scraped, from the Redis tier (None without REDIS_URL)"""
+        entry = shared_seating_cache.get(self.venue, date, session_type, parser=self._page_parser(date, session_type))
+        if entry is None:
+            return None
+        # Cached locally only for what is left of the shared entry, so instances expire it together
+        page, remaining = entry
+        print(f"🌐 Shared cache hit {self.venue_name} - {date} {session_type} ({self._describe_page(page)}, "
+              f"{remaining:.0f}s left)")
+        seating_cache.put(self.venue, date, session_type, page, ttl=remaining)
+        return page
+    
+    def _cache_page(self, date: str, session_type: str, page: SeatingPage):
+        """Store a freshly fetched page in the process cache and the shared Redis tier"""
+        seating_cache.put(self.venue, date, session_type, page)
+        shared_seating_cache.put(self.venue, date, session_type, page)
+    
+    def _load_snapshot_page(self, date: str, session_type: str):
+        """Cold start: serve the page from an on-disk snapshot when nothing (not even an
+        expired entry) is cached. It is cached like a scraped page and refreshed upstream after its TTL."""
+        if seating_cache.peek(self.venue, date, session_type) is not None:
+            return None
+        page = snapshot_store.page(self.venue, date, session_type)
+        if page is not None:
+            print(f"📀 Snapshot hit {self.venue_name} - {date} {session_type} ({self._describe_page(page)})")
+            seating_cache.put(self.venue, date, session_type, page)
+        return page
+    
+    def _check_venue_available(self, date: str, session_type: str) -> Optional[SeatingPage]:
+        """Circuit breaker gate: an expired cached page is served while the venue is down,
+        otherwise VenueUnavailableError propagates."""
+        try:
+            venue_health.before_request(self.venue)
+        except VenueUnavailableError:
+            stale_page = seating_cache.peek(self.venue, date, session_type)
+            if stale_page is None:
+                raise
+            print(f"🚫 {self.venue_name} unavailable - serving the expired cached page")
+            return stale_page
+        return None
+    
+    def refresh_seating_page(self, date: str, session_type: str) -> SeatingPage:
+        """Re-fetch one page and replace its cache entry, skipping the cache lookup.
+        Raises VenueUnavailableError while the venue's circuit is open."""
+        venue_health.before_request(self.venue)
+        flight_key = (self.venue, date, session_type.upper())
+        return upstream_fetches.do(flight_key, lambda: self._fetch_seating_page(date, session_type, True))
+    
+    def _fetch_seating_page(self, date: str, session_type: str, use_cache: bool) -> SeatingPage:
+        """Fetch, parse and (optionally) cache one page. Runs once per coalesced flight."""
+        if self.streaming:
+            outcome = {}
+            seating_data = list(self._stream_seating_data(date, session_type, outcome))
+            if not outcome.get('ok'):
+                seating_data = None
+            page = SeatingPage(self.venue, date, session_type, seating_data or [],
+                               digest=outcome.get('digest'), no_records=outcome.get('no_records', False))
+            # The stream was parsed as it arrived, but an unchanged page still keeps the cached page and its indexes
+            previous_page = seating_cache.peek(self.venue, date, session_type)
+            if page.digest is not None and previous_page is not None and previous_page.digest == page.digest:
+                print(f"♻️ {self.venue_name} - {date} {session_type} unchanged, keeping the parsed page")
+                page = previous_page
+        else:
+            page = self._scrape_seating_page_uncached(date, session_type)
+        
+        # Records and "no records" answers are cached; failures and empty responses are re-fetched
+        if use_cache and (page.no_records or not page.is_parsed or len(page)):
+            self._cache_page(date, session_type, page)
+        
+        return page
+    
+    @classmethod
+    def _mentions_no_records(cls, text) -> bool:
+        """True when text (str or bytes) contains a "no records" phrase. Every engine calls this and
+        marks a page no_records only if it also yielded no records, so a "no data" footer under
+        real seating tables never turns a page into a cached "no records" answer."""
+        text = text.lower()
+        if isinstance(text, bytes):
+            return any(indicator.encode('ascii') in text for indicator in cls.NO_RECORDS_INDICATORS)
+        return any(indicator in text for indicator in cls.NO_RECORDS_INDICATORS)
+    
+    @staticmethod
+    def _describe_page(page: SeatingPage) -> str:
+        if page.no_records:
+            return "no records"
+        return f"{len(page)} records" if page.is_parsed else "unparsed"
+    
+    def iter_seating_data(self, date: str, session_type: str, use_cache: bool = True) -> Iterator[Dict]:
+        """
+        Yield seat records room by room while the response is still streaming in.
+        Callers can stop iterating as soon as they have what they need; the page is
+        only cached when it was consumed completely.
+        """
+        if use_cache:
+            # Explicit None checks: a cached "no records" page is empty, so it is falsy
+            cached_page = seating_cache.get(self.venue, date, session_type)
+            if cached_page is None:
+                cached_page = self._load_shared_page(date, session_type)
+            if cached_page is None:
+                cached_page = self._load_snapshot_page(date, session_type)
+            if cached_page is not None:
+                yield from cached_page.iter_records()
+                return
+        
+        stale_page = self._check_venue_available(date, session_type)
+        if stale_page is not None:
+            yield from stale_page.iter_records()
+            return
+        
+        outcome = {}
+        records = []
+        for record in self._stream_seating_data(date, session_type, outcome):
+            records.append(record)
+            yield record
+        
+        if use_cache and outcome.get('ok') and (records or outcome.get('no_records')):
+            self._cache_page(date, session_type,
+                             SeatingPage(self.venue, date, session_type, records, digest=outcome.get('digest'),
+                                         no_records=outcome.get('no_records', False)))
+    
+    def _stream_seating_data(self, date: str, session_type: str, outcome: Dict) -> Iterator[Dict]:
+        """Fetch one page with a streamed POST and yield records as content-and-table blocks complete.
+        Sets outcome['ok'] once the whole page was read successfully, with the body's outcome['digest']."""
+        start_time = time.time()
+        print(f"🚀 HTTP Streaming {self.venue_name} - {date} {session_type}")
+        
+        # The upstream slot covers the streamed POST and the whole body read
+        with session_pool.session(self.venue) as session, ExitStack() as upstream_slot:
+            form_info = form_cache.get(self.base_url)
+            form_from_cache = form_info is not None
+            if not form_from_cache:
+                form_info = self._discover_form(session)
+                if form_info is None:
+                    return
             
-            print(f"⚡ Initial page loaded in {time.time() - start_time:.2f}s")
+            upstream_slot.enter_context(upstream_governor.slot(self.venue))
+            response = self._submit_form(session, form_info, date, session_type, stream=True)
+            if response is None and form_from_cache:
+                # The cached form may be stale - rediscover it and retry once
+                upstream_slot.close()  # discovery takes its own slot
+                form_cache.invalidate(self.base_url)
+                form_info = self._discover_form(session)
+                if form_info is None:
+                    return
+                upstream_slot.enter_context(upstream_governor.slot(self.venue))
+                response = self._submit_form(session, form_info, date, session_type, stream=True)
+            if response is None:
+                return
             
-            # Submit the form with POST request to the correct form action URL
             try:
-                response = self.session.post(
-                    form_url,
-                    data=form_data,
-                    timeout=self.timeout,
-                    allow_redirects=True
-                )
-                response.raise_for_status()
+                parser = StreamingSeatingParser()
+                decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+                current_time = datetime.now().isoformat()
+                indicator_window = max(len(indicator) for indicator in self.NO_RECORDS_INDICATORS)
+                buffered_chunks = []  # kept only until the first block shows up, for the fallback extractor
+                tail = ''
+                mentions_no_records = False
+                record_count = 0
+                # Same digest as _page_from_body computes over the buffered body
+                body_hash = hashlib.blake2b(digest_size=16)
                 
-                print(f"✅ Form submitted in {time.time() - start_time:.2f}s")
+                for raw_chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+                    body_hash.update(raw_chunk)
+                    chunk = decoder.decode(raw_chunk)
+                    
+                    # Same "no data" check as the buffered path; it only matters while no record is out
+                    if record_count == 0 and not mentions_no_records:
+                        window = tail + chunk
+                        mentions_no_records = self._mentions_no_records(window)
+                        tail = window[-indicator_window:]
+                    
+                    if buffered_chunks is not None:
+                        buffered_chunks.append(chunk)
+                    parser.feed(chunk)
+                    if parser.blocks_seen:
+                        buffered_chunks = None
+                    
+                    for record in self._records_from_rooms(parser.pop_rooms(), date, session_type, current_time):
+                        record_count += 1
+                        yield record
                 
+                tail_chunk = decoder.decode(b'', final=True)
+                if buffered_chunks is not None:
+                    buffered_chunks.append(tail_chunk)
+                parser.feed(tail_chunk)
+                parser.close()
+                for record in self._records_from_rooms(parser.pop_rooms(), date, session_type, current_time):
+                    record_count += 1
+                    yield record
+                
+                if not parser.blocks_seen:
+                    # No content-and-table blocks - hand the buffered page to the regular parser
+                    for record in self._parse_seating_response(''.join(buffered_chunks), date, session_type, start_time):
+                        record_count += 1
+                        yield record
+                else:
+                    print(f"🎯 Streamed {record_count} records from {self.venue_name} in {time.time() - start_time:.2f}s")
+                if record_count == 0 and mentions_no_records:
+                    print(f"📝 No records found for {self.venue_name}")
+                    outcome['no_records'] = True
+                outcome['digest'] = body_hash.hexdigest()
+                outcome['ok'] = True
             except Exception as e:
-                print(f"❌ Form submission failed for {self.venue_name}: {e}")
-                return []
-            
-            # Parse the response
-            if not response.text:
-                print(f"⚠️ Empty response from {self.venue_name}")
-                return []
-            
-            # Check for common "no data" indicators
-            response_text_lower = response.text.lower()
-            if any(indicator in response_text_lower for indicator in ['no records found', 'no data', 'no results']):
-                print(f"📝 No records found for {self.venue_name}")
-                return []
-            
-            # Optional: Debug response information (comment out for production)
-            # print(f"🔧 Response length: {len(response.text)} chars")
-            # if '.content-and-table' in response.text:
-            #     print(f"🔧 Found .content-and-table in response")
-            # if 'maintable' in response.text:
-            #     print(f"🔧 Found maintable in response")
-            # if 'datessesinfo' in response.text:
-            #     print(f"🔧 Found datessesinfo in response")
+                print(f"❌ HTTP streaming failed for {self.venue_name}: {e}")
+            finally:
+                response.close()
+    
+    def _records_from_rooms(self, rooms, date: str, session_type: str, current_time: str) -> Iterator[Dict]:
+        """Records for blocks completed by the streaming parser"""
+        for heading, row_cell_texts in rooms:
+            if heading is None:
+                continue
+            room_info = self._parse_room_heading(heading)
+            if not room_info:
+                continue
+            yield from self._room_records(room_info, row_cell_texts, date, session_type, current_time)
+    
+    def _scrape_seating_page_uncached(self, date: str, session_type: str) -> SeatingPage:
+        """Fetch one venue/date/session page. Failed fetches give an empty page."""
+        try:
+            start_time = time.time()
+            response = self._fetch_seating_response(date, session_type, start_time)
+            if response is None:
+                return SeatingPage(self.venue, date, session_type, [])
             
-            # Parse HTML and extract data
-            soup = BeautifulSoup(response.text, 'html.parser')
+            return self._page_from_body(response.content, response.encoding, date, session_type, start_time)
             
-            # Optional: Debug HTML saving (comment out for production)
-            # debug_filename = f"debug_{self.venue}_{date.replace('/', '-')}_{session_type}.html"
-            # try:
-            #     with open(debug_filename, 'w', encoding='utf-8') as f:
-            #         f.write(response.text)
-            #     print(f"🔧 Debug HTML saved to {debug_filename}")
-            # except:
-            #     pass
+        except Exception as e:
+            print(f"❌ HTTP scraping failed for {self.venue_name}: {e}")
+            return SeatingPage(self.venue, date, session_type, [])
+    
+    def fetch_raw_page(self, date: str, session_type: str) -> Optional[bytes]:
+        """Raw form-action response body for one date/session (no parsing, no cache), None on failure."""
+        response = self._fetch_seating_response(date, session_type, time.time())
+        return response.content if response is not None else None
+    
+    def _fetch_seating_response(self, date: str, session_type: str, start_time: float) -> Optional[requests.Response]:
+        """Run the GET+POST sequence for one page. Returns None when the fetch failed."""
+        print(f"🚀 HTTP Scraping {self.venue_name} - {date} {session_type}")
+        
+        # Reuse the cached form action and hidden fields when we have them
+        form_info = form_cache.get(self.base_url)
+        if form_info is not None and hedge_policy.enabled:
+            response = self._submit_form_hedged(form_info, date, session_type)
+            if response is not None:
+                print(f"✅ Form submitted in {time.time() - start_time:.2f}s")
+                return response
+            # The cached form may be stale - fall through to rediscovery
+            form_cache.invalidate(self.base_url)
+            form_info = None
+        
+        # One pooled session serves the whole GET+POST sequence so cookies carry over
+        with session_pool.session(self.venue) as session:
+            form_from_cache = form_info is not None
+            if not form_from_cache:
+                form_info = self._discover_form(session)
+                if form_info is None:
+                    return None
+                print(f"⚡ Initial page loaded in {time.time() - start_time:.2f}s")
             
-            seating_data = self._extract_seating_data_http(soup, date, session_type)
+            response = self._submit_form(session, form_info, date, session_type)
+            if response is None and form_from_cache:
+                # The cached form may be stale - rediscover it and retry once
+                form_cache.invalidate(self.base_url)
+                form_info = self._discover_form(session)
+                if form_info is None:
+                    return None
+                response = self._submit_form(session, form_info, date, session_type)
             
-            extraction_time = time.time() - start_time
-            print(f"🎯 Extracted {len(seating_data)} records from {self.venue_name} in {extraction_time:.2f}s")
+            if response is None:
+                return None
+        
+        print(f"✅ Form submitted in {time.time() - start_time:.2f}s")
+        return response
+    
+    def _page_from_body(self, body: bytes, encoding: Optional[str], date: str, session_type: str,
+                        start_time: float) -> SeatingPage:
+        """Turn a response body into a SeatingPage (shared by all fetch engines).
+        An unchanged body reuses the cached page, parse and index included."""
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        previous_page = seating_cache.peek(self.venue, date, session_type)
+        if previous_page is not None and previous_page.digest == digest:
+            print(f"♻️ {self.venue_name} - {date} {session_type} unchanged, keeping the parsed page")
+            return previous_page
+        
+        if not body:
+            print(f"⚠️ Empty response from {self.venue_name}")
+            return SeatingPage(self.venue, date, session_type, [])
+        
+        # A page mentioning "no data" is parsed now: it is a "no records" answer only without records
+        if not self.prescan or self._mentions_no_records(body):
+            response_text = body.decode(encoding or 'utf-8', errors='replace')
+            seating_data = self._parse_seating_response(response_text, date, session_type, start_time)
+            no_records = not seating_data and self._mentions_no_records(body)
+            if no_records:
+                print(f"📝 No records found for {self.venue_name}")
+            return SeatingPage(self.venue, date, session_type, seating_data, digest=digest, no_records=no_records)
+        
+        return SeatingPage(self.venue, date, session_type, raw_html=body, encoding=encoding,
+                           parser=self._page_parser(date, session_type), digest=digest)
+    
+    def _page_parser(self, date: str, session_type: str):
+        """Extraction callback for lazily parsed pages (failures give no records)"""
+        def parse(text: str) -> List[Dict]:
+            try:
+                return self._extract_with_parser_engine(text, date, session_type)
+            except Exception as e:
+                print(f"❌ Parsing failed for {self.venue_name}: {e}")
+                return []
+        return parse
+    
+    def _parse_seating_response(self, response_text: str, date: str, session_type: str, start_time: float) -> List[Dict]:
+        """Turn the form-action response body into seating records (shared by all fetch engines)."""
+        # Parse the response
+        if not response_text:
+            print(f"⚠️ Empty response from {self.venue_name}")
+            return []
+        
+        # Optional: Debug response information (comment out for production)
+        # print(f"🔧 Response length: {len(response_text)} chars")
+        # if '.content-and-table' in response_text:
+        #     print(f"🔧 Found .content-and-table in response")
+        # if 'maintable' in response_text:
+        #     print(f"🔧 Found maintable in response")
+        # if 'datessesinfo' in response_text:
+        #     print(f"🔧 Found datessesinfo in response")
+        
+        # Optional: Debug HTML saving (comment out for production)
+        # debug_filename = f"debug_{self.venue}_{date.replace('/', '-')}_{session_type}.html"
+        # try:
+        #     with open(debug_filename, 'w', encoding='utf-8') as f:
+        #         f.write(response_text)
+        #     print(f"🔧 Debug HTML saved to {debug_filename}")
+        # except:
+        #     pass
+        
+        # Parse HTML and extract data with the configured engine
+        seating_data = self._extract_with_parser_engine(response_text, date, session_type)
+        
+        extraction_time = time.time() - start_time
+        print(f"🎯 Extracted {len(seating_data)} records from {self.venue_name} in {extraction_time:.2f}s")
+        
+        return seating_data
+    
+    def _discover_form(self, session: requests.Session) -> Optional[Tuple[str, Dict[str, str]]]:
+        """GET the report page, find the form action URL and hidden fields, and cache them.
+        Concurrent discoveries of the same page (from either engine) share one GET."""
+        return upstream_fetches.do(('form', self.base_url), lambda: self._load_form(session))
+    
+    def _load_form(self, session: requests.Session) -> Optional[Tuple[str, Dict[str, str]]]:
+        # First, get the initial page to establish session and get any CSRF tokens
+        try:
+            with upstream_governor.slot(self.venue):
+                request_start = time.time()
+                initial_response = session.get(self.base_url, timeout=self._request_timeout())
+                initial_response.raise_for_status()
+                venue_health.record_success(self.venue, time.time() - request_start, closes_circuit=False)
+        except Exception as e:
+            venue_health.record_failure(self.venue)
+            print(f"❌ Failed to load initial page for {self.venue_name}: {e}")
+            return None
+        
+        form_info = self._parse_form_html(initial_response.text)
+        form_cache.put(self.base_url, form_info)
+        return form_info
+    
+    def _parse_form_html(self, html: str) -> Tuple[str, Dict[str, str]]:
+        """Find the report form's action URL and hidden fields in the initial page."""
+        # Parse initial page to extract form action and any hidden fields
+        initial_soup = BeautifulSoup(html, 'html.parser')
+        
+        # Find the form and its action URL
+        form = initial_soup.find('form')
+        form_action = 'fetch_data.php'  # Default action from the HTML
+        if form and form.get('action'):
+            form_action = form.get('action')
+        
+        # Construct the full URL for form submission
+        if not form_action.startswith('http'):
+            form_url = self.base_url.rsplit('/', 1)[0] + '/' + form_action.lstrip('/')
+        else:
+            form_url = form_action
+        
+        # Look for any hidden fields in the form
+        hidden_fields = {}
+        if form:
+            hidden_inputs = form.find_all('input', type='hidden')
+            for hidden_input in hidden_inputs:
+                name = hidden_input.get('name')
+                value = hidden_input.get('value', '')
+                if name:
+                    hidden_fields[name] = value
+        
+        return form_url, hidden_fields
+    
+    def _build_form_request(self, form_info: Tuple[str, Dict[str, str]], date: str,
+                            session_type: str) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+        """Form URL, POST fields and per-request headers for one date/session."""
+        form_url, hidden_fields = form_info
+        
+        # Prepare form data (note: field name is 'dated' not 'datepicker')
+        form_data = {
+            'dated': date,
+            'session': session_type,
+            'submit': 'Submit'
+        }
+        form_data.update(hidden_fields)
+        
+        # Referer/Origin are per request - the pooled session's headers stay untouched
+        request_headers = {
+            'Referer': self.base_url,
+            'Origin': self.base_url.rsplit('/', 1)[0]
+        }
+        return form_url, form_data, request_headers
+    
+    def _submit_form(self, session: requests.Session, form_info: Tuple[str, Dict[str, str]],
+                     date: str, session_type: str, stream: bool = False) -> Optional[requests.Response]:
+        """POST the report form. Returns None when the submission failed.
+        Streamed POSTs must be made while holding an upstream_governor slot for the whole read."""
+        if stream:
+            return self._post_form(session, form_info, date, session_type, stream=True)
+        with upstream_governor.slot(self.venue):
+            return self._post_form(session, form_info, date, session_type)
+    
+    def _post_form(self, session: requests.Session, form_info: Tuple[str, Dict[str, str]],
+                   date: str, session_type: str, stream: bool = False) -> Optional[requests.Response]:
+        form_url, form_data, request_headers = self._build_form_request(form_info, date, session_type)
+        
+        # Submit the form with POST request to the correct form action URL
+        try:
+            request_start = time.time()
+            response = session.post(
+                form_url,
+                data=form_data,
+                headers=request_headers,
+                timeout=self._request_timeout(),
+                allow_redirects=True,
+                stream=stream
+            )
+            response.raise_for_status()
+            venue_health.record_success(self.venue, time.time() - request_start)
+            return response
+        except Exception as e:
+            venue_health.record_failure(self.venue)
+            print(f"❌ Form submission failed for {self.venue_name}: {e}")
+            return None
+    
+    def _submit_form_hedged(self, form_info: Tuple[str, Dict[str, str]], date: str,
+                            session_type: str) -> Optional[requests.Response]:
+        """POST the form; if it is slower than the venue's latency percentile, race a duplicate
+        POST on another pooled session and keep whichever succeeds first."""
+        def attempt(holding_slot: threading.Event = None):
+            with session_pool.session(self.venue) as attempt_session:
+                with upstream_governor.slot(self.venue):
+                    if holding_slot is not None:
+                        holding_slot.set()
+                    return self._post_form(attempt_session, form_info, date, session_type)
+        
+        delay = hedge_policy.delay_for(self.venue)
+        if delay is None:
+            return attempt()
+        
+        # The hedge delay runs from when the primary holds its governor slot: time queued
+        # behind other requests is not upstream latency and must never trigger a hedge
+        holding_slot = threading.Event()
+        primary = hedge_policy.executor.submit(attempt, holding_slot)
+        primary.add_done_callback(lambda _: holding_slot.set())
+        holding_slot.wait()
+        try:
+            return primary.result(timeout=delay)
+        except concurrent.futures.TimeoutError:
+            pass
+        if not hedge_policy.try_acquire():
+            return primary.result()
+        
+        print(f"🏁 Hedging slow request to {self.venue_name} after {delay:.2f}s")
+        hedge = hedge_policy.executor.submit(attempt)
+        hedge_won = False
+        try:
+            pending = {primary, hedge}
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    response = future.result()
+                    if response is not None:
+                        hedge_won = future is hedge
+                        # The other request can't be interrupted mid-read; it finishes in the
+                        # background and its response is dropped
+                        for loser in pending:
+                            loser.cancel()
+                        return response
+            return None
+        finally:
+            if hedge.done():
+                hedge_policy.release(hedge_won)
+            else:
+                hedge.add_done_callback(lambda _: hedge_policy.release(False))
+    
+    def _request_timeout(self) -> Tuple[float, float]:
+        """Adaptive per-venue timeout, never above the fixed self.timeout"""
+        return venue_health.timeout_for(self.venue, self.timeout)
+    
+    def _extract_with_parser_engine(self, response_text: str, date: str, session_type: str) -> List[Dict]:
+        """Extract seating data using the configured parser engine.
+        The first page a non-reference engine parses in this process is also parsed with
+        html.parser; on any difference the engine is disabled and html.parser is used."""
+        engine = self.parser_engine
+        if engine == 'html.parser' or SRMHTTPScraper._verified_engines.get(engine) is False:
+            return self._extract_seating_data_http(BeautifulSoup(response_text, 'html.parser'), date, session_type)
+        
+        seating_data = self._extract_seating_data_engine(engine, response_text, date, session_type)
+        
+        if engine not in SRMHTTPScraper._verified_engines:
+            with SRMHTTPScraper._verify_lock:
+                if engine not in SRMHTTPScraper._verified_engines:
+                    reference = self._extract_seating_data_http(BeautifulSoup(response_text, 'html.parser'), date, session_type)
+                    identical = self._records_identical(seating_data, reference)
+                    SRMHTTPScraper._verified_engines[engine] = identical
+                    if not identical:
+                        print(f"⚠️ Parser engine '{engine}' differs from html.parser on {self.venue_name} - falling back to html.parser")
+                        return reference
+        
+        return seating_data
+    
+    def _extract_seating_data_engine(self, engine: str, response_text: str, date: str, session_type: str) -> List[Dict]:
+        """Run one specific parser engine over a response body"""
+        if engine == 'lxml':
+            return self._extract_seating_data_http(BeautifulSoup(response_text, 'lxml'), date, session_type)
+        
+        if engine == 'strainer':
+            # Only div.content-and-table subtrees are built; other pages need the full tree
+            only_rooms = SoupStrainer('div', class_='content-and-table')
+            soup = BeautifulSoup(response_text, 'html.parser', parse_only=only_rooms)
+            if soup.find('div', class_='content-and-table'):
+                return self._extract_seating_data_ultra_fast_http(soup, date, session_type)
+            return self._extract_seating_data_http(BeautifulSoup(response_text, 'html.parser'), date, session_type)
+        
+        if engine == 'lxml-xpath':
+            seating_data = self._extract_seating_data_lxml_xpath(response_text, date, session_type)
+            if seating_data is not None:
+                return seating_data
+        
+        return self._extract_seating_data_http(BeautifulSoup(response_text, 'html.parser'), date, session_type)
+    
+    def _extract_seating_data_lxml_xpath(self, response_text: str, date: str, session_type: str) -> Optional[List[Dict]]:
+        """XPath version of _extract_seating_data_ultra_fast_http over a raw lxml tree.
+        Returns None when the page has no content-and-table blocks (or lxml cannot parse it)."""
+        try:
+            root = lxml.html.document_fromstring(response_text)
+        except Exception as e:
+            print(f"⚠️ lxml could not parse {self.venue_name} page: {e}")
+            return None
+        
+        content_divs = root.xpath("//div[contains(concat(' ', normalize-space(@class), ' '), ' content-and-table ')]")
+        if not content_divs:
+            return None
+        
+        def text_of(element) -> str:
+            # Same as BeautifulSoup get_text(strip=True): strip every text node and join
+            # (script/style contents are not text to BeautifulSoup either)
+            if len(element) == 0:
+                return (element.text or '').strip()
+            return ''.join(text.strip() for text in element.xpath(
+                ".//text()[not(parent::script) and not(parent::style)]"))
+        
+        seating_data = []
+        current_time = datetime.now().isoformat()
+        for div in content_divs:
+            headings = div.xpath("((.//div[@id='datessesinfo'])[1]//h4)[1]")
+            if not headings:
+                continue
+            room_info = self._parse_room_heading(text_of(headings[0]))
+            if not room_info:
+                continue
             
-            return seating_data
+            tables = div.xpath("(.//table[@id='maintable'])[1]") or div.xpath("(.//table)[1]")
+            if not tables:
+                continue
+            tbodies = tables[0].xpath("(.//tbody)[1]")
+            rows = (tbodies[0] if tbodies else tables[0]).xpath('.//tr')[1:]
             
-        except Exception as e:
-            print(f"❌ HTTP scraping failed for {self.venue_name}: {e}")
-            return []
+            row_cell_texts = ([text_of(cell) for cell in row.iter('td')][:6] for row in rows)
+            seating_data.extend(self._room_records(room_info, row_cell_texts, date, session_type, current_time))
+        
+        return seating_data
+    
+    @staticmethod
+    def _records_identical(records: List[Dict], reference: List[Dict]) -> bool:
+        """Compare two extractions, ignoring the extraction timestamp"""
+        if len(records) != len(reference):
+            return False
+        return all(
+            {k: v for k, v in record.items() if k != 'extracted_at'} ==
+            {k: v for k, v in expected.items() if k != 'extracted_at'}
+            for record, expected in zip(records, reference)
+        )
+    
+    def check_parser_engines(self, response_text: str, date: str, session_type: str) -> Dict[str, Dict]:
+        """Run every available parser engine over a page and compare it with html.parser."""
+        start_time = time.perf_counter()
+        # Same full pipeline _extract_with_parser_engine verifies against, fallback layout included
+        reference = self._extract_seating_data_http(BeautifulSoup(response_text, 'html.parser'), date, session_type)
+        report = {'html.parser': {'identical': True, 'records': len(reference),
+                                  'seconds': round(time.perf_counter() - start_time, 4)}}
+        
+        for engine in self.PARSER_ENGINES[1:]:
+            if engine in ('lxml', 'lxml-xpath') and not LXML_AVAILABLE:
+                continue
+            start_time = time.perf_counter()
+            seating_data = self._extract_seating_data_engine(engine, response_text, date, session_type)
+            report[engine] = {
+                'identical': self._records_identical(seating_data, reference),
+                'records': len(seating_data),
+                'seconds': round(time.perf_counter() - start_time, 4)
+            }
+        return report
     
     def _extract_seating_data_http(self, soup: BeautifulSoup, date: str, session_type: str) -> List[Dict]:
         """Extract seating data from BeautifulSoup object - matches Playwright scraper logic."""
@@ -217,8 +1701,6 @@ class SRMHTTPScraper:
         
         # Pre-calculate common values for performance
         current_time = datetime.now().isoformat()
-        venue_code = self.venue
-        venue_name = self.venue_name
         
         for div in content_divs:
             # Ultra-fast room info extraction (same as Playwright)
@@ -243,55 +1725,68 @@ class SRMHTTPScraper:
                 all_rows = table.find_all('tr')
                 rows = all_rows[1:] if len(all_rows) > 1 else []
             
-            # Pre-extract room details for batch processing
-            room_number = room_info['room_number']
-            exam_date = room_info['exam_date']
-            exam_session = room_info['session']
-            
             # Optional: Debug row processing (comment out for production)
-            # print(f"🔧 Processing {len(rows)} rows for room {room_number}")
+            # print(f"🔧 Processing {len(rows)} rows for room {room_info['room_number']}")
             
-            # Batch process all rows for maximum speed
-            for row in rows:
-                cells = row.find_all('td')
-                if len(cells) >= 6:
-                    # Ultra-fast text extraction using get_text with strip
-                    cell_texts = [cell.get_text(strip=True) for cell in cells[:6]]
-                    
-                    # First student (left side)
-                    if cell_texts[0] and cell_texts[1] and cell_texts[2]:
-                        seating_data.append({
-                            'date': date,
-                            'session': session_type,
-                            'room_number': room_number,
-                            'exam_date': exam_date,
-                            'exam_session': exam_session,
-                            'department': cell_texts[0],
-                            'seat_number': cell_texts[1],
-                            'registration_number': cell_texts[2],
-                            'venue_code': venue_code,
-                            'venue_name': venue_name,
-                            'extracted_at': current_time
-                        })
-                    
-                    # Second student (right side)
-                    if cell_texts[3] and cell_texts[4] and cell_texts[5]:
-                        seating_data.append({
-                            'date': date,
-                            'session': session_type,
-                            'room_number': room_number,
-                            'exam_date': exam_date,
-                            'exam_session': exam_session,
-                            'department': cell_texts[3],
-                            'seat_number': cell_texts[4],
-                            'registration_number': cell_texts[5],
-                            'venue_code': venue_code,
-                            'venue_name': venue_name,
-                            'extracted_at': current_time
-                        })
+            # Ultra-fast text extraction using get_text with strip (first 6 cells per row)
+            row_cell_texts = (
+                [cell.get_text(strip=True) for cell in row.find_all('td')[:6]]
+                for row in rows
+            )
+            seating_data.extend(self._room_records(room_info, row_cell_texts, date, session_type, current_time))
         
         return seating_data
     
+    def _room_records(self, room_info: Dict, row_cell_texts, date: str, session_type: str, current_time: str) -> List[Dict]:
+        """Turn a room's 6-cell rows into records - two students per bench row."""
+        room_records = []
+        
+        # Pre-extract room details for batch processing
+        room_number = room_info['room_number']
+        exam_date = room_info['exam_date']
+        exam_session = room_info['session']
+        venue_code = self.venue
+        venue_name = self.venue_name
+        
+        # Batch process all rows for maximum speed
+        for cell_texts in row_cell_texts:
+            if len(cell_texts) < 6:
+                continue
+            
+            # First student (left side)
+            if cell_texts[0] and cell_texts[1] and cell_texts[2]:
+                room_records.append({
+                    'date': date,
+                    'session': session_type,
+                    'room_number': room_number,
+                    'exam_date': exam_date,
+                    'exam_session': exam_session,
+                    'department': cell_texts[0],
+                    'seat_number': cell_texts[1],
+                    'registration_number': cell_texts[2],
+                    'venue_code': venue_code,
+                    'venue_name': venue_name,
+                    'extracted_at': current_time
+                })
+            
+            # Second student (right side)
+            if cell_texts[3] and cell_texts[4] and cell_texts[5]:
+                room_records.append({
+                    'date': date,
+                    'session': session_type,
+                    'room_number': room_number,
+                    'exam_date': exam_date,
+                    'exam_session': exam_session,
+                    'department': cell_texts[3],
+                    'seat_number': cell_texts[4],
+                    'registration_number': cell_texts[5],
+                    'venue_code': venue_code,
+                    'venue_name': venue_name,
+                    'extracted_at': current_time
+                })
+        
+        return room_records
+    
     def _extract_room_info_ultra_fast_http(self, div) -> Dict:
         """Ultra-fast room information extraction matching Playwright scraper exactly."""
         try:
@@ -303,8 +1798,14 @@ class SRMHTTPScraper:
             if not h4:
                 return None
                 
-            h4_text = h4.get_text(strip=True)
-            
+            return self._parse_room_heading(h4.get_text(strip=True))
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _parse_room_heading(h4_text: str) -> Dict:
+        """Parse 'ROOM NO: ... DATE : ... SESSION : ...' heading text into room info."""
+        try:
             # Ultra-fast string parsing without regex for common patterns
             room_number = "Unknown"
             exam_date = "Unknown"
@@ -593,9 +2094,286 @@ class SRMHTTPScraper:
         return fallback_data
     
     def close_session(self):
-        """Close the HTTP session"""
-        if self.session:
-            self.session.close()
+        """Kept for compatibility - HTTP sessions are pooled process-wide and stay open for reuse"""
+        pass
+
+class AsyncFetchEngine:
+    """
+    asyncio/aiohttp fetch engine for the venue x session fan-out.
+    One long-lived event loop runs in a daemon thread, so every GET/POST is in
+    flight at once (bounded by a semaphore) and keep-alive connections are reused
+    across searches. Pages follow the SRMHTTPScraper.scrape_seating_page contract
+    and share its snapshot cache, form cache and request coalescing.
+    """
+    
+    def __init__(self, max_concurrency: int = None):
+        self.max_concurrency = max_concurrency if max_concurrency is not None else \
+            int(os.environ.get('ASYNC_MAX_CONCURRENCY', 10))
+        self._loop = None
+        self._thread = None
+        self._http = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.fetches = 0
+    
+    def _ensure_started(self):
+        """Start the engine's event loop thread on first use"""
+        with self._lock:
+            if self._loop is not None:
+                return
+            if not AIOHTTP_AVAILABLE:
+                raise RuntimeError("aiohttp is not installed - use the thread-pool fetch engine")
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='async-fetch-engine', daemon=True)
+            thread.start()
+            self._loop = loop
+            self._thread = thread
+    
+    async def _get_http_session(self) -> 'aiohttp.ClientSession':
+        """Long-lived client session, created lazily on the engine loop"""
+        if self._http is None or self._http.closed:
+            # aiohttp only decodes brotli when the optional package is present
+            headers = dict(BROWSER_HEADERS, **{'Accept-Encoding': 'gzip, deflate'})
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._http = aiohttp.ClientSession(
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(sock_connect=10, sock_read=30),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency * 2),
+                cookie_jar=aiohttp.CookieJar(unsafe=True)
+            )
+        return self._http
+    
+    def submit(self, venue: str, date: str, session_type: str, use_cache: bool = True) -> concurrent.futures.Future:
+        """Schedule one page fetch on the engine loop. The future resolves to a SeatingPage."""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(
+            self.scrape_seating_page(venue, date, session_type, use_cache=use_cache),
+            self._loop
+        )
+    
+    def scrape_pages(self, tasks: List[Tuple[str, str, str]], use_cache: bool = True) -> Dict[Tuple[str, str, str], SeatingPage]:
+        """Fetch many (venue, date, session) pages concurrently and wait for all of them."""
+        futures = {self.submit(venue, date, session_type, use_cache=use_cache): (venue, date, session_type)
+                   for venue, date, session_type in tasks}
+        return {task: future.result() for future, task in futures.items()}
+    
+    async def scrape_seating_data_fast(self, venue: str, date: str, session_type: str, use_cache: bool = True) -> List[Dict]:
+        """Async counterpart of SRMHTTPScraper.scrape_seating_data_fast"""
+        page = await self.scrape_seating_page(venue, date, session_type, use_cache=use_cache)
+        return page.records
+    
+    async def scrape_seating_page(self, venue: str, date: str, session_type: str, use_cache: bool = True) -> SeatingPage:
+        """Async counterpart of SRMHTTPScraper.scrape_seating_page"""
+        scraper = SRMHTTPScraper(venue=venue)
+        if use_cache:
+            cached_page = seating_cache.get(scraper.venue, date, session_type)
+            if cached_page is not None:
+                print(f"💾 Cache hit {scraper.venue_name} - {date} {session_type} ({scraper._describe_page(cached_page)})")
+                return cached_page
+            
+            if shared_seating_cache.available:
+                shared_page = await asyncio.get_running_loop().run_in_executor(
+                    None, scraper._load_shared_page, date, session_type)
+                if shared_page is not None:
+                    return shared_page
+            
+            snapshot_page = scraper._load_snapshot_page(date, session_type)
+            if snapshot_page is not None:
+                return snapshot_page
+        
+        stale_page = scraper._check_venue_available(date, session_type)
+        if stale_page is not None:
+            return stale_page
+        
+        # Coalesce with identical fetches from either engine
+        flight_key = (scraper.venue, date, session_type.upper())
+        future, is_leader = upstream_fetches.begin(flight_key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+        
+        try:
+            page = await self._scrape_seating_page_uncached(scraper, date, session_type)
+            if use_cache and (page.no_records or not page.is_parsed or len(page)):
+                seating_cache.put(scraper.venue, date, session_type, page)
+                await asyncio.get_running_loop().run_in_executor(
+                    None, shared_seating_cache.put, scraper.venue, date, session_type, page)
+        except BaseException as e:
+            upstream_fetches.finish(flight_key, future, error=e)
+            raise
+        upstream_fetches.finish(flight_key, future, result=page)
+        return page
+    
+    async def _scrape_seating_page_uncached(self, scraper: 'SRMHTTPScraper', date: str, session_type: str) -> SeatingPage:
+        """Fetch one page over aiohttp. Failed fetches give an empty page."""
+        http = await self._get_http_session()
+        start_time = time.time()
+        print(f"🚀 Async HTTP Scraping {scraper.venue_name} - {date} {session_type}")
+        
+        async with self._semaphore:
+            self.in_flight += 1
+            self.fetches += 1
+            try:
+                form_info = form_cache.get(scraper.base_url)
+                form_from_cache = form_info is not None
+                if not form_from_cache:
+                    form_info = await self._discover_form(http, scraper)
+                    if form_info is None:
+                        return SeatingPage(scraper.venue, date, session_type, [])
+                
+                response_body = await self._submit_form_hedged(http, scraper, form_info, date, session_type)
+                if response_body is None and form_from_cache:
+                    # The cached form may be stale - rediscover it and retry once
+                    form_cache.invalidate(scraper.base_url)
+                    form_info = await self._discover_form(http, scraper)
+                    if form_info is None:
+                        return SeatingPage(scraper.venue, date, session_type, [])
+                    response_body = await self._submit_form(http, scraper, form_info, date, session_type)
+                
+                if response_body is None:
+                    return SeatingPage(scraper.venue, date, session_type, [])
+            finally:
+                self.in_flight -= 1
+        
+        print(f"✅ Form submitted in {time.time() - start_time:.2f}s")
+        body, encoding = response_body
+        
+        # Parsing happens outside the semaphore so the slot is free for the next fetch, and on
+        # an executor thread so it never blocks the event loop
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, scraper._page_from_body, body, encoding, date, session_type, start_time)
+        except Exception as e:
+            print(f"❌ HTTP scraping failed for {scraper.venue_name}: {e}")
+            return SeatingPage(scraper.venue, date, session_type, [])
+    
+    async def _discover_form(self, http: 'aiohttp.ClientSession', scraper: 'SRMHTTPScraper') -> Optional[Tuple[str, Dict[str, str]]]:
+        """GET the report page and cache its form action and hidden fields (coalesced like the thread engine's)"""
+        flight_key = ('form', scraper.base_url)
+        future, is_leader = upstream_fetches.begin(flight_key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+        
+        try:
+            form_info = await self._load_form(http, scraper)
+        except BaseException as e:
+            upstream_fetches.finish(flight_key, future, error=e)
+            raise
+        upstream_fetches.finish(flight_key, future, result=form_info)
+        return form_info
+    
+    async def _load_form(self, http: 'aiohttp.ClientSession', scraper: 'SRMHTTPScraper') -> Optional[Tuple[str, Dict[str, str]]]:
+        try:
+            async with upstream_governor.async_slot(scraper.venue):
+                request_start = time.time()
+                async with http.get(scraper.base_url, timeout=self._request_timeout(scraper)) as response:
+                    response.raise_for_status()
+                    html = await response.text()
+                venue_health.record_success(scraper.venue, time.time() - request_start, closes_circuit=False)
+        except Exception as e:
+            venue_health.record_failure(scraper.venue)
+            print(f"❌ Failed to load initial page for {scraper.venue_name}: {e}")
+            return None
+        
+        form_info = scraper._parse_form_html(html)
+        form_cache.put(scraper.base_url, form_info)
+        return form_info
+    
+    async def _submit_form(self, http: 'aiohttp.ClientSession', scraper: 'SRMHTTPScraper',
+                           form_info: Tuple[str, Dict[str, str]], date: str, session_type: str) -> Optional[Tuple[bytes, str]]:
+        """POST the report form and return the raw body and its encoding, or None on failure"""
+        async with upstream_governor.async_slot(scraper.venue):
+            return await self._post_form(http, scraper, form_info, date, session_type)
+    
+    async def _post_form(self, http: 'aiohttp.ClientSession', scraper: 'SRMHTTPScraper',
+                         form_info: Tuple[str, Dict[str, str]], date: str, session_type: str) -> Optional[Tuple[bytes, str]]:
+        """The POST itself - callers hold an upstream_governor slot"""
+        form_url, form_data, request_headers = scraper._build_form_request(form_info, date, session_type)
+        try:
+            request_start = time.time()
+            async with http.post(form_url, data=form_data, headers=request_headers, allow_redirects=True,
+                                 timeout=self._request_timeout(scraper)) as response:
+                response.raise_for_status()
+                response_body = await response.read(), response.charset or 'utf-8'
+            venue_health.record_success(scraper.venue, time.time() - request_start)
+            return response_body
+        except Exception as e:
+            venue_health.record_failure(scraper.venue)
+            print(f"❌ Form submission failed for {scraper.venue_name}: {e}")
+            return None
+    
+    async def _submit_form_hedged(self, http: 'aiohttp.ClientSession', scraper: 'SRMHTTPScraper',
+                                  form_info: Tuple[str, Dict[str, str]], date: str,
+                                  session_type: str) -> Optional[Tuple[bytes, str]]:
+        """Async counterpart of SRMHTTPScraper._submit_form_hedged - the losing request is cancelled"""
+        async def attempt(holding_slot: asyncio.Event = None):
+            async with upstream_governor.async_slot(scraper.venue):
+                if holding_slot is not None:
+                    holding_slot.set()
+                return await self._post_form(http, scraper, form_info, date, session_type)
+        
+        delay = hedge_policy.delay_for(scraper.venue)
+        if delay is None:
+            return await attempt()
+        
+        # As in the thread engine, the hedge delay only starts once the primary holds its slot
+        holding_slot = asyncio.Event()
+        primary = asyncio.ensure_future(attempt(holding_slot))
+        slot_wait = asyncio.ensure_future(holding_slot.wait())
+        try:
+            await asyncio.wait({primary, slot_wait}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            slot_wait.cancel()
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not hedge_policy.try_acquire():
+            return await primary
+        
+        print(f"🏁 Hedging slow request to {scraper.venue_name} after {delay:.2f}s")
+        hedge = asyncio.ensure_future(attempt())
+        hedge_won = False
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response_body = task.result()
+                    if response_body is not None:
+                        hedge_won = task is hedge
+                        return response_body
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            hedge_policy.release(hedge_won)
+    
+    @staticmethod
+    def _request_timeout(scraper: 'SRMHTTPScraper') -> 'aiohttp.ClientTimeout':
+        connect_timeout, read_timeout = scraper._request_timeout()
+        return aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+    
+    def close(self):
+        """Close the client session and stop the engine loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.close(), loop).result()
+            self._http = None
+        loop.call_soon_threadsafe(loop.stop)
+    
+    def get_stats(self) -> Dict:
+        return {
+            'available': AIOHTTP_AVAILABLE,
+            'running': self._loop is not None,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'fetches': self.fetches
+        }
+
+
+# Shared asyncio fetch engine (its loop thread starts on first use)
+async_engine = AsyncFetchEngine()
 
 # Backward compatibility wrapper to replace Playwright scraper
 class SRMPlaywrightScraper:
@@ -610,6 +2388,14 @@ class SRMPlaywrightScraper:
         """Scrape using HTTP backend"""
         return self.http_scraper.scrape_seating_data_fast(date, session_type)
     
+    def scrape_seating_page(self, date: str, session_type: str) -> SeatingPage:
+        """Scrape using HTTP backend, returning the indexed page"""
+        return self.http_scraper.scrape_seating_page(date, session_type)
+    
+    def iter_seating_data(self, date: str, session_type: str) -> Iterator[Dict]:
+        """Stream records room by room using HTTP backend"""
+        return self.http_scraper.iter_seating_data(date, session_type)
+    
     def scrape_seating_data(self, date: str, session_type: str) -> List[Dict]:
         """Scrape using HTTP backend (alias for compatibility)"""
         return self.http_scraper.scrape_seating_data_fast(date, session_type)
@@ -653,49 +2439,55 @@ class MultiVenueScraper:
             for future in concurrent.futures.as_completed(future_to_venue, timeout=60):
                 venue = future_to_venue[future]
                 try:
-                    venue_data = future.result()
-                    results[venue] = venue_data
+                    venue_page = future.result()
+                    results[venue] = venue_page
                     
-                    if venue_data:
-                        print(f"✅ {self.venue_names[venue]}: {len(venue_data)} records")
+                    if not venue_page.is_parsed:
+                        print(f"✅ {self.venue_names[venue]}: page fetched")
+                    elif len(venue_page):
+                        print(f"✅ {self.venue_names[venue]}: {len(venue_page)} records")
                     else:
                         print(f"📝 {self.venue_names[venue]}: No data")
                         
                 except Exception as e:
                     print(f"❌ {self.venue_names[venue]} failed: {e}")
-                    results[venue] = []
+                    results[venue] = SeatingPage(venue, date, session_type, [])
         
         total_time = time.time() - start_time
-        total_records = sum(len(data) for data in results.values())
         
+        # Filter by roll number if specified (raw prescan or index lookup per page)
+        if roll_number:
+            print(f"🎯 Searched {len(self.venues)} venues in {total_time:.2f}s")
+            return {venue: page.find(roll_number) for venue, page in results.items()}
+        
+        total_records = sum(len(page) for page in results.values())
         print(f"🎯 Total: {total_records} records from {len(self.venues)} venues in {total_time:.2f}s")
         
-        # Filter by roll number if specified
-        if roll_number:
-            filtered_results = {}
-            for venue, data in results.items():
-                filtered_data = [
-                    record for record in data
-                    if roll_number.lower() in record.get('registration_number', '').lower()
-                ]
-                filtered_results[venue] = filtered_data
-            return filtered_results
-        
-        return results
-    
-    def _scrape_venue_http(self, venue: str, date: str, session_type: str) -> List[Dict]:
+        return {venue: page.records for venue, page in results.items()}
+    
+    def _scrape_venue_http(self, venue: str, date: str, session_type: str) -> SeatingPage:
         """Scrape a single venue using HTTP requests"""
         try:
             scraper = SRMHTTPScraper(venue=venue)
-            data = scraper.scrape_seating_data_fast(date, session_type)
+            page = scraper.scrape_seating_page(date, session_type)
             scraper.close_session()
-            return data
+            return page
         except Exception as e:
             print(f"❌ HTTP scraping failed for {venue}: {e}")
-            return []
+            return SeatingPage(venue, date, session_type, [])
 
 def main():
     """Test the HTTP scraper"""
+    # python http_scraper.py --check-parsers saved_page.html [DD/MM/YYYY] [FN|AN]
+    if len(sys.argv) >= 3 and sys.argv[1] == '--check-parsers':
+        with open(sys.argv[2], encoding='utf-8', errors='replace') as f:
+            page_html = f.read()
+        check_date = sys.argv[3] if len(sys.argv) > 3 else "28/05/2025"
+        check_session = sys.argv[4] if len(sys.argv) > 4 else "FN"
+        report = SRMHTTPScraper(venue="main").check_parser_engines(page_html, check_date, check_session)
+        print(json.dumps(report, indent=2))
+        return
+    
     print("🚀 Testing SRM HTTP Scraper")
     
     # Test single venue
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Background prefetch for the SRM Exam Seat Finder
+Refreshes seating pages for upcoming exam dates so the morning rush hits a warm cache
+
+Copyright 2025 Pragadees15
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import requests
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+from http_scraper import SRMHTTPScraper, seating_cache, VenueUnavailableError
+from seat_snapshot import snapshot_store
+
+
+class LiveTrafficGauge:
+    """Tracks live user searches so background work can stay out of their way."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.last_activity = 0.0
+
+    @contextmanager
+    def track(self):
+        """Wrap a live search request"""
+        with self._lock:
+            self.in_flight += 1
+            self.last_activity = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.last_activity = time.time()
+
+    def is_quiet(self, quiet_seconds: float) -> bool:
+        """True when no search is running and none finished in the last quiet_seconds"""
+        with self._lock:
+            return self.in_flight == 0 and time.time() - self.last_activity >= quiet_seconds
+
+
+class PrefetchScheduler:
+    """
+    Refreshes every venue/session page for a list of upcoming dates, one fetch at a time.
+    Before each fetch it waits for live traffic to go quiet, and pages whose cache entry
+    still has more than min_remaining seconds left are skipped.
+    """
+
+    VENUES = ["main", "tp", "tp2", "bio", "ub"]
+    SESSIONS = ["FN", "AN"]
+
+    def __init__(self, dates: List[str] = None, pause: float = None, quiet_seconds: float = None,
+                 min_remaining: float = None, traffic: LiveTrafficGauge = None):
+        self.dates = dates
+        self.traffic = traffic
+        self.pause = pause if pause is not None else float(os.environ.get('PREFETCH_PAUSE', 0.5))
+        self.quiet_seconds = quiet_seconds if quiet_seconds is not None else \
+            float(os.environ.get('PREFETCH_QUIET_SECONDS', 2))
+        # Default: refresh entries that are past half of their TTL
+        self.min_remaining = min_remaining if min_remaining is not None else \
+            float(os.environ.get('PREFETCH_MIN_REMAINING', seating_cache.ttl / 2))
+
+        # Write a memory-mapped snapshot of each fully cached date for cold-start instances
+        self.write_snapshots = os.environ.get('PREFETCH_SNAPSHOTS', '1') == '1'
+
+        self._run_lock = threading.Lock()
+        self.runs = 0
+        self.refreshed = 0
+        self.skipped_fresh = 0
+        self.skipped_open_circuit = 0
+        self.failed = 0
+        self.deferred = 0
+        self.last_run = None
+
+    @staticmethod
+    def normalize_date(date: str) -> str:
+        """Accept DD/MM/YYYY or YYYY-MM-DD, like the search endpoint"""
+        date = date.strip()
+        try:
+            return datetime.strptime(date, "%Y-%m-%d").strftime("%d/%m/%Y")
+        except ValueError:
+            datetime.strptime(date, "%d/%m/%Y")
+            return date
+
+    def configured_dates(self) -> List[str]:
+        """PREFETCH_DATES (comma separated) plus today and the next PREFETCH_DAYS_AHEAD days"""
+        if self.dates is not None:
+            return [self.normalize_date(date) for date in self.dates]
+
+        dates = []
+        for date in os.environ.get('PREFETCH_DATES', '').split(','):
+            if date.strip():
+                try:
+                    dates.append(self.normalize_date(date))
+                except ValueError:
+                    print(f"⚠️ Ignoring invalid prefetch date: {date.strip()}")
+
+        days_ahead = int(os.environ.get('PREFETCH_DAYS_AHEAD', 0))
+        if days_ahead > 0:
+            today = datetime.now()
+            for offset in range(days_ahead + 1):
+                date = (today + timedelta(days=offset)).strftime("%d/%m/%Y")
+                if date not in dates:
+                    dates.append(date)
+        return dates
+
+    def _wait_for_quiet(self, deadline: Optional[float]) -> bool:
+        """Block until live traffic is quiet; False if the deadline passed first"""
+        while self.traffic is not None and not self.traffic.is_quiet(self.quiet_seconds):
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.2)
+        return deadline is None or time.time() < deadline
+
+    def run_once(self, dates: List[str] = None, budget_seconds: float = None) -> Dict:
+        """Refresh all venue/session pages of the given dates. Returns a summary of the run."""
+        if not self._run_lock.acquire(blocking=False):
+            return {'success': False, 'message': 'Prefetch already running'}
+
+        try:
+            start_time = time.time()
+            deadline = start_time + budget_seconds if budget_seconds else None
+            dates = [self.normalize_date(date) for date in dates] if dates else self.configured_dates()
+            summary = {'dates': dates, 'refreshed': 0, 'skipped_fresh': 0, 'skipped_open_circuit': 0,
+                       'failed': 0, 'deferred': 0, 'snapshots': 0}
+            refreshed_dates, failed_dates = set(), set()
+
+            tasks = [(date, venue, session) for date in dates for venue in self.VENUES for session in self.SESSIONS]
+            print(f"🔥 Prefetch: {len(tasks)} pages for {len(dates)} date(s)")
+
+            for index, (date, venue, session) in enumerate(tasks):
+                remaining = seating_cache.time_to_live(venue, date, session)
+                if remaining is not None and remaining > self.min_remaining:
+                    summary['skipped_fresh'] += 1
+                    continue
+
+                if not self._wait_for_quiet(deadline):
+                    summary['deferred'] = len(tasks) - index
+                    print(f"⏳ Prefetch out of time - {summary['deferred']} page(s) deferred")
+                    break
+
+                try:
+                    page = SRMHTTPScraper(venue=venue).refresh_seating_page(date, session)
+                    # Parse now so the first searches get index lookups instead of a parse
+                    if len(page) or page.no_records:
+                        summary['refreshed'] += 1
+                        refreshed_dates.add(date)
+                    else:
+                        # Fetch errors come back as an empty page, not an exception
+                        print(f"❌ Prefetch got no data for {venue} {date} {session}")
+                        summary['failed'] += 1
+                        failed_dates.add(date)
+                except VenueUnavailableError as e:
+                    # The breaker is doing its job - no fetch was made, so no pause either
+                    print(f"🚫 Prefetch skipped {venue} {date} {session}: {e}")
+                    summary['skipped_open_circuit'] += 1
+                    continue
+                except Exception as e:
+                    print(f"❌ Prefetch failed for {venue} {date} {session}: {e}")
+                    summary['failed'] += 1
+                    failed_dates.add(date)
+
+                time.sleep(self.pause)
+
+            if self.write_snapshots:
+                # A date with a failed page would be snapshotted from older cache entries
+                snapshot_dates = refreshed_dates - failed_dates
+                summary['snapshots'] = sum(1 for date in dates if date in snapshot_dates and self._write_snapshot(date))
+
+            summary['duration'] = round(time.time() - start_time, 2)
+            summary['success'] = True
+
+            self.runs += 1
+            self.refreshed += summary['refreshed']
+            self.skipped_fresh += summary['skipped_fresh']
+            self.skipped_open_circuit += summary['skipped_open_circuit']
+            self.failed += summary['failed']
+            self.deferred += summary['deferred']
+            self.last_run = datetime.now().isoformat()
+
+            print(f"🔥 Prefetch done in {summary['duration']}s: {summary['refreshed']} refreshed, "
+                  f"{summary['skipped_fresh']} fresh, {summary['skipped_open_circuit']} circuit open, "
+                  f"{summary['failed']} failed")
+            return summary
+        finally:
+            self._run_lock.release()
+
+    def _write_snapshot(self, date: str) -> bool:
+        """Snapshot a date once every venue/session page of it is cached"""
+        pages = [seating_cache.peek(venue, date, session) for venue in self.VENUES for session in self.SESSIONS]
+        if any(page is None for page in pages):
+            return False
+        return snapshot_store.write(date, pages) is not None
+
+    def run_forever(self, interval: float = None, dates: List[str] = None):
+        """Run a prefetch pass every interval seconds (for long-running hosts)"""
+        interval = interval if interval is not None else float(os.environ.get('PREFETCH_INTERVAL', 600))
+        while True:
+            self.run_once(dates)
+            time.sleep(interval)
+
+    def get_stats(self) -> Dict:
+        return {
+            'dates': self.configured_dates(),
+            'runs': self.runs,
+            'refreshed': self.refreshed,
+            'skipped_fresh': self.skipped_fresh,
+            'skipped_open_circuit': self.skipped_open_circuit,
+            'failed': self.failed,
+            'deferred': self.deferred,
+            'last_run': self.last_run
+        }
+
+
+# Shared instances: the app tracks live searches, the cron endpoint and CLI run the scheduler
+live_traffic = LiveTrafficGauge()
+prefetch_scheduler = PrefetchScheduler(traffic=live_traffic)
+
+
+def trigger_remote(base_url: str, dates: List[str] = None) -> Dict:
+    """Ask a running app instance to prefetch into its own cache via /api/prefetch"""
+    headers = {}
+    if os.environ.get('CRON_SECRET'):
+        headers['Authorization'] = f"Bearer {os.environ['CRON_SECRET']}"
+    params = {'dates': ','.join(dates)} if dates else None
+    response = requests.post(f"{base_url.rstrip('/')}/api/prefetch", params=params, headers=headers, timeout=120)
+    response.raise_for_status()
+    return response.json()
+
+
+def main():
+    """Warm the seating cache from the command line"""
+    # python prefetch.py [--loop] [--url https://your-app.vercel.app] [DD/MM/YYYY ...]
+    # Without --url the pages are fetched into this process's own cache
+    args = sys.argv[1:]
+    loop = '--loop' in args
+    url = None
+    if '--url' in args:
+        url = args[args.index('--url') + 1]
+        args.remove('--url')
+        args.remove(url)
+    dates = [arg for arg in args if arg != '--loop'] or None
+
+    if url:
+        print(json.dumps(trigger_remote(url, dates), indent=2))
+    elif loop:
+        prefetch_scheduler.run_forever(dates=dates)
+    else:
+        summary = prefetch_scheduler.run_once(dates)
+        print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped seating snapshots for the SRM Exam Seat Finder
+One compact binary file per exam date holds every venue/session page, so a cold instance
+can answer lookups before it has scraped anything
+
+    python seat_snapshot.py build 28/05/2025 --out snapshots
+    python seat_snapshot.py lookup snapshots/seating-28-05-2025.snap RA2111003010001
+
+Copyright 2025 Pragadees15
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple, Iterator
+from seating_data import SeatingPage
+
+# File layout (little-endian, all sections 8-byte aligned):
+#   header   magic, version, created_at, date string id, section counts and offsets
+#   strings  (n_strings + 1) uint32 offsets into a UTF-8 blob; every value is stored once
+#   pages    per venue/session: venue, session, digest (string ids), flags, order range, max key length
+#   rooms    per room: ROOM_FIELDS as string ids
+#   rows     key, registration number, department, seat (string ids), room id, page id -
+#            sorted by (normalized registration number, page, original row) for binary search
+#   order    rows-table indices of each page in original page order
+MAGIC = b'SEATSNP1'
+VERSION = 1
+NO_STRING = 0xFFFFFFFF
+PAGE_NO_RECORDS = 0x1
+
+_HEADER = struct.Struct('<8sHHdIIIIIIQQQQQQ')
+_PAGE = struct.Struct('<7I')
+_ROOM = struct.Struct('<%dI' % len(SeatingPage.ROOM_FIELDS))
+_ROW = struct.Struct('<6I')
+_U32 = struct.Struct('<I')
+
+
+def snapshot_filename(date: str) -> str:
+    return f"seating-{date.replace('/', '-')}.snap"
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_snapshot(path: str, date: str, pages: List[SeatingPage]) -> Dict:
+    """Write all pages of one date into a snapshot file (atomically). Pages are parsed if needed."""
+    strings: Dict[str, int] = {}
+
+    def sid(value) -> int:
+        if value is None:
+            return NO_STRING
+        value = str(value)
+        string_id = strings.get(value)
+        if string_id is None:
+            string_id = strings[value] = len(strings)
+        return string_id
+
+    rooms: Dict[Tuple[int, ...], int] = {}
+    page_rows = []  # (venue, session, digest, flags, [(sort key, row tuple)], max key length)
+    for page_id, page in enumerate(pages):
+        rows = []
+        max_key_length = 0
+        for row_number, record in enumerate(page.iter_records()):
+            room = tuple(sid(record.get(field, '')) for field in SeatingPage.ROOM_FIELDS)
+            room_id = rooms.setdefault(room, len(rooms))
+            registration_number = record.get('registration_number', '')
+            key = SeatingPage.normalize(registration_number)
+            max_key_length = max(max_key_length, len(key))
+            row = (sid(key), sid(registration_number), sid(record.get('department', '')),
+                   sid(record.get('seat_number', '')), room_id, page_id)
+            rows.append(((key.encode('utf-8'), page_id, row_number), row))
+        flags = PAGE_NO_RECORDS if page.no_records else 0
+        page_rows.append((sid(page.venue), sid(page.session_type.upper()), sid(page.digest), flags, rows, max_key_length))
+
+    date_id = sid(date)
+    sorted_rows = sorted((entry for _, _, _, _, rows, _ in page_rows for entry in rows), key=lambda entry: entry[0])
+    position = {entry[0]: index for index, entry in enumerate(sorted_rows)}
+
+    # Sections
+    blob = bytearray()
+    string_offsets = []
+    for value in strings:
+        string_offsets.append(len(blob))
+        blob += value.encode('utf-8')
+    string_offsets.append(len(blob))
+    string_index = struct.pack('<%dI' % len(string_offsets), *string_offsets)
+
+    page_table = bytearray()
+    order = []
+    for venue_id, session_id, digest_id, flags, rows, max_key_length in page_rows:
+        page_table += _PAGE.pack(venue_id, session_id, digest_id, flags, len(order), len(rows), max_key_length)
+        order.extend(position[sort_key] for sort_key, _ in rows)
+    room_table = b''.join(_ROOM.pack(*room) for room in rooms)
+    row_table = b''.join(_ROW.pack(*row) for _, row in sorted_rows)
+    order_table = struct.pack('<%dI' % len(order), *order)
+
+    sections = [string_index, bytes(blob), bytes(page_table), room_table, row_table, order_table]
+    offsets = []
+    offset = _align(_HEADER.size)
+    for section in sections:
+        offsets.append(offset)
+        offset = _align(offset + len(section))
+
+    max_key_length = max((entry[5] for entry in page_rows), default=0)
+    header = _HEADER.pack(MAGIC, VERSION, 0, time.time(), date_id, len(strings), len(pages), len(rooms),
+                          len(sorted_rows), max_key_length, *offsets)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        for section_offset, section in zip(offsets, sections):
+            f.write(b'\0' * (section_offset - f.tell()))
+            f.write(section)
+    os.replace(temp_path, path)
+
+    return {'path': path, 'pages': len(pages), 'rows': len(sorted_rows), 'rooms': len(rooms),
+            'strings': len(strings), 'size_bytes': os.path.getsize(path)}
+
+
+class SeatSnapshot:
+    """Read-only view of a snapshot file over mmap - nothing is deserialized up front."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self.created_at, date_id, self.n_strings, self.n_pages, self.n_rooms,
+         self.n_rows, self.max_key_length, self._string_index, self._blob, self._pages, self._rooms,
+         self._rows, self._order) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a seating snapshot (version {VERSION}): {path}")
+
+        self.date = self.string(date_id)
+        self.pages: Dict[Tuple[str, str], 'SnapshotPage'] = {}
+        for page_id in range(self.n_pages):
+            venue_id, session_id, digest_id, flags, order_start, row_count, max_key_length = \
+                _PAGE.unpack_from(self._mm, self._pages + page_id * _PAGE.size)
+            page = SnapshotPage(self, page_id, self.string(venue_id), self.string(session_id), self.string(digest_id),
+                                bool(flags & PAGE_NO_RECORDS), order_start, row_count, max_key_length)
+            self.pages[(page.venue, page.session_type)] = page
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NO_STRING:
+            return None
+        return self._string_bytes(string_id).decode('utf-8')
+
+    def _string_bytes(self, string_id: int) -> bytes:
+        start, end = struct.unpack_from('<2I', self._mm, self._string_index + string_id * 4)
+        return self._mm[self._blob + start:self._blob + end]
+
+    def row(self, index: int) -> Tuple[int, int, int, int, int, int]:
+        return _ROW.unpack_from(self._mm, self._rows + index * _ROW.size)
+
+    def order(self, position: int) -> int:
+        return _U32.unpack_from(self._mm, self._order + position * 4)[0]
+
+    def record(self, index: int) -> Dict:
+        """Materialize one row as a record dict (same fields as SeatingPage records)"""
+        _, registration_id, department_id, seat_id, room_id, _ = self.row(index)
+        room = [self.string(string_id) for string_id in _ROOM.unpack_from(self._mm, self._rooms + room_id * _ROOM.size)]
+        return {
+            'date': room[0],
+            'session': room[1],
+            'room_number': room[2],
+            'exam_date': room[3],
+            'exam_session': room[4],
+            'department': self.string(department_id),
+            'seat_number': self.string(seat_id),
+            'registration_number': self.string(registration_id),
+            'venue_code': room[5],
+            'venue_name': room[6],
+            'extracted_at': room[7]
+        }
+
+    def _key_range(self, key: bytes) -> Tuple[int, int]:
+        """Rows-table range whose normalized registration number equals key (binary search)"""
+        low, high = 0, self.n_rows
+        while low < high:
+            middle = (low + high) // 2
+            if self._string_bytes(self.row(middle)[0]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        end = low
+        while end < self.n_rows and self._string_bytes(self.row(end)[0]) == key:
+            end += 1
+        return low, end
+
+    def find(self, roll_number: str) -> List[Dict]:
+        """Exact (case-insensitive) registration number lookup across every page of the date"""
+        start, end = self._key_range(SeatingPage.normalize(roll_number).encode('utf-8'))
+        return [self.record(index) for index in range(start, end)]
+
+    def page(self, venue: str, session_type: str) -> Optional['SnapshotPage']:
+        return self.pages.get((venue, session_type.upper()))
+
+    def close(self):
+        self._mm.close()
+
+
+class SnapshotPage:
+    """
+    One venue/session page inside a snapshot, with the read API of SeatingPage
+    (find, records, len, no_records, digest) so it can be cached and searched like one.
+    """
+
+    is_parsed = True
+    size_version = 0
+    raw_html = None
+
+    def __init__(self, snapshot: SeatSnapshot, page_id: int, venue: str, session_type: str, digest: Optional[str],
+                 no_records: bool, order_start: int, row_count: int, max_key_length: int):
+        self.snapshot = snapshot
+        self.page_id = page_id
+        self.venue = venue
+        self.date = snapshot.date
+        self.session_type = session_type
+        self.digest = digest
+        self.no_records = no_records
+        self._order_start = order_start
+        self._row_count = row_count
+        self._max_key_length = max_key_length
+        self._room_index: Optional[Dict[str, List[int]]] = None  # built on the first roster query
+
+    normalize = staticmethod(SeatingPage.normalize)
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def _row_indices(self) -> Iterator[int]:
+        for position in range(self._order_start, self._order_start + self._row_count):
+            yield self.snapshot.order(position)
+
+    def iter_records(self) -> Iterator[Dict]:
+        for index in self._row_indices():
+            yield self.snapshot.record(index)
+
+    @property
+    def records(self) -> List[Dict]:
+        return list(self.iter_records())
+
+    def find(self, roll_number: str) -> List[Dict]:
+        """Same semantics as SeatingPage.find: exact lookup for full roll numbers, substring otherwise"""
+        query = self.normalize(roll_number)
+        if not query:
+            return self.records
+
+        snapshot = self.snapshot
+        if len(query) >= self._max_key_length:
+            start, end = snapshot._key_range(query.encode('utf-8'))
+            return [snapshot.record(index) for index in range(start, end) if snapshot.row(index)[5] == self.page_id]
+
+        return [
+            snapshot.record(index)
+            for index in self._row_indices()
+            if query in snapshot.string(snapshot.row(index)[0])
+        ]
+
+    def _rooms_index(self) -> Dict[str, List[int]]:
+        """Room number -> rows-table indices in seat order (the file has no room index, so one scan per page)"""
+        if self._room_index is None:
+            snapshot = self.snapshot
+            room_keys, room_rows = {}, {}
+            for index in self._row_indices():
+                _, _, _, seat_id, room_id, _ = snapshot.row(index)
+                room_key = room_keys.get(room_id)
+                if room_key is None:
+                    room_id_field = _ROOM.unpack_from(snapshot._mm, snapshot._rooms + room_id * _ROOM.size)[2]
+                    room_key = room_keys[room_id] = self.normalize(snapshot.string(room_id_field).strip())
+                room_rows.setdefault(room_key, []).append((SeatingPage.seat_order(snapshot.string(seat_id)), index))
+            self._room_index = {
+                room: [index for _, index in sorted(rows, key=lambda row: row[0])]
+                for room, rows in room_rows.items()
+            }
+        return self._room_index
+
+    def room_numbers(self) -> List[str]:
+        return list(dict.fromkeys(record['room_number'] for record in self.iter_records()))
+
+    def room_roster(self, room_number: str) -> List[Dict]:
+        indices = self._rooms_index().get(self.normalize(room_number.strip()), [])
+        return [self.snapshot.record(index) for index in indices]
+
+    def find_many(self, roll_numbers: List[str]) -> Dict[str, List[Dict]]:
+        """Matches per roll number (omitted when there are none) - binary searches are cheap enough one by one"""
+        matches = {}
+        for roll_number in roll_numbers:
+            roll_matches = self.find(roll_number)
+            if roll_matches:
+                matches[roll_number] = roll_matches
+        return matches
+
+    def estimate_size(self) -> int:
+        # The mapped file is shared by the page cache, not held by the page
+        return sys.getsizeof(self) + 256
+
+
+class SnapshotStore:
+    """
+    Finds and opens the snapshot of a date: files shipped with the deployment (SEAT_SNAPSHOT_DIR)
+    and files written at runtime (SEAT_SNAPSHOT_WRITE_DIR, /tmp by default). The newest file wins;
+    snapshots older than SEAT_SNAPSHOT_MAX_AGE seconds are ignored.
+    """
+
+    def __init__(self, read_dirs: List[str] = None, write_dir: str = None, max_age: float = None):
+        default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+        self.write_dir = write_dir or os.environ.get('SEAT_SNAPSHOT_WRITE_DIR', '/tmp/seat-snapshots')
+        self.read_dirs = read_dirs or [os.environ.get('SEAT_SNAPSHOT_DIR', default_dir), self.write_dir]
+        self.max_age = max_age if max_age is not None else float(os.environ.get('SEAT_SNAPSHOT_MAX_AGE', 86400))
+        self.enabled = os.environ.get('SEAT_SNAPSHOTS', '1') == '1'
+
+        self._lock = threading.Lock()
+        self._open: Dict[str, Tuple[float, SeatSnapshot]] = {}  # path -> (mtime, snapshot)
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+
+    def _load(self, path: str) -> Optional[SeatSnapshot]:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._open.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            try:
+                snapshot = SeatSnapshot(path)
+            except (OSError, ValueError, struct.error) as e:
+                print(f"⚠️ Ignoring unreadable snapshot {path}: {e}")
+                return None
+            # Replaced files keep their old mapping alive for pages still in use
+            self._open[path] = (mtime, snapshot)
+            return snapshot
+
+    def snapshot(self, date: str) -> Optional[SeatSnapshot]:
+        """Newest usable snapshot of a date, or None"""
+        if not self.enabled:
+            return None
+        newest = None
+        for directory in self.read_dirs:
+            snapshot = self._load(os.path.join(directory, snapshot_filename(date)))
+            if snapshot is not None and snapshot.age <= self.max_age and \
+                    (newest is None or snapshot.created_at > newest.created_at):
+                newest = snapshot
+        return newest
+
+    def page(self, venue: str, date: str, session_type: str) -> Optional[SnapshotPage]:
+        snapshot = self.snapshot(date)
+        page = snapshot.page(venue, session_type) if snapshot is not None else None
+        with self._lock:
+            if page is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return page
+
+    def write(self, date: str, pages: List[SeatingPage], directory: str = None) -> Optional[Dict]:
+        """Write a date's pages to the runtime snapshot directory; None if writing failed"""
+        path = os.path.join(directory or self.write_dir, snapshot_filename(date))
+        try:
+            summary = write_snapshot(path, date, pages)
+        except OSError as e:
+            print(f"⚠️ Could not write snapshot {path}: {e}")
+            return None
+        with self._lock:
+            self.written += 1
+        print(f"📀 Snapshot written: {path} ({summary['rows']} rows, {summary['size_bytes'] // 1024} KB)")
+        return summary
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'read_dirs': self.read_dirs,
+                'max_age_seconds': self.max_age,
+                'open_files': len(self._open),
+                'hits': self.hits,
+                'misses': self.misses,
+                'written': self.written
+            }
+
+
+# Shared instance used by the scrapers and the prefetch scheduler
+snapshot_store = SnapshotStore()
+
+
+def build_snapshot(date: str, directory: str = None) -> Optional[Dict]:
+    """Scrape every venue/session page of a date and write its snapshot"""
+    from http_scraper import SRMHTTPScraper
+
+    pages = []
+    for venue in SRMHTTPScraper.VENUE_PATHS:
+        for session_type in ('FN', 'AN'):
+            page = SRMHTTPScraper(venue=venue).scrape_seating_page(date, session_type)
+            if not page.no_records and not len(page):
+                print(f"❌ {venue} {date} {session_type} could not be fetched - snapshot not written")
+                return None
+            pages.append(page)
+    return snapshot_store.write(date, pages, directory)
+
+
+def main():
+    """python seat_snapshot.py build DATE... [--out DIR] | lookup FILE ROLL | info FILE"""
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] == 'build':
+        directory = None
+        if '--out' in args:
+            directory = args[args.index('--out') + 1]
+            args.remove('--out')
+            args.remove(directory)
+        for date in args[1:]:
+            print(build_snapshot(date, directory))
+    elif len(args) == 3 and args[0] == 'lookup':
+        snapshot = SeatSnapshot(args[1])
+        start = time.perf_counter()
+        matches = snapshot.find(args[2])
+        elapsed = (time.perf_counter() - start) * 1_000_000
+        for match in matches:
+            print(match)
+        print(f"🔍 {len(matches)} match(es) in {elapsed:.0f} µs")
+    elif len(args) == 2 and args[0] == 'info':
+        snapshot = SeatSnapshot(args[1])
+        print({
+            'date': snapshot.date,
+            'created_at': datetime.fromtimestamp(snapshot.created_at).isoformat(),
+            'pages': {f"{venue} {session}": ('no records' if page.no_records else len(page))
+                      for (venue, session), page in snapshot.pages.items()},
+            'rows': snapshot.n_rows,
+            'rooms': snapshot.n_rooms,
+            'strings': snapshot.n_strings,
+            'size_bytes': os.path.getsize(args[1])
+        })
+    else:
+        print(main.__doc__)
+
+
+if __name__ == "__main__":
+    main()
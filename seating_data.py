@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Parsed seating data structures for the SRM Exam Seat Finder
+One SeatingPage per scraped venue/date/session, indexed for fast lookups
+
+Copyright 2025 Pragadees15
+"""
+
+import os
+import re
+import sys
+import threading
+from array import array
+from typing import List, Dict, Callable, Optional, Tuple, Iterator
+
+# Roll-number queries the raw-bytes prescan can handle safely (no markup/entities involved)
+_PRESCAN_QUERY = re.compile(r'^[a-z0-9]+$')
+
+# Substring index over registration numbers: n-gram length and per-page memory budget
+NGRAM_LENGTH = 3
+NGRAM_MAX_BYTES = int(float(os.environ.get('SEATING_NGRAM_MAX_MB', 4)) * 1024 * 1024)
+
+# Lookups an unparsed page answers by prescanning; after that it is parsed in full so
+# a page served from cache gets the registration and n-gram indexes
+PRESCAN_LOOKUPS = int(os.environ.get('SEATING_PRESCAN_LOOKUPS', 1))
+
+# Process-wide counters for the lazy parse / prescan / substring index paths
+page_stats = {
+    'prescans': 0,
+    'prescan_skips': 0,
+    'block_parses': 0,
+    'full_parses': 0,
+    'ngram_builds': 0,
+    'ngram_lookups': 0,
+    'substring_scans': 0
+}
+_page_stats_lock = threading.Lock()
+
+
+def _count(counter: str):
+    with _page_stats_lock:
+        page_stats[counter] += 1
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def get_page_stats() -> Dict:
+    """Snapshot of the prescan / parse counters"""
+    with _page_stats_lock:
+        return dict(page_stats)
+
+
+class SeatingPage:
+    """
+    Seating records of one venue/date/session page with a registration-number index.
+    Rows are stored column-wise: department, seat and registration number per row,
+    plus a room id pointing at metadata (room, dates, session, venue) kept once per
+    room. Record dicts are only materialized when they are handed out.
+    A page can also be created from the raw response body and parsed lazily: the first
+    PRESCAN_LOOKUPS lookups prescan the raw bytes and only parse the room block that
+    contains the roll number; later lookups, or any access to the rows, parse the page
+    in full and build the index.
+    """
+
+    BLOCK_MARKER = b'content-and-table'
+
+    # Field order of a materialized record (matches the scraper's extraction output)
+    RECORD_FIELDS = ('date', 'session', 'room_number', 'exam_date', 'exam_session', 'department',
+                     'seat_number', 'registration_number', 'venue_code', 'venue_name', 'extracted_at')
+    ROOM_FIELDS = ('date', 'session', 'room_number', 'exam_date', 'exam_session',
+                   'venue_code', 'venue_name', 'extracted_at')
+
+    def __init__(self, venue: str, date: str, session_type: str, records: List[Dict] = None,
+                 raw_html: bytes = None, encoding: str = None, parser: Callable[[str], List[Dict]] = None,
+                 digest: str = None, no_records: bool = False):
+        self.venue = venue
+        self.date = date
+        self.session_type = session_type
+        self.digest = digest  # hash of the raw response body, used to detect unchanged refreshes
+        self.no_records = no_records  # upstream answered "no records found" (as opposed to a failed fetch)
+
+        # Unparsed state: raw body plus the scraper's extraction callback
+        self.raw_html = raw_html
+        self.encoding = encoding or 'utf-8'
+        self._raw_lower = raw_html.lower() if raw_html is not None else None
+        self._parser = parser
+        self._parse_lock = threading.Lock()
+        self._prescans_left = PRESCAN_LOOKUPS
+
+        self._parsed = False
+        self._rooms: List[Tuple[str, ...]] = []
+        self._room_ids = array('I')
+        self._departments: List[str] = []
+        self._seat_numbers: List[str] = []
+        self._registration_numbers: List[str] = []
+        self._irregular: Dict[int, Dict] = {}  # rows that don't have exactly RECORD_FIELDS, kept as-is
+
+        # normalized registration number -> first row id, repeats go to _duplicate_rows
+        self.registration_index: Dict[str, int] = {}
+        self._duplicate_rows: Dict[str, List[int]] = {}
+        self._max_key_length = 0
+        # normalized room number -> row ids in seat order
+        self.room_index: Dict[str, array] = {}
+        # n-gram -> ascending row ids, built on the first partial-number query (False: over budget);
+        # n-grams found in more than half of the rows are left out and only listed in _common_ngrams
+        self._ngram_index = None
+        self._common_ngrams = frozenset()
+        self._size_version = 0
+        if records is not None or raw_html is None:
+            self._set_records(records or [])
+
+    def _set_records(self, records: List[Dict]):
+        """Pack extracted records into columns and build the index once, at extraction time"""
+        record_fields = set(self.RECORD_FIELDS)
+        room_ids = {}
+
+        for row_id, record in enumerate(records):
+            if record.keys() != record_fields:
+                self._irregular[row_id] = record
+
+            room = tuple(_intern(record.get(field, '')) for field in self.ROOM_FIELDS)
+            room_id = room_ids.get(room)
+            if room_id is None:
+                room_id = room_ids[room] = len(self._rooms)
+                self._rooms.append(room)
+
+            self._room_ids.append(room_id)
+            self._departments.append(_intern(record.get('department', '')))
+            self._seat_numbers.append(_intern(record.get('seat_number', '')))
+            self._registration_numbers.append(record.get('registration_number', ''))
+
+        self._build_index()
+
+    def _build_index(self):
+        """Index the registration-number and room columns and drop the raw body"""
+        registration_index = {}
+        duplicate_rows = {}
+        max_key_length = 0
+        room_rows: Dict[str, List[int]] = {}
+
+        room_keys = [self.normalize(room[2].strip()) for room in self._rooms]
+        for row_id, room_id in enumerate(self._room_ids):
+            room_rows.setdefault(room_keys[room_id], []).append(row_id)
+        seat_numbers = self._seat_numbers
+        self.room_index = {
+            room: array('I', sorted(row_ids, key=lambda row_id: self.seat_order(seat_numbers[row_id])))
+            for room, row_ids in room_rows.items()
+        }
+
+        for row_id, registration_number in enumerate(self._registration_numbers):
+            key = self.normalize(registration_number)
+            if key == registration_number:
+                key = registration_number  # share the string when normalizing doesn't change it
+            if key in registration_index:
+                duplicate_rows.setdefault(key, []).append(row_id)
+            else:
+                registration_index[key] = row_id
+            if len(key) > max_key_length:
+                max_key_length = len(key)
+
+        self.registration_index = registration_index
+        self._duplicate_rows = duplicate_rows
+        self._max_key_length = max_key_length
+        self._ngram_index = None
+        self._parsed = True
+        self._size_version += 1
+
+        # The raw body is no longer needed once the page is parsed
+        self.raw_html = None
+        self._raw_lower = None
+
+    def to_columns(self) -> Dict:
+        """Compact, JSON-serializable form of the parsed page (see from_columns)"""
+        self._ensure_parsed()
+        return {
+            'venue': self.venue,
+            'date': self.date,
+            'session_type': self.session_type,
+            'digest': self.digest,
+            'no_records': self.no_records,
+            'rooms': self._rooms,
+            'room_ids': self._room_ids.tolist(),
+            'departments': self._departments,
+            'seat_numbers': self._seat_numbers,
+            'registration_numbers': self._registration_numbers,
+            'irregular': [[row_id, record] for row_id, record in self._irregular.items()]
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict) -> 'SeatingPage':
+        """Rebuild a parsed page from to_columns() output without materializing records"""
+        page = cls(columns['venue'], columns['date'], columns['session_type'], [],
+                   digest=columns.get('digest'), no_records=columns.get('no_records', False))
+        page._rooms = [tuple(_intern(value) for value in room) for room in columns['rooms']]
+        page._room_ids = array('I', columns['room_ids'])
+        page._departments = [_intern(value) for value in columns['departments']]
+        page._seat_numbers = [_intern(value) for value in columns['seat_numbers']]
+        page._registration_numbers = list(columns['registration_numbers'])
+        page._irregular = {row_id: record for row_id, record in columns.get('irregular', [])}
+        page._build_index()
+        return page
+
+    def _ensure_parsed(self):
+        if not self._parsed:
+            with self._parse_lock:
+                if not self._parsed:
+                    _count('full_parses')
+                    self._set_records(self._parser(self._decode(self.raw_html)))
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._parsed
+
+    def unparsed_body(self) -> Optional[bytes]:
+        """The raw body while the page is still unparsed, else None (a concurrent parse drops raw_html)"""
+        with self._parse_lock:
+            return None if self._parsed else self.raw_html
+
+    @property
+    def size_version(self) -> int:
+        """Changes whenever the page's memory footprint grows (parse, substring index)"""
+        return self._size_version
+
+    def record(self, row_id: int) -> Dict:
+        """Materialize one row as a fresh record dict"""
+        irregular = self._irregular.get(row_id)
+        if irregular is not None:
+            return dict(irregular)
+        room = self._rooms[self._room_ids[row_id]]
+        return {
+            'date': room[0],
+            'session': room[1],
+            'room_number': room[2],
+            'exam_date': room[3],
+            'exam_session': room[4],
+            'department': self._departments[row_id],
+            'seat_number': self._seat_numbers[row_id],
+            'registration_number': self._registration_numbers[row_id],
+            'venue_code': room[5],
+            'venue_name': room[6],
+            'extracted_at': room[7]
+        }
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Yield every row as a fresh record dict (parses the raw body on first use)"""
+        self._ensure_parsed()
+        for row_id in range(len(self._registration_numbers)):
+            yield self.record(row_id)
+
+    @property
+    def records(self) -> List[Dict]:
+        """All rows as fresh record dicts - callers may modify them freely"""
+        return list(self.iter_records())
+
+    @staticmethod
+    def normalize(registration_number: str) -> str:
+        """Normalize a registration number the same way searches compare them"""
+        return registration_number.lower()
+
+    def __len__(self) -> int:
+        self._ensure_parsed()
+        return len(self._registration_numbers)
+
+    def find(self, roll_number: str) -> List[Dict]:
+        """Records whose registration number contains roll_number (case-insensitive)."""
+        query = self.normalize(roll_number)
+        if not query:
+            return self.records
+
+        if not self._parsed:
+            # The lookup that fetched the page prescans; once the page is served from
+            # cache, repeat lookups are worth a full parse and the indexes
+            if self._prescans_left > 0:
+                self._prescans_left -= 1
+                prescan_matches = self._find_by_prescan(query)
+                if prescan_matches is not None:
+                    return prescan_matches
+            self._ensure_parsed()
+
+        # A query at least as long as every key can only match a key equal to it
+        if len(query) >= self._max_key_length:
+            row_id = self.registration_index.get(query)
+            if row_id is None:
+                return []
+            row_ids = [row_id] + self._duplicate_rows.get(query, [])
+            return [self.record(row_id) for row_id in row_ids]
+
+        # Partial roll numbers keep the original substring semantics
+        return [self.record(row_id) for row_id in self._substring_rows(query)]
+
+    def _substring_rows(self, query: str) -> List[int]:
+        """Row ids (ascending) whose normalized registration number contains query"""
+        row_ids = self._ngram_candidates(query)
+        normalize = self.normalize
+        if row_ids is None:
+            _count('substring_scans')
+            return [
+                row_id
+                for row_id, registration_number in enumerate(self._registration_numbers)
+                if query in normalize(registration_number)
+            ]
+        registration_numbers = self._registration_numbers
+        return [row_id for row_id in row_ids if query in normalize(registration_numbers[row_id])]
+
+    def _ngram_candidates(self, query: str) -> Optional[List[int]]:
+        """
+        Candidate rows for a substring query from the n-gram index: rows containing every
+        indexed n-gram of the query (callers still check the substring). None means the
+        index can't narrow it down - too short a query, only very common n-grams, or no index.
+        """
+        if len(query) < NGRAM_LENGTH:
+            return None
+        index = self._ensure_ngram_index()
+        if not index:
+            return None
+
+        _count('ngram_lookups')
+        postings = []
+        for gram in {query[i:i + NGRAM_LENGTH] for i in range(len(query) - NGRAM_LENGTH + 1)}:
+            rows = index.get(gram)
+            if rows is None:
+                if gram in self._common_ngrams:
+                    continue
+                return []  # an n-gram no registration number contains
+            postings.append(rows)
+        if not postings:
+            return None
+
+        # Start from the rarest n-gram and intersect until few candidates are left
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for rows in postings[1:]:
+            if len(candidates) <= 32:
+                break
+            candidates.intersection_update(rows)
+        return sorted(candidates)
+
+    def _ensure_ngram_index(self):
+        if self._ngram_index is None:
+            with self._parse_lock:
+                if self._ngram_index is None:
+                    self._build_ngram_index()
+        return self._ngram_index
+
+    def _build_ngram_index(self):
+        """Build the n-gram index, or mark it unavailable when it would exceed NGRAM_MAX_BYTES"""
+        keys = [self.normalize(registration_number) for registration_number in self._registration_numbers]
+        postings_bound = sum(max(0, len(key) - NGRAM_LENGTH + 1) for key in keys)
+        if postings_bound * array('I').itemsize > NGRAM_MAX_BYTES:
+            self._ngram_index = False
+            return
+
+        _count('ngram_builds')
+        index: Dict[str, array] = {}
+        for row_id, key in enumerate(keys):
+            for gram in {key[i:i + NGRAM_LENGTH] for i in range(len(key) - NGRAM_LENGTH + 1)}:
+                rows = index.get(gram)
+                if rows is None:
+                    rows = index[gram] = array('I')
+                rows.append(row_id)
+
+        # N-grams in most rows barely narrow a search down - don't keep their row lists
+        common_limit = len(keys) // 2
+        self._common_ngrams = frozenset(gram for gram, rows in index.items() if len(rows) > common_limit)
+        for gram in self._common_ngrams:
+            del index[gram]
+        self._ngram_index = index
+        self._size_version += 1
+
+    @staticmethod
+    def seat_order(seat_number: str) -> Tuple:
+        """Sort key for seat numbers: numeric seats by value, then anything else as text"""
+        seat_number = seat_number.strip()
+        # isdecimal, not isdigit: superscripts like '²' are digits that int() rejects
+        return (0, int(seat_number), '') if seat_number.isdecimal() else (1, 0, seat_number)
+
+    def room_numbers(self) -> List[str]:
+        """Room numbers on this page, in page order"""
+        self._ensure_parsed()
+        return list(dict.fromkeys(room[2] for room in self._rooms))
+
+    def room_roster(self, room_number: str) -> List[Dict]:
+        """Every row of one room (case-insensitive room number) in seat order - an index lookup"""
+        self._ensure_parsed()
+        row_ids = self.room_index.get(self.normalize(room_number.strip()), ())
+        return [self.record(row_id) for row_id in row_ids]
+
+    def find_many(self, roll_numbers: List[str]) -> Dict[str, List[Dict]]:
+        """
+        find() for many roll numbers at once: the page is parsed (at most once), full roll
+        numbers are index lookups and all partial ones are matched in a single pass over the rows.
+        Returns matches per roll number as given (roll numbers without matches are omitted).
+        """
+        self._ensure_parsed()
+        matches: Dict[str, List[Dict]] = {}
+        partial: Dict[str, List[str]] = {}  # normalized query -> roll numbers as given
+        for roll_number in dict.fromkeys(roll_numbers):
+            query = self.normalize(roll_number)
+            if not query or len(query) < self._max_key_length:
+                partial.setdefault(query, []).append(roll_number)
+                continue
+            row_id = self.registration_index.get(query)
+            if row_id is not None:
+                row_ids = [row_id] + self._duplicate_rows.get(query, [])
+                matches[roll_number] = [self.record(row_id) for row_id in row_ids]
+
+        # Partial numbers go through the n-gram index; whatever it can't narrow down
+        # (short or very common fragments) is matched in a single pass over the rows
+        scanned: Dict[str, List[str]] = {}
+        for query, queried_as in partial.items():
+            row_ids = self._ngram_candidates(query) if query else None
+            if row_ids is None:
+                scanned[query] = queried_as
+                continue
+            normalize = self.normalize
+            query_matches = [self.record(row_id) for row_id in row_ids
+                             if query in normalize(self._registration_numbers[row_id])]
+            if query_matches:
+                for roll_number in queried_as:
+                    matches[roll_number] = [dict(record) for record in query_matches]
+
+        if scanned:
+            normalize = self.normalize
+            for row_id, registration_number in enumerate(self._registration_numbers):
+                key = normalize(registration_number)
+                for query, queried_as in scanned.items():
+                    if query in key:
+                        for roll_number in queried_as:
+                            matches.setdefault(roll_number, []).append(self.record(row_id))
+        return matches
+
+    def _find_by_prescan(self, query: str) -> Optional[List[Dict]]:
+        """
+        Search the raw bytes first: no hit means the page cannot contain the roll
+        number and nothing is parsed; a hit parses only the enclosing room block(s).
+        Returns None when the page has to be parsed in full instead.
+        """
+        # A concurrent full parse drops raw_html before _raw_lower, so read them in that order
+        raw_html = self.raw_html
+        raw_lower = self._raw_lower
+        if raw_html is None or raw_lower is None or not _PRESCAN_QUERY.match(query):
+            return None
+
+        _count('prescans')
+        needle = query.encode('ascii')
+        position = raw_lower.find(needle)
+        if position == -1:
+            _count('prescan_skips')
+            return []
+
+        blocks = []
+        while position != -1:
+            block = self._enclosing_block(raw_lower, position)
+            if block is None:
+                return None
+            if block not in blocks:
+                blocks.append(block)
+            position = raw_lower.find(needle, block[1])
+
+        matches = []
+        for start, end in blocks:
+            _count('block_parses')
+            block_records = self._parser(self._decode(raw_html[start:end]))
+            matches.extend(
+                record for record in block_records
+                if query in self.normalize(record.get('registration_number', ''))
+            )
+        return matches
+
+    def _enclosing_block(self, raw_lower: bytes, position: int) -> Optional[Tuple[int, int]]:
+        """Byte range of the content-and-table <div> containing position, up to the next block."""
+        marker = raw_lower.rfind(self.BLOCK_MARKER, 0, position)
+        if marker == -1:
+            return None
+        start = raw_lower.rfind(b'<', 0, marker)
+        if start == -1 or not raw_lower.startswith(b'<div', start) or b'>' in raw_lower[start:marker]:
+            return None
+
+        end = len(raw_lower)
+        next_marker = raw_lower.find(self.BLOCK_MARKER, position)
+        while next_marker != -1:
+            next_start = raw_lower.rfind(b'<', 0, next_marker)
+            if raw_lower.startswith(b'<div', next_start) and b'>' not in raw_lower[next_start:next_marker]:
+                end = next_start
+                break
+            next_marker = raw_lower.find(self.BLOCK_MARKER, next_marker + len(self.BLOCK_MARKER))
+        return start, end
+
+    def _decode(self, raw: bytes) -> str:
+        return raw.decode(self.encoding, errors='replace')
+
+    def estimate_size(self) -> int:
+        """Estimate memory held by the page (shared strings counted once)."""
+        if not self._parsed:
+            return sys.getsizeof(self.raw_html) + sys.getsizeof(self._raw_lower)
+
+        size = sum(sys.getsizeof(column) for column in (
+            self._rooms, self._room_ids, self._departments, self._seat_numbers,
+            self._registration_numbers, self.registration_index, self._duplicate_rows, self._irregular,
+            self.room_index, self._common_ngrams))
+        seen = set()
+        for values in (self._departments, self._seat_numbers, self._registration_numbers, self.registration_index):
+            for value in values:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        for room in self._rooms:
+            size += sys.getsizeof(room)
+            for value in room:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        for rows in self._duplicate_rows.values():
+            size += sys.getsizeof(rows)
+        if self._ngram_index:
+            size += sys.getsizeof(self._ngram_index)
+            for gram, rows in self._ngram_index.items():
+                size += sys.getsizeof(gram) + sys.getsizeof(rows)
+        for room, rows in self.room_index.items():
+            size += sys.getsizeof(rows)
+            if id(room) not in seen:
+                seen.add(id(room))
+                size += sys.getsizeof(room)
+        for record in self._irregular.values():
+            size += sys.getsizeof(record)
+        return size
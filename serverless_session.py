@@ -7,9 +7,13 @@ import os
 import json
 import time
 import uuid
+import zlib
+import struct
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List, Tuple
 import jsonpickle
+from seating_data import SeatingPage
 
 # Try to import Redis, fallback to in-memory if not available
 try:
@@ -182,5 +186,218 @@ class ServerlessSessionManager:
         
         return self.memory_sessions.get(session_id)
 
+
+
+class InMemoryRedis:
+    """
+    Minimal in-process stand-in for the Redis commands the shared seating cache uses
+    (get/set/setex/delete/ping) - for local development and tests without a redis-server
+    """
+    
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def ping(self) -> bool:
+        return True
+    
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._data[key]
+                return None
+            return value
+    
+    def set(self, key: str, value: bytes, ex: int = None) -> bool:
+        with self._lock:
+            self._data[key] = (value, time.time() + ex if ex else None)
+        return True
+    
+    def setex(self, key: str, seconds: int, value: bytes) -> bool:
+        return self.set(key, value, ex=seconds)
+    
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+
+class SharedSeatingCache:
+    """
+    Second-tier seating cache shared by all serverless instances through Redis.
+    Pages are stored zlib-compressed: parsed pages as their JSON columns, pages that
+    are still unparsed as their raw response body (re-parsed lazily by the reader).
+    Each entry carries its expiry time, so readers cache it only for what is left of it.
+    Without REDIS_URL (or after a Redis error, for a short backoff) every call is a
+    cheap no-op and the scrapers behave exactly as before.
+    """
+    
+    FORMAT_VERSION = 2
+    KIND_COLUMNS = b'C'
+    KIND_RAW = b'R'
+    HEADER = struct.Struct('>Bcd')  # format version, kind, expires_at (epoch seconds)
+    
+    def __init__(self, client=None, ttl: int = None, negative_ttl: int = None, prefix: str = 'seating:v1:'):
+        self.ttl = ttl if ttl is not None else int(os.environ.get('SEATING_CACHE_TTL', 900))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else \
+            int(os.environ.get('SEATING_NEGATIVE_TTL', 300))
+        self.prefix = prefix
+        self.compression_level = int(os.environ.get('SHARED_CACHE_COMPRESSION', 6))
+        self.error_backoff = float(os.environ.get('SHARED_CACHE_BACKOFF', 30))
+        self.client = client if client is not None else self._connect()
+        
+        self._lock = threading.Lock()
+        self._disabled_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+    
+    @staticmethod
+    def _connect():
+        """Binary Redis client from REDIS_URL (SHARED_SEATING_CACHE=0 turns the tier off)"""
+        if not REDIS_AVAILABLE or not os.environ.get('REDIS_URL') or \
+                os.environ.get('SHARED_SEATING_CACHE', '1') != '1':
+            return None
+        try:
+            timeout = float(os.environ.get('SHARED_CACHE_TIMEOUT', 1))
+            client = redis.from_url(
+                os.environ.get('REDIS_URL'),
+                socket_connect_timeout=timeout,
+                socket_timeout=timeout
+            )
+            client.ping()
+            print("✅ Redis connected for the shared seating cache")
+            return client
+        except Exception as e:
+            print(f"⚠️ Shared seating cache disabled, Redis unavailable: {e}")
+            return None
+    
+    @property
+    def available(self) -> bool:
+        return self.client is not None and time.time() >= self._disabled_until
+    
+    def _key(self, venue: str, date: str, session_type: str) -> str:
+        return f"{self.prefix}{venue}:{date}:{session_type.upper()}"
+    
+    def _failed(self, operation: str, error: Exception):
+        with self._lock:
+            self.errors += 1
+            self._disabled_until = time.time() + self.error_backoff
+        print(f"⚠️ Shared seating cache {operation} error (retrying in {self.error_backoff:.0f}s): {error}")
+    
+    def serialize(self, page: SeatingPage, expires_at: float = 0.0) -> bytes:
+        """Compressed payload of a page: JSON columns when parsed, the raw body otherwise"""
+        raw_html = page.unparsed_body()
+        if raw_html is not None:
+            meta = {'venue': page.venue, 'date': page.date, 'session_type': page.session_type,
+                    'digest': page.digest, 'encoding': page.encoding}
+            body = json.dumps(meta, separators=(',', ':')).encode('utf-8') + b'\n' + raw_html
+            header = self.HEADER.pack(self.FORMAT_VERSION, self.KIND_RAW, expires_at)
+            return header + zlib.compress(body, self.compression_level)
+        
+        body = json.dumps(page.to_columns(), separators=(',', ':')).encode('utf-8')
+        header = self.HEADER.pack(self.FORMAT_VERSION, self.KIND_COLUMNS, expires_at)
+        return header + zlib.compress(body, self.compression_level)
+    
+    def expires_at(self, payload: bytes) -> Optional[float]:
+        """Expiry time stored in a serialize() payload, None for other formats"""
+        if len(payload) < self.HEADER.size or payload[0] != self.FORMAT_VERSION:
+            return None
+        return self.HEADER.unpack_from(payload)[2]
+    
+    def deserialize(self, payload: bytes, parser: Callable[[str], List[Dict]] = None) -> Optional[SeatingPage]:
+        """Page from serialize() output; raw pages need the scraper's parser callback"""
+        if len(payload) < self.HEADER.size or payload[0] != self.FORMAT_VERSION:
+            return None
+        _, kind, _ = self.HEADER.unpack_from(payload)
+        body = zlib.decompress(payload[self.HEADER.size:])
+        if kind == self.KIND_COLUMNS:
+            return SeatingPage.from_columns(json.loads(body))
+        if kind == self.KIND_RAW and parser is not None:
+            meta_line, raw_html = body.split(b'\n', 1)
+            meta = json.loads(meta_line)
+            return SeatingPage(meta['venue'], meta['date'], meta['session_type'], raw_html=raw_html,
+                               encoding=meta['encoding'], parser=parser, digest=meta['digest'])
+        return None
+    
+    def get(self, venue: str, date: str, session_type: str,
+            parser: Callable[[str], List[Dict]] = None) -> Optional[Tuple[SeatingPage, float]]:
+        """(page, seconds it has left) another instance stored, or None (also when Redis is absent or failing)"""
+        if not self.available:
+            return None
+        try:
+            payload = self.client.get(self._key(venue, date, session_type))
+        except Exception as e:
+            self._failed('get', e)
+            return None
+        
+        page = None
+        remaining = 0.0
+        if payload:
+            try:
+                # Redis drops the key at the same time; this only guards against clock skew
+                remaining = (self.expires_at(payload) or 0.0) - time.time()
+                if remaining > 0:
+                    page = self.deserialize(payload, parser)
+            except (ValueError, KeyError, TypeError, zlib.error) as e:
+                print(f"⚠️ Ignoring unreadable shared cache entry for {venue} {date} {session_type}: {e}")
+        
+        with self._lock:
+            if page is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.bytes_read += len(payload)
+        return (page, remaining) if page is not None else None
+    
+    def put(self, venue: str, date: str, session_type: str, page: SeatingPage):
+        """Store a page for the other instances (negative TTL for "no records" pages)"""
+        if not self.available:
+            return
+        if not isinstance(page, SeatingPage):
+            # e.g. a snapshot-backed page revalidated by a refresh
+            page = SeatingPage(page.venue, page.date, page.session_type, page.records,
+                               digest=page.digest, no_records=page.no_records)
+        ttl = self.negative_ttl if page.no_records else self.ttl
+        try:
+            payload = self.serialize(page, time.time() + ttl)
+        except Exception as e:
+            # Only this page goes unshared - Redis is fine, so no backoff
+            print(f"⚠️ Shared seating cache could not serialize {venue} {date} {session_type}: {e}")
+            return
+        try:
+            self.client.setex(self._key(venue, date, session_type), ttl, payload)
+        except Exception as e:
+            self._failed('put', e)
+            return
+        with self._lock:
+            self.writes += 1
+            self.bytes_written += len(payload)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.client is not None,
+                'available': self.available,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'writes': self.writes,
+                'errors': self.errors,
+                'bytes_written': self.bytes_written,
+                'bytes_read': self.bytes_read
+            }
+
+
 # Global session manager instance
-session_manager = ServerlessSessionManager() 
\ No newline at end of file
+session_manager = ServerlessSessionManager()
+
+# Shared second-tier seating cache (inactive without REDIS_URL)
+shared_seating_cache = SharedSeatingCache() 
\ No newline at end of file
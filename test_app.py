@@ -0,0 +1,170 @@
+"""
+Offline tests for the Flask API, with venue pages built from examcell_standin pages
+"""
+
+import time
+import pytest
+import app as app_module
+from seating_data import SeatingPage
+from http_scraper import SRMHTTPScraper
+from examcell_standin import synthetic_seating_page
+
+DATE = '28/05/2025'
+
+
+@pytest.fixture(scope='module')
+def pages():
+    pages = {}
+    for venue in ('main', 'tp'):
+        scraper = SRMHTTPScraper(venue=venue, parser_engine='html.parser')
+        for session_type in ('FN', 'AN'):
+            html = synthetic_seating_page(DATE, session_type, venue, rooms=3, rows=8)
+            records = scraper._extract_with_parser_engine(html, DATE, session_type)
+            pages[(venue, session_type)] = SeatingPage(venue, DATE, session_type, records)
+    pages[('bio', 'FN')] = SeatingPage('bio', DATE, 'FN', [], no_records=True)
+    return pages
+
+
+@pytest.fixture
+def client(pages, monkeypatch):
+    fetches = []
+
+    def fetch_all_pages(date, sessions=None, venues=None):
+        fetches.append(date)
+        return dict(pages), [], []
+
+    monkeypatch.setattr(app_module.ultra_fast_seat_finder, '_fetch_all_pages', fetch_all_pages)
+    client = app_module.app.test_client()
+    client.fetches = fetches
+    return client
+
+
+def test_batch_search_resolves_every_roll_number_from_one_fetch(client, pages):
+    roll_numbers = [pages[('main', 'FN')].records[3]['registration_number'],
+                    pages[('tp', 'AN')].records[10]['registration_number']]
+
+    response = client.post('/api/search/batch', json={
+        'rollNumbers': roll_numbers + [roll_numbers[0].lower(), 'RA9999999999999', 'short'],
+        'date': '2025-05-28'
+    })
+    data = response.get_json()
+
+    assert response.status_code == 200 and data['success']
+    assert client.fetches == [DATE]
+    assert data['found'] == 2 and data['invalid_roll_numbers'] == ['short']
+    students = {student['roll_number']: student for student in data['students']}
+    assert set(students) == set(roll_numbers + ['RA9999999999999'])
+    for roll_number, (venue, session_type) in zip(roll_numbers, [('main', 'FN'), ('tp', 'AN')]):
+        results = students[roll_number]['results']
+        expected = pages[(venue, session_type)].find(roll_number)
+        assert [(result['room_number'], result['seat_number']) for result in results] == \
+            [(record['room_number'], record['seat_number']) for record in expected]
+        assert all(result['venue_code'] == venue for result in results)
+    assert not students['RA9999999999999']['found']
+
+
+def test_batch_search_rejects_bad_requests(client):
+    assert client.post('/api/search/batch', json={'rollNumbers': [], 'date': DATE}).status_code == 400
+    assert client.post('/api/search/batch', json={'rollNumbers': ['RA2111003010001'], 'date': 'soon'}).status_code == 400
+    assert client.post('/api/search/batch', json={'rollNumbers': ['short'], 'date': DATE}).status_code == 400
+    assert client.fetches == []
+
+
+def test_roster_lists_the_room_in_seat_order(client, pages):
+    page = pages[('tp', 'FN')]
+    room_number = page.room_numbers()[1]
+
+    response = client.get(f"/api/roster?date=2025-05-28&room={room_number.lower()}&venue=tp&session=FN")
+    data = response.get_json()
+
+    assert response.status_code == 200 and data['success']
+    [room] = data['rooms']
+    assert (room['venue_code'], room['session'], room['room_number']) == ('tp', 'FN', room_number)
+    assert [seat['registration_number'] for seat in room['seats']] == \
+        [record['registration_number'] for record in page.room_roster(room_number)]
+
+
+def test_roster_of_an_unknown_room_is_not_found(client):
+    assert client.get('/api/roster?date=2025-05-28&room=NOWHERE').status_code == 404
+    assert client.get('/api/roster?date=2025-05-28&room=TP401&venue=moon').status_code == 400
+
+
+def seat(roll_number, venue, session_type):
+    return {'registration_number': roll_number, 'room_number': f"{venue.upper()}101", 'seat_number': '7',
+            'session': session_type, 'date': DATE, 'department': 'CSE'}
+
+
+def test_resolved_sessions_skip_the_remaining_venues(monkeypatch):
+    finder = app_module.ultra_fast_seat_finder
+    roll_number = 'RA2111003010042'
+    seated = {('main', 'FN'), ('tp', 'AN')}
+    searched = []
+
+    def search_venue_session(venue, session, roll_number, date, session_id):
+        searched.append((venue, session))
+        if venue != 'main':
+            time.sleep(0.3)
+        records = [seat(roll_number, venue, session)] if (venue, session) in seated else []
+        return finder._venue_session_result(venue, session, SeatingPage(venue, date, session, records), roll_number)
+
+    monkeypatch.setattr(finder, 'fetch_engine', 'threads')
+    monkeypatch.setattr(finder, 'max_workers', 2)
+    monkeypatch.setattr(finder, '_search_venue_session_parallel', search_venue_session)
+
+    results, skipped = finder.search_with_skipped_venues(roll_number, DATE, 'no-session')
+
+    assert [(result['venue_code'], result['session']) for result in results] == [('main', 'FN'), ('tp', 'AN')]
+    assert skipped == []
+    # FN was answered by the first venue: the queued FN venues were cancelled (a worker that
+    # freed up before the cancel may have started one of them)
+    assert len([task for task in searched if task[1] == 'FN']) <= 2
+    assert len(searched) <= 6
+
+
+def test_expand_search_dates(monkeypatch):
+    expand = app_module.UltraFastSeatFinderAPI.expand_search_dates
+
+    assert expand('30/05/2025', '01/06/2025') == ['30/05/2025', '31/05/2025', '01/06/2025']
+    assert expand(dates=['02/06/2025', '28/05/2025', '02/06/2025']) == ['28/05/2025', '02/06/2025']
+    assert expand(DATE) == [DATE]
+    with pytest.raises(ValueError):
+        expand('02/06/2025', '28/05/2025')
+    monkeypatch.setenv('SEARCH_MAX_DATES', '2')
+    with pytest.raises(ValueError):
+        expand('28/05/2025', '30/05/2025')
+
+
+def test_date_range_search_returns_one_schedule(monkeypatch):
+    finder = app_module.ultra_fast_seat_finder
+    roll_number = 'RA2111003010042'
+    searched = []
+
+    def search_venue_session(venue, session, roll_number, date, session_id):
+        searched.append((date, venue, session))
+        seated = (venue, session) in {('tp', 'FN'), ('main', 'AN')} and date != '29/05/2025'
+        records = [dict(seat(roll_number, venue, session), date=date)] if seated else []
+        return finder._venue_session_result(venue, session, SeatingPage(venue, date, session, records), roll_number)
+
+    monkeypatch.setattr(finder, 'fetch_engine', 'threads')
+    monkeypatch.setattr(finder, '_search_venue_session_parallel', search_venue_session)
+    client = app_module.app.test_client()
+
+    response = client.post('/api/search', json={'rollNumber': roll_number, 'date': '2025-05-28', 'endDate': '2025-05-30'})
+    data = response.get_json()
+
+    assert response.status_code == 200 and data['success']
+    assert data['dates'] == ['28/05/2025', '29/05/2025', '30/05/2025']
+    assert [(result['date'], result['session'], result['venue_code']) for result in data['results']] == [
+        ('28/05/2025', 'FN', 'tp'), ('28/05/2025', 'AN', 'main'),
+        ('30/05/2025', 'FN', 'tp'), ('30/05/2025', 'AN', 'main')]
+    # Every date x venue x session was searched at most once
+    assert len(searched) == len(set(searched)) and {task[0] for task in searched} == set(data['dates'])
+
+
+def test_date_range_search_rejects_bad_ranges(client):
+    response = client.post('/api/search', json={'rollNumber': 'RA2111003010042', 'date': '2025-05-30', 'endDate': '2025-05-28'})
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'End date is before the start date'
+    assert client.post('/api/search', json={'rollNumber': 'RA2111003010042', 'date': DATE,
+                                            'dates': ['28/05/2025', 'someday']}).status_code == 400
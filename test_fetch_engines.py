@@ -0,0 +1,103 @@
+"""
+Offline parity tests for the fetch engines (streaming, buffered with and without the prescan,
+asyncio), replaying recorded pages from the examcell stand-in
+"""
+
+import os
+import pytest
+import http_scraper
+from http_scraper import (SRMHTTPScraper, SeatingSnapshotCache, FormDiscoveryCache, VenueHealthMonitor,
+                          AsyncFetchEngine, AIOHTTP_AVAILABLE)
+from examcell_standin import start_standin, StandinConfig, synthetic_seating_page, recording_path, NO_RECORDS_PAGE
+
+DATE = '28/05/2025'
+SESSION = 'FN'
+
+SEATING_PAGE = synthetic_seating_page(DATE, SESSION, 'main', rooms=3, rows=8)
+PAGES = {
+    'seating': SEATING_PAGE,
+    'no_records': NO_RECORDS_PAGE,
+    'footer': SEATING_PAGE.replace('</body>', '<p>No data for absent candidates</p></body>'),
+    'header': SEATING_PAGE.replace('<body>', '<body><p>No results for withheld registrations</p>', 1),
+}
+VENUES = dict(zip(PAGES, ('main', 'tp', 'tp2', 'bio')))
+
+
+@pytest.fixture(scope='module')
+def standin(tmp_path_factory):
+    recordings_dir = str(tmp_path_factory.mktemp('recordings'))
+    for name, html in PAGES.items():
+        path = recording_path(recordings_dir, VENUES[name], DATE, SESSION)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+    server = start_standin(config=StandinConfig(recordings_dir=recordings_dir, replay_only=True))
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(standin, monkeypatch):
+    monkeypatch.setenv('EXAMCELL_BASE_URL', standin)
+    monkeypatch.setattr(http_scraper, 'seating_cache', SeatingSnapshotCache())
+    monkeypatch.setattr(http_scraper, 'form_cache', FormDiscoveryCache())
+    monkeypatch.setattr(http_scraper, 'venue_health', VenueHealthMonitor(failure_threshold=100))
+
+
+def summary(page):
+    records = [{field: value for field, value in record.items() if field != 'extracted_at'} for record in page.records]
+    return page.no_records, records
+
+
+def fetch_streaming(venue):
+    scraper = SRMHTTPScraper(venue=venue, streaming=True, parser_engine='html.parser')
+    scraper.stream_chunk_size = 7  # phrases and tags split across chunks
+    return scraper.scrape_seating_page(DATE, SESSION, use_cache=False)
+
+
+def fetch_buffered(venue, prescan):
+    scraper = SRMHTTPScraper(venue=venue, streaming=False, parser_engine='html.parser', prescan=prescan)
+    return scraper.scrape_seating_page(DATE, SESSION, use_cache=False)
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_engines_agree(name):
+    venue = VENUES[name]
+    reference = summary(fetch_buffered(venue, prescan=False))
+
+    assert summary(fetch_buffered(venue, prescan=True)) == reference
+    assert summary(fetch_streaming(venue)) == reference
+    if AIOHTTP_AVAILABLE:
+        engine = AsyncFetchEngine()
+        try:
+            assert summary(engine.submit(venue, DATE, SESSION, use_cache=False).result(timeout=30)) == reference
+        finally:
+            engine.close()
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_no_records_only_without_records(name):
+    no_records, records = summary(fetch_streaming(VENUES[name]))
+
+    assert no_records == (name == 'no_records')
+    assert bool(records) == (name != 'no_records')
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_unchanged_page_keeps_the_cached_page(streaming):
+    scraper = SRMHTTPScraper(venue='main', streaming=streaming, parser_engine='html.parser')
+
+    first = scraper.refresh_seating_page(DATE, SESSION)
+    second = scraper.refresh_seating_page(DATE, SESSION)
+
+    assert first.digest is not None and len(first) > 0
+    assert second is first
+
+
+def test_streamed_and_buffered_pages_share_a_digest():
+    buffered = fetch_buffered('main', prescan=True)
+    streamed = fetch_streaming('main')
+
+    assert streamed.digest == buffered.digest
+    assert fetch_streaming('tp').digest != buffered.digest
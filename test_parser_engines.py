@@ -0,0 +1,58 @@
+"""
+Offline parity tests: every parser engine must extract exactly what html.parser does,
+on every examcell_standin layout
+"""
+
+import pytest
+from http_scraper import SRMHTTPScraper, LXML_AVAILABLE
+from examcell_standin import synthetic_seating_page, LAYOUTS
+
+DATE = '28/05/2025'
+SESSION = 'AN'
+
+ENGINES = [engine for engine in SRMHTTPScraper.PARSER_ENGINES[1:]
+           if LXML_AVAILABLE or engine not in ('lxml', 'lxml-xpath')]
+
+
+def without_timestamps(records):
+    return [{field: value for field, value in record.items() if field != 'extracted_at'} for record in records]
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return SRMHTTPScraper(venue='tp', parser_engine='html.parser')
+
+
+@pytest.mark.parametrize('layout', LAYOUTS)
+@pytest.mark.parametrize('engine', ENGINES)
+def test_engine_matches_html_parser(scraper, engine, layout):
+    html = synthetic_seating_page(DATE, SESSION, 'tp', rooms=4, rows=12, layout=layout)
+    reference = scraper._extract_with_parser_engine(html, DATE, SESSION)
+
+    records = scraper._extract_seating_data_engine(engine, html, DATE, SESSION)
+
+    assert len(reference) > 0
+    assert without_timestamps(records) == without_timestamps(reference)
+
+
+def test_check_parser_engines_reports_every_engine(scraper):
+    html = synthetic_seating_page(DATE, SESSION, 'tp', rooms=2, rows=5)
+
+    report = scraper.check_parser_engines(html, DATE, SESSION)
+
+    assert set(report) == {'html.parser', *ENGINES}
+    assert all(result['identical'] and result['records'] == report['html.parser']['records'] > 0
+               for result in report.values())
+
+
+def test_engine_that_disagrees_falls_back_to_html_parser(monkeypatch):
+    monkeypatch.setattr(SRMHTTPScraper, '_verified_engines', {})
+    scraper = SRMHTTPScraper(venue='tp', parser_engine='strainer')
+    monkeypatch.setattr(scraper, '_extract_seating_data_engine', lambda *args: [])
+    html = synthetic_seating_page(DATE, SESSION, 'tp', rooms=2, rows=5)
+
+    first = scraper._extract_with_parser_engine(html, DATE, SESSION)
+    second = scraper._extract_with_parser_engine(html, DATE, SESSION)
+
+    assert len(first) == len(second) > 0
+    assert SRMHTTPScraper._verified_engines == {'strainer': False}
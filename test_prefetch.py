@@ -0,0 +1,75 @@
+"""
+Offline tests for the prefetch scheduler, run against the examcell stand-in
+"""
+
+import os
+import pytest
+import http_scraper
+import prefetch
+from http_scraper import SeatingSnapshotCache, VenueHealthMonitor, FormDiscoveryCache
+from prefetch import PrefetchScheduler
+from seat_snapshot import SnapshotStore
+from examcell_standin import start_standin, StandinConfig
+
+DATE = '28/05/2025'
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    config = StandinConfig(rooms=2, rows=5, no_records_venues=['bio'])
+    server = start_standin(config=config)
+    monkeypatch.setenv('EXAMCELL_BASE_URL', f"http://127.0.0.1:{server.server_port}")
+    yield config
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    """Scheduler with fresh caches and breaker, writing snapshots under tmp_path"""
+    cache = SeatingSnapshotCache(ttl=900, negative_ttl=300)
+    monkeypatch.setattr(http_scraper, 'seating_cache', cache)
+    monkeypatch.setattr(prefetch, 'seating_cache', cache)
+    monkeypatch.setattr(http_scraper, 'form_cache', FormDiscoveryCache())
+    monkeypatch.setattr(http_scraper, 'venue_health', VenueHealthMonitor(failure_threshold=100))
+    monkeypatch.setenv('SEAT_SNAPSHOTS', '1')
+    monkeypatch.setattr(prefetch, 'snapshot_store', SnapshotStore(read_dirs=[str(tmp_path)], write_dir=str(tmp_path)))
+    scheduler = PrefetchScheduler(pause=0, quiet_seconds=0, min_remaining=0)
+    scheduler.write_snapshots = True
+    return scheduler
+
+
+def snapshot_files(tmp_path):
+    return [name for name in os.listdir(tmp_path) if name.endswith('.snap')]
+
+
+def test_refreshes_every_page_and_snapshots_the_date(standin, scheduler, tmp_path):
+    summary = scheduler.run_once([DATE])
+
+    assert summary['refreshed'] == 10 and summary['failed'] == 0
+    assert summary['snapshots'] == 1 and len(snapshot_files(tmp_path)) == 1
+    assert standin.counts['no_records'] == 2
+
+
+def test_failed_fetches_are_not_counted_as_refreshed(standin, scheduler, tmp_path):
+    standin.error_rate = 1.0
+
+    summary = scheduler.run_once([DATE])
+
+    assert summary['refreshed'] == 0 and summary['failed'] == 10
+    assert summary['snapshots'] == 0 and snapshot_files(tmp_path) == []
+
+
+def test_failed_refresh_does_not_snapshot_older_pages(standin, scheduler, tmp_path):
+    assert scheduler.run_once([DATE])['snapshots'] == 1
+    for name in snapshot_files(tmp_path):
+        os.remove(tmp_path / name)
+    # Every page is still cached from the first run; refresh them all and let every fetch fail
+    scheduler.min_remaining = 10 ** 6
+    standin.no_records_venues = set()
+    standin.error_rate = 1.0
+
+    summary = scheduler.run_once([DATE])
+
+    assert summary['failed'] == 10
+    assert summary['snapshots'] == 0 and snapshot_files(tmp_path) == []
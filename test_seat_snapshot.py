@@ -0,0 +1,99 @@
+"""
+Offline tests for the memory-mapped snapshot format: every snapshot page must answer
+exactly like the SeatingPage it was written from
+"""
+
+import os
+import pytest
+from seating_data import SeatingPage
+from seat_snapshot import write_snapshot, snapshot_filename, SeatSnapshot, SnapshotStore
+from http_scraper import SRMHTTPScraper
+from examcell_standin import synthetic_seating_page
+
+DATE = '28/05/2025'
+
+
+@pytest.fixture(scope='module')
+def pages():
+    pages = []
+    for venue in ('main', 'tp'):
+        scraper = SRMHTTPScraper(venue=venue, parser_engine='html.parser')
+        for session_type in ('FN', 'AN'):
+            html = synthetic_seating_page(DATE, session_type, venue, rooms=5, rows=12)
+            records = scraper._extract_with_parser_engine(html, DATE, session_type)
+            pages.append(SeatingPage(venue, DATE, session_type, records, digest=f"{venue}-{session_type}"))
+    pages.append(SeatingPage('bio', DATE, 'FN', [], digest='empty', no_records=True))
+    return pages
+
+
+@pytest.fixture
+def snapshot(pages, tmp_path):
+    path = str(tmp_path / snapshot_filename(DATE))
+    write_snapshot(path, DATE, pages)
+    snapshot = SeatSnapshot(path)
+    yield snapshot
+    snapshot.close()
+
+
+def test_write_summary(pages, tmp_path):
+    summary = write_snapshot(str(tmp_path / 'seating.snap'), DATE, pages)
+
+    assert summary['pages'] == len(pages)
+    assert summary['rows'] == sum(len(page) for page in pages)
+    assert summary['size_bytes'] == os.path.getsize(summary['path'])
+
+
+def test_pages_round_trip(pages, snapshot):
+    assert snapshot.date == DATE
+    for page in pages:
+        snapshot_page = snapshot.page(page.venue, page.session_type.lower())
+        assert snapshot_page is not None
+        assert (snapshot_page.digest, snapshot_page.no_records) == (page.digest, page.no_records)
+        assert len(snapshot_page) == len(page)
+        assert snapshot_page.records == page.records
+
+
+def test_lookups_match_seating_page(pages, snapshot):
+    for page in pages[:-1]:
+        snapshot_page = snapshot.page(page.venue, page.session_type)
+        roll_numbers = [record['registration_number'] for record in page.records[::11]]
+        queries = roll_numbers + [roll_numbers[0].lower(), roll_numbers[1][-6:], 'ra2', 'RA9999999999999']
+
+        for query in queries:
+            assert snapshot_page.find(query) == page.find(query), query
+        assert snapshot_page.find_many(queries) == page.find_many(queries)
+        for room_number in page.room_numbers():
+            assert snapshot_page.room_roster(f" {room_number.lower()} ") == page.room_roster(room_number)
+
+
+def test_date_wide_find(pages, snapshot):
+    roll_number = pages[2].records[5]['registration_number']
+
+    assert snapshot.find(roll_number) == [record for page in pages for record in page.find(roll_number)]
+    assert snapshot.find('RA9999999999999') == []
+
+
+def test_no_records_page(snapshot):
+    page = snapshot.page('bio', 'FN')
+
+    assert page.no_records and len(page) == 0 and page.find('RA2') == []
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-snapshot.snap'
+    path.write_bytes(b'\0' * 256)
+
+    with pytest.raises(ValueError):
+        SeatSnapshot(str(path))
+
+
+def test_store_serves_fresh_snapshots_only(pages, tmp_path, monkeypatch):
+    monkeypatch.setenv('SEAT_SNAPSHOTS', '1')
+    store = SnapshotStore(read_dirs=[str(tmp_path)], write_dir=str(tmp_path))
+
+    assert store.page('main', DATE, 'FN') is None
+    assert store.write(DATE, pages) is not None
+    assert store.page('main', DATE, 'FN').records == pages[0].records
+
+    stale_store = SnapshotStore(read_dirs=[str(tmp_path)], write_dir=str(tmp_path), max_age=-1)
+    assert stale_store.page('main', DATE, 'FN') is None
@@ -0,0 +1,110 @@
+"""
+Offline tests for the process-wide seating page cache
+"""
+
+import pytest
+import http_scraper
+from http_scraper import SRMHTTPScraper, SeatingSnapshotCache, FormDiscoveryCache, VenueHealthMonitor
+from seating_data import SeatingPage
+from seat_snapshot import SnapshotStore
+from examcell_standin import start_standin, StandinConfig
+
+DATE = '28/05/2025'
+SESSION = 'FN'
+
+
+def page_of(venue: str, rows: int = 3) -> SeatingPage:
+    records = [{'registration_number': f"RA21110030100{index:02d}", 'room_number': 'R101', 'seat_number': str(index)}
+               for index in range(rows)]
+    return SeatingPage(venue, DATE, SESSION, records)
+
+
+def test_pages_expire_after_their_ttl():
+    cache = SeatingSnapshotCache(ttl=900)
+    page = page_of('main')
+    cache.put('main', DATE, 'fn', page)
+
+    assert cache.get('main', DATE, 'FN') is page
+    cache.put('main', DATE, SESSION, page, ttl=-1)
+    assert cache.get('main', DATE, SESSION) is None
+    # Expired pages stay around for revalidation
+    assert cache.peek('main', DATE, SESSION) is page
+    assert cache.get_stats()['expirations'] == 1
+
+
+def test_least_recently_used_pages_are_evicted_over_budget():
+    size = page_of('main').estimate_size()
+    cache = SeatingSnapshotCache(ttl=900, max_bytes=int(size * 2.5))
+    for venue in ('main', 'tp'):
+        cache.put(venue, DATE, SESSION, page_of(venue))
+    cache.get('main', DATE, SESSION)
+
+    cache.put('bio', DATE, SESSION, page_of('bio'))
+
+    assert cache.peek('tp', DATE, SESSION) is None
+    assert cache.peek('main', DATE, SESSION) is not None and cache.peek('bio', DATE, SESSION) is not None
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_oversized_replacement_drops_the_old_page():
+    cache = SeatingSnapshotCache(ttl=900, max_bytes=page_of('main').estimate_size() + 1)
+    cache.put('main', DATE, SESSION, page_of('main'))
+
+    cache.put('main', DATE, SESSION, page_of('main', rows=200))
+
+    assert cache.peek('main', DATE, SESSION) is None
+    assert cache.get_stats()['size_bytes'] == 0
+
+
+def test_no_records_pages_use_the_negative_ttl():
+    cache = SeatingSnapshotCache(ttl=900, negative_ttl=300)
+    cache.put('bio', DATE, SESSION, SeatingPage('bio', DATE, SESSION, [], no_records=True))
+    cache.put('main', DATE, SESSION, page_of('main'))
+
+    assert 290 < cache.time_to_live('bio', DATE, SESSION) <= 300
+    assert 890 < cache.time_to_live('main', DATE, SESSION) <= 900
+    # A cached "no records" page is empty, so it is falsy - but it is a hit
+    assert cache.get('bio', DATE, SESSION) is not None
+    stats = cache.get_stats()
+    assert (stats['entries'], stats['negative_entries']) == (1, 1)
+    assert (stats['hits'], stats['negative_hits']) == (1, 1)
+
+
+@pytest.fixture
+def standin(tmp_path, monkeypatch):
+    config = StandinConfig(rooms=2, rows=5, no_records_venues=['bio'])
+    server = start_standin(config=config)
+    monkeypatch.setenv('EXAMCELL_BASE_URL', f"http://127.0.0.1:{server.server_port}")
+    cache = SeatingSnapshotCache(ttl=900, negative_ttl=300)
+    monkeypatch.setattr(http_scraper, 'seating_cache', cache)
+    monkeypatch.setattr(http_scraper, 'form_cache', FormDiscoveryCache())
+    monkeypatch.setattr(http_scraper, 'venue_health', VenueHealthMonitor(failure_threshold=100))
+    monkeypatch.setattr(http_scraper, 'snapshot_store', SnapshotStore(read_dirs=[str(tmp_path)], write_dir=str(tmp_path)))
+    yield config, cache
+    server.shutdown()
+    server.server_close()
+
+
+def test_no_records_answers_are_not_refetched(standin):
+    config, cache = standin
+    scraper = SRMHTTPScraper(venue='bio')
+
+    first = scraper.scrape_seating_page(DATE, SESSION)
+    second = scraper.scrape_seating_page(DATE, SESSION)
+
+    assert first.no_records and second is first
+    assert config.counts['POST'] == 1
+    assert cache.get_stats()['negative_hits'] == 1
+
+
+def test_failed_fetches_are_not_cached(standin):
+    config, cache = standin
+    config.error_rate = 1.0
+    scraper = SRMHTTPScraper(venue='main')
+
+    for _ in range(2):
+        page = scraper.scrape_seating_page(DATE, SESSION)
+        assert len(page) == 0 and not page.no_records
+
+    assert cache.peek('main', DATE, SESSION) is None
+    assert config.counts['errors'] >= 2
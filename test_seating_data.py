@@ -0,0 +1,206 @@
+"""
+Offline tests for SeatingPage over examcell_standin pages
+"""
+
+import json
+import pytest
+import seating_data
+from seating_data import SeatingPage, get_page_stats
+from http_scraper import SRMHTTPScraper
+from examcell_standin import synthetic_seating_page, LAYOUTS
+
+DATE = '28/05/2025'
+SESSION = 'FN'
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return SRMHTTPScraper(venue='main', parser_engine='html.parser')
+
+
+@pytest.fixture(scope='module')
+def html():
+    return synthetic_seating_page(DATE, SESSION, 'main', rooms=8, rows=20)
+
+
+def parsed_page(scraper, html):
+    return SeatingPage('main', DATE, SESSION, scraper._extract_with_parser_engine(html, DATE, SESSION))
+
+
+def raw_page(scraper, html):
+    return SeatingPage('main', DATE, SESSION, raw_html=html.encode('utf-8'),
+                       parser=scraper._page_parser(DATE, SESSION))
+
+
+def without_timestamps(records):
+    # extracted_at is stamped per parse, so two parses of one page differ only there
+    return [{field: value for field, value in record.items() if field != 'extracted_at'} for record in records]
+
+
+def counter_delta(before, counter):
+    return get_page_stats()[counter] - before[counter]
+
+
+def test_prescan_hit_parses_only_the_enclosing_block(scraper, html, monkeypatch):
+    monkeypatch.setattr(seating_data, 'PRESCAN_LOOKUPS', 1)
+    reference = parsed_page(scraper, html)
+    roll_number = reference.records[100]['registration_number']
+    page = raw_page(scraper, html)
+
+    before = get_page_stats()
+    matches = page.find(roll_number)
+
+    assert without_timestamps(matches) == without_timestamps(reference.find(roll_number))
+    assert counter_delta(before, 'block_parses') == 1
+    assert counter_delta(before, 'full_parses') == 0
+    assert not page.is_parsed
+
+
+def test_prescan_miss_parses_nothing(scraper, html, monkeypatch):
+    monkeypatch.setattr(seating_data, 'PRESCAN_LOOKUPS', 1)
+    page = raw_page(scraper, html)
+
+    before = get_page_stats()
+    assert page.find('RA9999999999999') == []
+    assert counter_delta(before, 'prescan_skips') == 1
+    assert counter_delta(before, 'block_parses') == 0
+    assert not page.is_parsed
+
+
+def test_cached_page_is_parsed_in_full_after_the_prescan_lookups(scraper, html, monkeypatch):
+    monkeypatch.setattr(seating_data, 'PRESCAN_LOOKUPS', 1)
+    reference = parsed_page(scraper, html)
+    roll_number = reference.records[7]['registration_number']
+    page = raw_page(scraper, html)
+
+    first = page.find(roll_number)
+    before = get_page_stats()
+    second = page.find(roll_number)
+
+    assert page.is_parsed
+    assert counter_delta(before, 'full_parses') == 1
+    assert counter_delta(before, 'prescans') == 0
+    assert without_timestamps(first) == without_timestamps(second)
+
+
+@pytest.mark.parametrize('layout', LAYOUTS)
+def test_lazy_page_matches_the_full_parse(scraper, layout):
+    html = synthetic_seating_page(DATE, SESSION, 'tp', rooms=4, rows=10, layout=layout)
+    reference = parsed_page(scraper, html)
+    page = raw_page(scraper, html)
+    roll_numbers = [record['registration_number'] for record in reference.records[::9]]
+
+    assert len(reference) > 0
+    for roll_number in roll_numbers:
+        assert without_timestamps(raw_page(scraper, html).find(roll_number)) == \
+            without_timestamps(reference.find(roll_number))
+    assert without_timestamps(page.records) == without_timestamps(reference.records)
+
+
+def substring_queries(records):
+    queries = set()
+    for record in records[::13]:
+        key = record['registration_number']
+        for start, length in ((0, 3), (4, 5), (len(key) - 6, 6), (2, 10), (len(key) - 3, 3)):
+            queries.add(key[start:start + length])
+    queries.update(['ra2', 'RA21', '000', 'zzz', 'XYZ123', 'a2'])
+    return sorted(queries)
+
+
+def brute_force(records, query):
+    return [record for record in records if query.lower() in record['registration_number'].lower()]
+
+
+def test_ngram_index_matches_a_full_scan(scraper, html):
+    page = parsed_page(scraper, html)
+    records = page.records
+
+    before = get_page_stats()
+    for query in substring_queries(records):
+        assert page.find(query) == brute_force(records, query), query
+
+    assert counter_delta(before, 'ngram_builds') == 1
+    assert counter_delta(before, 'ngram_lookups') > 0
+
+
+def test_substring_search_without_index_budget_scans(scraper, html, monkeypatch):
+    monkeypatch.setattr(seating_data, 'NGRAM_MAX_BYTES', 0)
+    page = parsed_page(scraper, html)
+    records = page.records
+
+    before = get_page_stats()
+    for query in substring_queries(records)[:10]:
+        assert page.find(query) == brute_force(records, query), query
+
+    assert counter_delta(before, 'ngram_builds') == 0
+    assert counter_delta(before, 'substring_scans') > 0
+
+
+def test_find_many_matches_find(scraper, html):
+    page = parsed_page(scraper, html)
+    full = [record['registration_number'] for record in page.records[::31]]
+    queries = full + [full[0].lower(), full[0], 'RA9999999999999', full[1][-5:], 'ra2', '']
+
+    matches = page.find_many(queries)
+
+    for query in dict.fromkeys(queries):
+        expected = page.find(query)
+        assert matches.get(query, []) == expected, query
+
+
+def test_room_roster_is_in_seat_order(scraper, html):
+    page = parsed_page(scraper, html)
+    room_number = page.room_numbers()[2]
+
+    roster = page.room_roster(room_number.lower())
+
+    assert roster and all(record['room_number'] == room_number for record in roster)
+    assert [int(record['seat_number']) for record in roster] == \
+        sorted(int(record['seat_number']) for record in roster)
+    assert page.room_roster('NO-SUCH-ROOM') == []
+
+
+def test_room_roster_handles_padded_rooms_and_odd_seats():
+    records = [
+        {'registration_number': 'RA1', 'room_number': 'R101 ', 'seat_number': '²'},
+        {'registration_number': 'RA2', 'room_number': 'R101 ', 'seat_number': '10'},
+        {'registration_number': 'RA3', 'room_number': 'R101 ', 'seat_number': '9'},
+    ]
+    page = SeatingPage('main', DATE, SESSION, records)
+
+    assert [record['seat_number'] for record in page.room_roster('R101')] == ['9', '10', '²']
+
+
+def test_column_store_round_trip(scraper, html):
+    records = scraper._extract_with_parser_engine(html, DATE, SESSION)
+    records.append({'registration_number': 'RA0000000000001', 'room_number': 'X1', 'note': 'irregular'})
+    page = SeatingPage('main', DATE, SESSION, records, digest='abc123')
+
+    restored = SeatingPage.from_columns(json.loads(json.dumps(page.to_columns())))
+
+    assert restored.records == page.records
+    assert restored.records[-1] == records[-1]
+    assert (restored.venue, restored.date, restored.session_type, restored.digest) == ('main', DATE, SESSION, 'abc123')
+    roll_number = records[42]['registration_number']
+    assert restored.find(roll_number) == page.find(roll_number)
+    room_number = page.room_numbers()[0]
+    assert restored.room_roster(room_number) == page.room_roster(room_number)
+
+
+def test_column_store_keeps_no_records_pages():
+    page = SeatingPage('bio', DATE, SESSION, [], no_records=True)
+
+    restored = SeatingPage.from_columns(json.loads(json.dumps(page.to_columns())))
+
+    assert restored.no_records and len(restored) == 0
+
+
+def test_records_are_fresh_copies(scraper, html):
+    page = parsed_page(scraper, html)
+    roll_number = page.records[0]['registration_number']
+
+    page.find(roll_number)[0]['room_number'] = 'changed'
+    page.records[0]['department'] = 'changed'
+
+    assert page.find(roll_number)[0]['room_number'] != 'changed'
+    assert page.records[0]['department'] != 'changed'
@@ -0,0 +1,91 @@
+"""
+Offline tests for the per-venue pool of keep-alive HTTP sessions
+"""
+
+import threading
+import pytest
+import http_scraper
+from http_scraper import (SRMHTTPScraper, HTTPSessionPool, SeatingSnapshotCache, FormDiscoveryCache,
+                          VenueHealthMonitor)
+from examcell_standin import start_standin, StandinConfig
+
+DATE = '28/05/2025'
+
+
+def test_released_sessions_are_reused_per_venue():
+    pool = HTTPSessionPool(max_idle_per_venue=2)
+
+    with pool.session('main') as first:
+        pass
+    with pool.session('main') as second:
+        pass
+    with pool.session('tp') as other_venue:
+        pass
+
+    assert second is first and other_venue is not first
+    assert pool.get_stats()['created'] == 2 and pool.get_stats()['reused'] == 1
+    pool.close_all()
+
+
+def test_concurrent_checkouts_get_their_own_sessions():
+    pool = HTTPSessionPool(max_idle_per_venue=2)
+    holding, release = threading.Barrier(4), threading.Event()
+    sessions = []
+
+    def hold():
+        with pool.session('main') as session:
+            sessions.append(session)
+            holding.wait()
+            release.wait(5)
+
+    threads = [threading.Thread(target=hold) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    holding.wait()
+    assert pool.get_stats()['sessions_in_use'] == 3
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 3
+    # Only max_idle_per_venue of them stay pooled
+    assert pool.get_stats()['sessions'] == 2 and pool.get_stats()['discarded'] == 1
+    pool.close_all()
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    """Stand-in that also counts the TCP connections it accepts"""
+    config = StandinConfig(rooms=2, rows=5)
+    server = start_standin(config=config)
+    connections = []
+    handler_setup = server.RequestHandlerClass.setup
+
+    def setup(handler):
+        connections.append(handler.client_address)
+        handler_setup(handler)
+
+    server.RequestHandlerClass.setup = setup
+    monkeypatch.setenv('EXAMCELL_BASE_URL', f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(http_scraper, 'session_pool', HTTPSessionPool())
+    monkeypatch.setattr(http_scraper, 'seating_cache', SeatingSnapshotCache())
+    monkeypatch.setattr(http_scraper, 'form_cache', FormDiscoveryCache())
+    monkeypatch.setattr(http_scraper, 'venue_health', VenueHealthMonitor(failure_threshold=100))
+    yield config, connections
+    http_scraper.session_pool.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_scrapes_share_one_keep_alive_connection(standin):
+    config, connections = standin
+
+    for session_type in ('FN', 'AN', 'FN'):
+        page = SRMHTTPScraper(venue='main').scrape_seating_page(DATE, session_type, use_cache=False)
+        assert len(page) > 0
+
+    assert config.counts['POST'] == 3
+    assert len(connections) == 1
+    stats = http_scraper.session_pool.get_stats()
+    assert stats['created'] == 1 and stats['reused'] == 2
+    assert stats['idle_open_connections'] == 1
@@ -0,0 +1,139 @@
+"""
+Offline tests for the Redis-backed shared seating cache, run against InMemoryRedis
+"""
+
+import time
+import threading
+import pytest
+import http_scraper
+from http_scraper import SRMHTTPScraper, SeatingSnapshotCache
+from seating_data import SeatingPage
+from serverless_session import SharedSeatingCache, InMemoryRedis
+from examcell_standin import synthetic_seating_page
+
+DATE = '28/05/2025'
+SESSION = 'FN'
+
+
+class BrokenRedis(InMemoryRedis):
+    def get(self, key):
+        raise ConnectionError('redis is down')
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return SRMHTTPScraper(venue='main', parser_engine='html.parser')
+
+
+@pytest.fixture(scope='module')
+def html():
+    return synthetic_seating_page(DATE, SESSION, 'main', rooms=4, rows=10)
+
+
+@pytest.fixture
+def cache():
+    return SharedSeatingCache(client=InMemoryRedis(), ttl=900, negative_ttl=300)
+
+
+def test_parsed_page_round_trip(cache, scraper, html):
+    page = SeatingPage('main', DATE, SESSION, scraper._extract_with_parser_engine(html, DATE, SESSION), digest='d1')
+
+    cache.put('main', DATE, SESSION, page)
+    shared_page, remaining = cache.get('main', DATE, SESSION.lower())
+
+    assert shared_page.is_parsed
+    assert shared_page.records == page.records and shared_page.digest == 'd1'
+    assert 890 < remaining <= 900
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_raw_page_stays_unparsed(cache, scraper, html):
+    parser = scraper._page_parser(DATE, SESSION)
+    page = SeatingPage('main', DATE, SESSION, raw_html=html.encode('utf-8'), parser=parser, digest='d2')
+    roll_number = SeatingPage('main', DATE, SESSION, parser(html)).records[3]['registration_number']
+
+    cache.put('main', DATE, SESSION, page)
+    shared_page, _ = cache.get('main', DATE, SESSION, parser=parser)
+
+    assert not shared_page.is_parsed and shared_page.digest == 'd2'
+    assert [record['registration_number'] for record in shared_page.find(roll_number)] == [roll_number]
+    # Without the scraper's parser a raw entry can't be used
+    assert cache.get('main', DATE, SESSION) is None
+
+
+def test_no_records_pages_use_the_negative_ttl(cache):
+    cache.put('bio', DATE, SESSION, SeatingPage('bio', DATE, SESSION, [], no_records=True))
+
+    shared_page, remaining = cache.get('bio', DATE, SESSION)
+
+    assert shared_page.no_records and len(shared_page) == 0
+    assert 290 < remaining <= 300
+
+
+def test_expired_and_foreign_entries_are_misses(cache):
+    page = SeatingPage('main', DATE, SESSION, [{'registration_number': 'RA1', 'room_number': 'R1', 'seat_number': '1'}])
+    key = cache._key('main', DATE, SESSION)
+
+    cache.client.set(key, cache.serialize(page, time.time() - 1))
+    assert cache.get('main', DATE, SESSION) is None
+
+    cache.client.set(key, b'\x01C' + b'not a page')
+    assert cache.get('main', DATE, SESSION) is None
+    assert cache.get_stats()['misses'] == 2
+
+
+def test_redis_errors_back_off():
+    cache = SharedSeatingCache(client=BrokenRedis(), ttl=900, negative_ttl=300)
+
+    assert cache.get('main', DATE, SESSION) is None
+    assert not cache.available and cache.get_stats()['errors'] == 1
+    # Backing off: no further Redis calls, no further errors
+    assert cache.get('main', DATE, SESSION) is None
+    assert cache.get_stats()['errors'] == 1
+
+
+def test_local_copy_keeps_only_the_remaining_ttl(cache, monkeypatch):
+    local_cache = SeatingSnapshotCache(ttl=900, negative_ttl=300)
+    monkeypatch.setattr(http_scraper, 'seating_cache', local_cache)
+    monkeypatch.setattr(http_scraper, 'shared_seating_cache', cache)
+    page = SeatingPage('main', DATE, SESSION, [{'registration_number': 'RA1', 'room_number': 'R1', 'seat_number': '1'}])
+    cache.client.set(cache._key('main', DATE, SESSION), cache.serialize(page, time.time() + 120))
+
+    shared_page = SRMHTTPScraper(venue='main')._load_shared_page(DATE, SESSION)
+
+    assert shared_page.records == page.records
+    assert 110 < local_cache.time_to_live('main', DATE, SESSION) <= 120
+
+
+def test_page_parsed_while_serializing_round_trips(cache, scraper, html):
+    parsing, release = threading.Event(), threading.Event()
+    records = scraper._page_parser(DATE, SESSION)(html)
+
+    def slow_parser(text):
+        parsing.set()
+        release.wait(5)
+        return records
+
+    page = SeatingPage('main', DATE, SESSION, raw_html=html.encode('utf-8'), parser=slow_parser, digest='d3')
+    parse = threading.Thread(target=lambda: page.records)
+    parse.start()
+    parsing.wait(5)
+    payloads = []
+    serialize = threading.Thread(target=lambda: payloads.append(cache.serialize(page, time.time() + 60)))
+    serialize.start()
+    release.set()
+    parse.join()
+    serialize.join()
+
+    shared_page = cache.deserialize(payloads[0], parser=slow_parser)
+    assert shared_page.records == page.records and shared_page.digest == 'd3'
+
+
+def test_unserializable_pages_are_skipped_without_backoff(cache):
+    page = SeatingPage('main', DATE, SESSION, [{'registration_number': 'RA1', 'room_number': 'R1', 'note': {1, 2}}])
+
+    cache.put('main', DATE, SESSION, page)
+
+    assert cache.get_stats()['writes'] == 0
+    assert cache.available and cache.get_stats()['errors'] == 0
+    assert cache.get('main', DATE, SESSION) is None
@@ -0,0 +1,98 @@
+"""
+Offline tests for request coalescing: identical concurrent fetches share one upstream call
+"""
+
+import time
+import threading
+import pytest
+import http_scraper
+from http_scraper import (SRMHTTPScraper, SingleFlight, SeatingSnapshotCache, FormDiscoveryCache,
+                          VenueHealthMonitor)
+from seat_snapshot import SnapshotStore
+from examcell_standin import start_standin, StandinConfig
+
+DATE = '28/05/2025'
+SESSION = 'FN'
+
+
+def run_concurrently(count: int, fn) -> list:
+    """Call fn from count threads released at once; returns results (or exceptions) in thread order"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = fn()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    results = run_concurrently(6, lambda: flights.do('page', slow_call))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flights.get_stats() == {'in_flight': 0, 'executed': 1, 'coalesced': 5}
+
+
+def test_errors_are_shared_and_not_remembered():
+    flights = SingleFlight()
+
+    def failing_call():
+        time.sleep(0.2)
+        raise ConnectionError('upstream down')
+
+    results = run_concurrently(4, lambda: flights.do('page', failing_call))
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert flights.get_stats()['executed'] == 1
+    # The next call runs again instead of replaying the failure
+    assert flights.do('page', lambda: 'ok') == 'ok'
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+
+    results = run_concurrently(3, lambda: flights.do(threading.get_ident(), lambda: threading.get_ident()))
+
+    assert len(set(results)) == 3 and flights.get_stats()['coalesced'] == 0
+
+
+@pytest.fixture
+def standin(tmp_path, monkeypatch):
+    config = StandinConfig(rooms=2, rows=5, latency=0.3)
+    server = start_standin(config=config)
+    monkeypatch.setenv('EXAMCELL_BASE_URL', f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(http_scraper, 'seating_cache', SeatingSnapshotCache())
+    monkeypatch.setattr(http_scraper, 'form_cache', FormDiscoveryCache())
+    monkeypatch.setattr(http_scraper, 'upstream_fetches', SingleFlight())
+    monkeypatch.setattr(http_scraper, 'venue_health', VenueHealthMonitor(failure_threshold=100))
+    monkeypatch.setattr(http_scraper, 'snapshot_store', SnapshotStore(read_dirs=[str(tmp_path)], write_dir=str(tmp_path)))
+    yield config
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_searches_share_one_upstream_fetch(standin):
+    pages = run_concurrently(8, lambda: SRMHTTPScraper(venue='main').scrape_seating_page(DATE, SESSION))
+
+    assert len(pages[0]) > 0
+    assert all(page is pages[0] for page in pages)
+    assert standin.counts['GET'] == 1 and standin.counts['POST'] == 1
+    assert http_scraper.upstream_fetches.get_stats()['coalesced'] >= 7
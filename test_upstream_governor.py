@@ -0,0 +1,183 @@
+"""
+Offline tests for the upstream governor (FIFO slots, per-venue token buckets) and for
+hedged form POSTs, which must only be hedged once the primary holds its slot
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from typing import List
+import http_scraper
+from http_scraper import (SRMHTTPScraper, UpstreamGovernor, HedgePolicy, VenueHealthMonitor,
+                          AsyncFetchEngine, AIOHTTP_AVAILABLE)
+from examcell_standin import start_standin, StandinConfig, form_page
+
+DATE = '28/05/2025'
+SESSION = 'FN'
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def test_slots_are_granted_first_come_first_served():
+    governor = UpstreamGovernor(max_concurrency=1, rate_per_venue=1000, burst=1000)
+    granted = []
+
+    def worker(name):
+        with governor.slot('main'):
+            granted.append(name)
+
+    threads = []
+    with governor.slot('main'):
+        for index, name in enumerate('abcde'):
+            thread = threading.Thread(target=worker, args=(name,))
+            thread.start()
+            threads.append(thread)
+            wait_until(lambda: governor.get_stats()['waiting'] == index + 1)
+    for thread in threads:
+        thread.join()
+
+    assert granted == list('abcde')
+    assert governor.get_stats()['active'] == 0
+
+
+def test_async_and_thread_waiters_share_the_queue():
+    governor = UpstreamGovernor(max_concurrency=1, rate_per_venue=1000, burst=1000)
+    granted = []
+
+    async def async_worker():
+        async with governor.async_slot('tp'):
+            granted.append('async')
+
+    def thread_worker():
+        with governor.slot('tp'):
+            granted.append('thread')
+
+    with governor.slot('tp'):
+        async_thread = threading.Thread(target=lambda: asyncio.run(async_worker()))
+        async_thread.start()
+        wait_until(lambda: governor.get_stats()['waiting'] == 1)
+        plain_thread = threading.Thread(target=thread_worker)
+        plain_thread.start()
+        wait_until(lambda: governor.get_stats()['waiting'] == 2)
+    async_thread.join()
+    plain_thread.join()
+
+    assert granted == ['async', 'thread']
+
+
+def test_token_bucket_limits_each_venue():
+    governor = UpstreamGovernor(max_concurrency=10, rate_per_venue=20, burst=2)
+
+    start = time.time()
+    for _ in range(4):
+        with governor.slot('main'):
+            pass
+    with governor.slot('tp'):
+        pass
+
+    # Two requests beyond the burst at 20/s; the other venue has its own bucket
+    assert time.time() - start >= 0.09
+    assert governor.get_stats()['rate_limited'] == 2
+
+
+@pytest.fixture
+def standin():
+    config = StandinConfig(rooms=2, rows=5)
+    server = start_standin(config=config)
+    yield server, config
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    """Two-slot governor and a hedge policy whose delay is its 0.1s floor"""
+    governor = UpstreamGovernor(max_concurrency=2, rate_per_venue=1000, burst=1000)
+    policy = HedgePolicy(enabled=True, budget_ratio=1.0, min_delay=0.1)
+    health = VenueHealthMonitor(failure_threshold=100)
+    for _ in range(health.min_samples):
+        health.record_success('main', 0.01)
+    monkeypatch.setattr(http_scraper, 'upstream_governor', governor)
+    monkeypatch.setattr(http_scraper, 'hedge_policy', policy)
+    monkeypatch.setattr(http_scraper, 'venue_health', health)
+    return governor, policy
+
+
+def hold_all_slots(governor: UpstreamGovernor, seconds: float) -> List[threading.Thread]:
+    """Occupy every governor slot for a while, from other threads"""
+    threads = []
+    for _ in range(governor.max_concurrency):
+        holding = threading.Event()
+
+        def hold(holding=holding):
+            with governor.slot('main'):
+                holding.set()
+                time.sleep(seconds)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        holding.wait()
+        threads.append(thread)
+    return threads
+
+
+def make_scraper(server) -> SRMHTTPScraper:
+    return SRMHTTPScraper(venue='main', base_url=f"http://127.0.0.1:{server.server_port}")
+
+
+def test_queued_primary_is_not_hedged(standin, hedging):
+    server, config = standin
+    governor, policy = hedging
+    scraper = make_scraper(server)
+    form_info = scraper._parse_form_html(form_page('token'))
+
+    holders = hold_all_slots(governor, 0.5)
+    response = scraper._submit_form_hedged(form_info, DATE, SESSION)
+    for holder in holders:
+        holder.join()
+
+    assert response is not None and response.status_code == 200
+    assert policy.get_stats()['hedges_sent'] == 0
+    assert config.counts['POST'] == 1
+
+
+def test_slow_primary_holding_its_slot_is_hedged(standin, hedging):
+    server, config = standin
+    _, policy = hedging
+    config.latency = 0.4
+    scraper = make_scraper(server)
+    form_info = scraper._parse_form_html(form_page('token'))
+
+    response = scraper._submit_form_hedged(form_info, DATE, SESSION)
+
+    assert response is not None
+    assert policy.get_stats()['hedges_sent'] == 1
+    wait_until(lambda: config.counts['POST'] == 2)
+
+
+@pytest.mark.skipif(not AIOHTTP_AVAILABLE, reason='aiohttp is not installed')
+def test_async_queued_primary_is_not_hedged(standin, hedging):
+    import aiohttp
+    server, config = standin
+    governor, policy = hedging
+    scraper = make_scraper(server)
+    form_info = scraper._parse_form_html(form_page('token'))
+
+    async def submit():
+        async with aiohttp.ClientSession() as http:
+            return await AsyncFetchEngine()._submit_form_hedged(http, scraper, form_info, DATE, SESSION)
+
+    holders = hold_all_slots(governor, 0.5)
+    response_body = asyncio.run(submit())
+    for holder in holders:
+        holder.join()
+
+    assert response_body is not None
+    assert policy.get_stats()['hedges_sent'] == 0
+    assert config.counts['POST'] == 1
@@ -0,0 +1,100 @@
+"""
+Offline tests for the per-venue circuit breaker, alone and against the examcell stand-in
+"""
+
+import pytest
+import http_scraper
+from http_scraper import (SRMHTTPScraper, SeatingSnapshotCache, VenueHealthMonitor, FormDiscoveryCache,
+                          AsyncFetchEngine, VenueUnavailableError, AIOHTTP_AVAILABLE)
+from examcell_standin import start_standin, StandinConfig
+
+DATE = '28/05/2025'
+SESSION = 'FN'
+
+
+def circuit(health: VenueHealthMonitor, venue: str = 'main') -> str:
+    return health.get_stats()[venue]['circuit']
+
+
+def test_circuit_opens_after_consecutive_failures_and_probes_after_the_cooldown():
+    health = VenueHealthMonitor(failure_threshold=3, cooldown=0)
+    for _ in range(3):
+        health.before_request('main')
+        health.record_failure('main')
+
+    assert circuit(health) == 'open'
+    health.before_request('main')  # the cooldown has passed: one probe
+    assert circuit(health) == 'half-open'
+    health.record_success('main', 0.1)
+    assert circuit(health) == 'closed'
+
+
+def test_form_loads_do_not_reset_failures():
+    health = VenueHealthMonitor(failure_threshold=3, cooldown=60)
+    for _ in range(3):
+        health.record_success('main', 0.1, closes_circuit=False)
+        health.record_failure('main')
+
+    assert circuit(health) == 'open'
+    with pytest.raises(VenueUnavailableError):
+        health.before_request('main')
+
+
+@pytest.fixture
+def failing_posts(monkeypatch):
+    """Stand-in whose report page loads but whose form POST always answers 500"""
+    config = StandinConfig(rooms=2, rows=5)
+    server = start_standin(config=config)
+
+    def fail_post(handler):
+        handler.rfile.read(int(handler.headers.get('Content-Length', 0)))
+        config.count('POST')
+        handler._send(500, '<html><body>Server Error</body></html>')
+
+    server.RequestHandlerClass.do_POST = fail_post
+    monkeypatch.setenv('EXAMCELL_BASE_URL', f"http://127.0.0.1:{server.server_port}")
+    health = VenueHealthMonitor(failure_threshold=3, cooldown=60)
+    monkeypatch.setattr(http_scraper, 'venue_health', health)
+    monkeypatch.setattr(http_scraper, 'seating_cache', SeatingSnapshotCache())
+    monkeypatch.setattr(http_scraper, 'form_cache', FormDiscoveryCache())
+    yield config, health
+    server.shutdown()
+    server.server_close()
+
+
+def scrape_until_unavailable(fetch, attempts: int = 8) -> int:
+    """Fetches made before the breaker started refusing them"""
+    for attempt in range(attempts):
+        try:
+            page = fetch()
+        except VenueUnavailableError:
+            return attempt
+        assert len(page) == 0 and not page.no_records
+    pytest.fail('the circuit never opened')
+
+
+def test_failing_posts_open_the_circuit(failing_posts):
+    config, health = failing_posts
+    scraper = SRMHTTPScraper(venue='main')
+
+    # Every scrape retries its POST after rediscovering the form; the GETs succeed
+    assert scrape_until_unavailable(lambda: scraper.scrape_seating_page(DATE, SESSION, use_cache=False)) <= 3
+    assert circuit(health) == 'open'
+    posts = config.counts['POST']
+    with pytest.raises(VenueUnavailableError):
+        scraper.refresh_seating_page(DATE, SESSION)
+    assert config.counts['POST'] == posts == health.get_stats()['main']['failures']
+
+
+@pytest.mark.skipif(not AIOHTTP_AVAILABLE, reason='aiohttp is not installed')
+def test_async_failing_posts_open_the_circuit(failing_posts):
+    config, health = failing_posts
+    engine = AsyncFetchEngine()
+
+    try:
+        assert scrape_until_unavailable(
+            lambda: engine.submit('main', DATE, SESSION, use_cache=False).result(timeout=30)) <= 3
+    finally:
+        engine.close()
+    assert circuit(health) == 'open'
+    assert config.counts['POST'] == health.get_stats()['main']['failures']